@@ -0,0 +1,72 @@
+# Copyright (c) Microsoft. All rights reserved.
+# Licensed under the MIT license.
+
+import argparse
+import os
+
+from src.core.partitioner import *
+from src.core.model import *
+from src.core.greedy import *
+
+work_dir = os.path.dirname(os.path.abspath(__file__))
+
+parser = argparse.ArgumentParser("engines")
+parser.add_argument("--order", type=str, default=os.path.join(work_dir, "../sample_data/order_large.csv"), help="the order file")
+parser.add_argument("--distance", type=str, default=os.path.join(work_dir, "../sample_data/distance.csv"), help="the distance file")
+parser.add_argument("--max_package_num", type=int, default=30, help="the max number of packages per partition")
+parser.add_argument("--max_time_in_seconds", type=float, default=120, help="the time limit of each CP-SAT solve")
+
+def solvePartition(model_input, engine):
+    """Function that solves a partition with CP-SAT or the greedy solver.
+
+    Args:
+        model_input: the partitioned model input
+        engine: cpsat or greedy
+
+    Returns:
+        objective: the cost of the scheduling, None if no scheduling is found.
+        wall_time: the wall time in seconds of the solve.
+
+    """
+
+    if engine == 'greedy':
+        solver = GreedySolver()
+        solver.setModelInput(model_input)
+        solver.solve()
+
+        return solver.getObjectiveValue(), solver.wall_time
+
+    model, wall_time = solveModelInput(model_input, args.max_time_in_seconds)
+
+    objective = model.getObjectiveValue() if model.first_solution_time is not None else None
+
+    return objective, wall_time
+
+if __name__ == "__main__":
+    args = parser.parse_args()
+
+    model_input = ModelInput()
+    model_input.initInputFromFile(args.order, args.distance)
+
+    model_input_list = ProblemPartitioner().partition(model_input, args.max_package_num)
+    print(f"Number of partitions: {len(model_input_list)}")
+
+    logger.setLevel(logging.WARNING)
+
+    total_objective = collections.defaultdict(float)
+    total_wall_time = collections.defaultdict(float)
+
+    print("partition,packages,engine,wall_time,objective")
+    for i, model_input_partition in enumerate(model_input_list):
+        for engine in ['cpsat', 'greedy']:
+            objective, wall_time = solvePartition(model_input_partition, engine)
+
+            print(f"{i},{len(model_input_partition.all_packages)},{engine},{wall_time:.2f},{objective}")
+
+            total_objective[engine] += objective if objective is not None else float('nan')
+            total_wall_time[engine] += wall_time
+
+    for engine in ['cpsat', 'greedy']:
+        print(f"Total {engine}: {total_wall_time[engine]:.2f} s, cost {total_objective[engine]:.0f}")
+
+    print(f"Greedy cost gap: {total_objective['greedy'] / total_objective['cpsat'] - 1:.1%}")
@@ -0,0 +1,63 @@
+# Copyright (c) Microsoft. All rights reserved.
+# Licensed under the MIT license.
+
+import argparse
+import os
+
+from src.core.partitioner import *
+from src.core.model import *
+
+work_dir = os.path.dirname(os.path.abspath(__file__))
+
+parser = argparse.ArgumentParser("hints")
+parser.add_argument("--order", type=str, default=os.path.join(work_dir, "../sample_data/order_large.csv"), help="the order file")
+parser.add_argument("--distance", type=str, default=os.path.join(work_dir, "../sample_data/distance.csv"), help="the distance file")
+parser.add_argument("--max_package_num", type=int, default=30, help="the max number of packages per partition")
+parser.add_argument("--max_time_in_seconds", type=float, default=120, help="the time limit of each solve")
+
+def solvePartition(model_input, hints):
+    """Function that solves a partition with or without search hints.
+
+    Args:
+        model_input: the partitioned model input
+        hints: whether the greedy scheduling is set as search hints
+
+    Returns:
+        the solved Model object.
+
+    """
+
+    model = Model()
+    model.setModelInput(model_input)
+
+    model.createVariables()
+    model.setConstraints()
+    model.setObjective(objective="Cost")
+
+    if hints:
+        model.setHints()
+
+    model.solve(max_time_in_seconds=args.max_time_in_seconds)
+
+    return model
+
+if __name__ == "__main__":
+    args = parser.parse_args()
+
+    model_input = ModelInput()
+    model_input.initInputFromFile(args.order, args.distance)
+
+    model_input_list = ProblemPartitioner().partition(model_input, args.max_package_num)
+    print(f"Number of partitions: {len(model_input_list)}")
+
+    logger.setLevel(logging.WARNING)
+
+    print("partition,packages,hints,first_solution_time,wall_time,objective,status")
+    for i, model_input_partition in enumerate(model_input_list):
+        for hints in [False, True]:
+            model = solvePartition(model_input_partition, hints)
+
+            objective = model.getObjectiveValue() if model.first_solution_time is not None else None
+
+            print(f"{i},{len(model_input_partition.all_packages)},{hints},{model.first_solution_time},"
+                  f"{model.solver.WallTime():.2f},{objective},{model.solver.StatusName()}")
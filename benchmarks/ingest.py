@@ -0,0 +1,76 @@
+# Copyright (c) Microsoft. All rights reserved.
+# Licensed under the MIT license.
+
+import argparse
+import os
+import time
+
+from src.core.structure import *
+
+work_dir = os.path.dirname(os.path.abspath(__file__))
+
+parser = argparse.ArgumentParser("ingest")
+parser.add_argument("--order", type=str, default=os.path.join(work_dir, "../sample_data/order_large.csv"), help="the order file")
+parser.add_argument("--scale", type=int, default=100, help="how many times the order file is repeated")
+
+def getAllPackagesByRow(order_df):
+    """Function that constructs the packages row by row, the way the ingest worked before.
+
+    Args:
+        order_df: the dataframe that stores the order
+
+    Returns:
+        A dict of package objects.
+
+    """
+
+    all_packages = {}
+    for index, row in order_df.iterrows():
+        package = Package()
+        package.order_id = row['Order_ID']
+        package.material_id = row['Material_ID']
+        package.item_id = row['Item_ID']
+        package.source = row['Source']
+        package.destination = row['Destination']
+        package.available_time = int(datetime.timestamp(datetime.strptime(row['Available_Time'], time_format)))
+        package.deadline = int(datetime.timestamp(datetime.strptime(row['Deadline'], time_format)))
+        package.danger_type = row['Danger_Type']
+        package.area = row['Area']
+        package.weight = row['Weight']
+
+        all_packages[package.order_id, package.material_id, package.item_id] = package
+
+    return all_packages
+
+if __name__ == "__main__":
+    args = parser.parse_args()
+
+    order_df = pd.read_csv(args.order)
+
+    # Repeat the orders and keep the item ids unique
+    order_df_list = []
+    for i in range(args.scale):
+        order_df_copy = order_df.copy()
+        order_df_copy['Item_ID'] = order_df_copy['Item_ID'] + f"-{i}"
+        order_df_list.append(order_df_copy)
+    order_df_scaled = pd.concat(order_df_list, ignore_index=True)
+
+    num_rows = order_df_scaled.shape[0]
+    print(f"Number of rows: {num_rows}")
+
+    start = time.perf_counter()
+    all_packages_by_row = getAllPackagesByRow(order_df_scaled)
+    by_row_time = time.perf_counter() - start
+    print(f"Row by row ingest: {by_row_time:.2f} s, {by_row_time / num_rows * 1e6:.2f} us per row")
+
+    start = time.perf_counter()
+    all_packages = ModelInput().getAllPackages(order_df_scaled)
+    columnar_time = time.perf_counter() - start
+    print(f"Columnar ingest: {columnar_time:.2f} s, {columnar_time / num_rows * 1e6:.2f} us per row")
+
+    assert(len(all_packages) == len(all_packages_by_row) == num_rows)
+    for p_id, package in all_packages_by_row.items():
+        assert(all_packages[p_id].available_time == package.available_time)
+        assert(all_packages[p_id].deadline == package.deadline)
+
+    print(f"Speedup: {by_row_time / columnar_time:.1f}x")
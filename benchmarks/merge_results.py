@@ -0,0 +1,105 @@
+# Copyright (c) Microsoft. All rights reserved.
+# Licensed under the MIT license.
+
+import argparse
+import os
+import time
+
+from src.core.structure import *
+
+parser = argparse.ArgumentParser("merge_results")
+parser.add_argument("--num_results", type=int, default=10000, help="the number of partial results to merge")
+parser.add_argument("--packages_per_result", type=int, default=30, help="the number of packages per partial result")
+
+def createPartialResult(index, num_packages, truck_type):
+    """Function that creates a synthetic partial result with one truck per three packages.
+
+    Args:
+        index: the index of the partial result
+        num_packages: the number of packages
+        truck_type: the type of all trucks
+
+    Returns:
+        the partial model result.
+
+    """
+
+    model_result = ModelResult()
+
+    for i in range(num_packages):
+        p_id = (f'O{index}', 'M1', f'P{i}')
+        t_id = f'T{index}-{i // 3}'
+
+        package = Package()
+        package.order_id, package.material_id, package.item_id = p_id
+        package.danger_type = 'non_danger'
+        package.source = 'A'
+        package.destination = 'B'
+        package.area = 10 * scale_factor
+        package.weight = 2000 * scale_factor
+        package.deadline = 2000000000
+
+        truck = Truck()
+        truck.id = t_id
+        truck.type = truck_type
+
+        model_result.all_packages[p_id] = package
+        model_result.all_trucks[t_id] = truck
+        model_result.package_assigned_truck[p_id] = t_id
+        model_result.truck_assigned_route[t_id] = ['A', 'B']
+        model_result.truck_assigned_packages[t_id].append(p_id)
+        model_result.package_start_time[p_id] = 1600000000
+        model_result.package_arrival_time[p_id] = 1600003600
+
+    return model_result
+
+def addResultByCopy(model_result, partial_result):
+    """Function that adds a partial result by rebuilding all dicts, the way addResult worked before.
+
+    Args:
+        model_result: the current model result
+        partial_result: the partial model result
+
+    Returns:
+        None
+
+    """
+
+    model_result.all_packages = {**model_result.all_packages, **partial_result.all_packages}
+    model_result.all_trucks = {**model_result.all_trucks, **partial_result.all_trucks}
+
+    model_result.package_assigned_truck = {**model_result.package_assigned_truck, **partial_result.package_assigned_truck}
+    model_result.truck_assigned_route = {**model_result.truck_assigned_route, **partial_result.truck_assigned_route}
+    model_result.truck_assigned_packages = {**model_result.truck_assigned_packages, **partial_result.truck_assigned_packages}
+    model_result.package_start_time = {**model_result.package_start_time, **partial_result.package_start_time}
+    model_result.package_arrival_time = {**model_result.package_arrival_time, **partial_result.package_arrival_time}
+
+if __name__ == "__main__":
+    args = parser.parse_args()
+
+    truck_type = ModelInput().getTruckTypes()[0]
+    partial_results = [createPartialResult(i, args.packages_per_result, truck_type) for i in range(args.num_results)]
+    print(f"Number of partial results: {args.num_results}, packages: {args.num_results * args.packages_per_result}")
+
+    start = time.perf_counter()
+    model_result_by_copy = ModelResult()
+    for partial_result in partial_results:
+        addResultByCopy(model_result_by_copy, partial_result)
+    by_copy_time = time.perf_counter() - start
+    print(f"Merge by copy: {by_copy_time:.2f} s")
+
+    logger.setLevel(logging.INFO)
+
+    start = time.perf_counter()
+    model_result = ModelResult()
+    model_result.addResults(partial_results)
+    in_place_time = time.perf_counter() - start
+    print(f"Merge in place: {in_place_time:.2f} s")
+
+    assert(len(model_result.package_assigned_truck) == len(model_result_by_copy.package_assigned_truck))
+
+    start = time.perf_counter()
+    schedule_df = model_result.toScheduleDF()
+    print(f"Schedule of {schedule_df.shape[0]} rows: {time.perf_counter() - start:.2f} s")
+
+    print(f"Speedup: {by_copy_time / in_place_time:.1f}x")
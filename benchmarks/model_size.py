@@ -0,0 +1,65 @@
+# Copyright (c) Microsoft. All rights reserved.
+# Licensed under the MIT license.
+
+import argparse
+import os
+import time
+
+from src.core.partitioner import *
+from src.core.model import *
+
+work_dir = os.path.dirname(os.path.abspath(__file__))
+
+parser = argparse.ArgumentParser("model_size")
+parser.add_argument("--order", type=str, default=os.path.join(work_dir, "../sample_data/order_large.csv"), help="the order file")
+parser.add_argument("--distance", type=str, default=os.path.join(work_dir, "../sample_data/distance.csv"), help="the distance file")
+parser.add_argument("--max_package_num", type=int, default=30, help="the max number of packages per partition")
+
+def buildModel(model_input, sparse_pairs, aggregate=False):
+    """Function that builds the CP-SAT model of a partition without solving it.
+
+    Args:
+        model_input: the partitioned model input
+        sparse_pairs: only create the same truck variables for package pairs that can share a truck.
+        aggregate: model identical items as one package with a quantity.
+
+    Returns:
+        the built Model object.
+
+    """
+
+    model = Model()
+    model.setModelInput(model_input)
+
+    model.createVariables(sparse_pairs=sparse_pairs, aggregate=aggregate)
+    model.setConstraints()
+    model.setObjective(objective="Cost")
+
+    return model
+
+if __name__ == "__main__":
+    args = parser.parse_args()
+
+    model_input = ModelInput()
+    model_input.initInputFromFile(args.order, args.distance)
+
+    model_input_list = ProblemPartitioner().partition(model_input, args.max_package_num)
+    print(f"Number of partitions: {len(model_input_list)}")
+
+    logger.setLevel(logging.WARNING)
+
+    for sparse_pairs, aggregate in [(False, False), (True, False), (True, True)]:
+        num_pairs, num_variables, num_constraints = 0, 0, 0
+
+        start = time.perf_counter()
+        for model_input_partition in model_input_list:
+            model = buildModel(model_input_partition, sparse_pairs, aggregate)
+
+            num_pairs += len(model.same_truck_packages)
+            variables, constraints = model.countVariables()
+            num_variables += variables
+            num_constraints += constraints
+        build_time = time.perf_counter() - start
+
+        print(f"{'Sparse' if sparse_pairs else 'Dense'} pairs{', aggregated items' if aggregate else ''}: {num_pairs} pairs, {num_variables} variables, "
+              f"{num_constraints} constraints, {build_time:.2f} s to build")
@@ -0,0 +1,73 @@
+# Copyright (c) Microsoft. All rights reserved.
+# Licensed under the MIT license.
+
+import argparse
+import multiprocessing
+import os
+import time
+
+from src.core.partitioner import *
+from src.core.model import *
+
+work_dir = os.path.dirname(os.path.abspath(__file__))
+
+parser = argparse.ArgumentParser("workers")
+parser.add_argument("--order", type=str, default=os.path.join(work_dir, "../sample_data/order_large.csv"), help="the order file")
+parser.add_argument("--distance", type=str, default=os.path.join(work_dir, "../sample_data/distance.csv"), help="the distance file")
+parser.add_argument("--max_package_num", type=int, default=30, help="the max number of packages per partition")
+parser.add_argument("--num_partitions", type=int, default=64, help="the number of partitions to solve")
+parser.add_argument("--max_time_in_seconds", type=float, default=30, help="the time limit of each solve")
+parser.add_argument("--num_cores", type=int, default=multiprocessing.cpu_count(), help="the number of cores to split")
+
+def solvePartition(task):
+    """Function that solves a partition with a given number of search workers.
+
+    Args:
+        task: the tuple of model input, number of search workers and time limit
+
+    Returns:
+        the status name of the solve.
+
+    """
+
+    model_input, num_search_workers, max_time_in_seconds = task
+
+    logger.setLevel(logging.WARNING)
+
+    model = Model()
+    model.setModelInput(model_input)
+
+    model.createVariables()
+    model.setConstraints()
+    model.setObjective(objective="Cost")
+    model.solve(max_time_in_seconds=max_time_in_seconds, num_search_workers=num_search_workers)
+
+    return model.solver.StatusName()
+
+if __name__ == "__main__":
+    args = parser.parse_args()
+
+    model_input = ModelInput()
+    model_input.initInputFromFile(args.order, args.distance)
+
+    # Solve the biggest partitions, they are the ones that need the cores
+    model_input_list = ProblemPartitioner().partition(model_input, args.max_package_num)
+    model_input_list = sorted(model_input_list, key=lambda m: len(m.all_packages), reverse=True)[:args.num_partitions]
+    print(f"Number of partitions: {len(model_input_list)}, number of cores: {args.num_cores}")
+
+    print("concurrent_partitions,num_search_workers,wall_time,partitions_per_minute,optimal")
+    concurrent_partitions = 1
+    while concurrent_partitions <= args.num_cores:
+        num_search_workers = args.num_cores // concurrent_partitions
+
+        tasks = [(m, num_search_workers, args.max_time_in_seconds) for m in model_input_list]
+
+        start = time.perf_counter()
+        with multiprocessing.Pool(concurrent_partitions) as pool:
+            status_list = pool.map(solvePartition, tasks, chunksize=1)
+        wall_time = time.perf_counter() - start
+
+        print(f"{concurrent_partitions},{num_search_workers},{wall_time:.2f},"
+              f"{len(tasks) / wall_time * 60:.1f},{status_list.count('OPTIMAL')}")
+
+        concurrent_partitions *= 2
@@ -0,0 +1,189 @@
+# Copyright (c) Microsoft. All rights reserved.
+# Licensed under the MIT license.
+
+import json
+import struct
+
+from .structure import *
+from .logger import *
+
+# The first bytes of a bundle file
+bundle_magic = b'ROBUNDLE'
+
+# Arrays in a bundle start at multiples of this many bytes
+bundle_alignment = 64
+
+class PartitionBundle:
+
+    def __init__(self):
+        # The bundle file
+        self.bundle_file = None
+
+        # The row offsets of the partitions in the concatenated package table, partition i has rows offsets[i] to offsets[i+1]
+        self.offsets = None
+
+        # The position, dtype and shape of each array in the bundle file
+        self.arrays = None
+
+        # The category lists shared by all partitions
+        self.categories = None
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def write(self, bundle_file, model_input_list):
+        """Function that writes the partitions into one bundle file.
+
+        The file has a header with the position of every array, followed by the package table columns of 
+        all partitions concatenated, so the rows of one partition are contiguous in each column.
+
+        Args:
+            bundle_file: the bundle file to write
+            model_input_list: the list of partitioned model input objects
+
+        Returns:
+            None
+
+        """
+
+        package_tables = [model_input.package_table for model_input in model_input_list]
+
+        # Partitions may have their own categories, so the codes are mapped into the union of them
+        categories = {}
+        for name in PackageTable.category_names:
+            categories[name] = sorted(set(value for package_table in package_tables for value in getattr(package_table, name)))
+
+        code_maps = []
+        for package_table in package_tables:
+            code_map = {}
+            for name in PackageTable.category_names:
+                index = {value: i for i, value in enumerate(categories[name])}
+                code_map[name] = np.array([index[value] for value in getattr(package_table, name)], dtype=np.int32)
+            code_maps.append(code_map)
+
+        code_columns = {
+            'order_codes': 'orders', 
+            'material_codes': 'materials', 
+            'danger_codes': 'danger_types', 
+            'source_codes': 'locations', 
+            'destination_codes': 'locations'
+        }
+
+        arrays = {}
+        arrays['offsets'] = np.concatenate([[0], np.cumsum([len(package_table) for package_table in package_tables])]).astype(np.int64)
+
+        for name, value in vars(PackageTable()).items():
+            if name in PackageTable.category_names:
+                arrays[name] = np.array(categories[name], dtype=str)
+
+            elif name in code_columns:
+                arrays[name] = np.concatenate([np.zeros(0, dtype=np.int32)] + 
+                    [code_map[code_columns[name]][getattr(package_table, name)] for package_table, code_map in zip(package_tables, code_maps)])
+
+            else:
+                columns = [getattr(package_table, name) for package_table in package_tables]
+                columns = [column.astype(str) if column.dtype == object else column for column in columns]
+                arrays[name] = np.concatenate(columns) if len(columns) > 0 else np.zeros(0)
+
+        # Header: the position of every array, then the arrays aligned one after the other
+        header = {}
+        position = 0
+        for name, array in arrays.items():
+            header[name] = {'offset': position, 'dtype': array.dtype.str, 'shape': list(array.shape)}
+            position += -(-array.nbytes // bundle_alignment) * bundle_alignment
+
+        header_bytes = json.dumps(header).encode('utf-8')
+        data_start = -(-(len(bundle_magic) + 8 + len(header_bytes)) // bundle_alignment) * bundle_alignment
+
+        with open(bundle_file, 'wb') as f:
+            f.write(bundle_magic)
+            f.write(struct.pack('<Q', len(header_bytes)))
+            f.write(header_bytes)
+
+            for name, array in arrays.items():
+                f.seek(data_start + header[name]['offset'])
+                f.write(np.ascontiguousarray(array).tobytes())
+
+            # Pad the file to the end of the last array
+            f.truncate(data_start + position)
+
+        logger.info(f"Bundle {bundle_file} written with {len(package_tables)} partitions")
+
+    def open(self, bundle_file):
+        """Function that opens a bundle file by reading its header and memory mapping its arrays.
+
+        Args:
+            bundle_file: the bundle file written by write
+
+        Returns:
+            None
+
+        """
+
+        with open(bundle_file, 'rb') as f:
+            if f.read(len(bundle_magic)) != bundle_magic:
+                raise ValueError(f"{bundle_file} is not a partition bundle")
+
+            header_length = struct.unpack('<Q', f.read(8))[0]
+            header = json.loads(f.read(header_length).decode('utf-8'))
+
+        data_start = -(-(len(bundle_magic) + 8 + header_length) // bundle_alignment) * bundle_alignment
+
+        self.bundle_file = bundle_file
+        self.arrays = {}
+        for name, array_info in header.items():
+            shape = tuple(array_info['shape'])
+
+            # Empty arrays cannot be memory mapped
+            if np.prod(shape) == 0:
+                self.arrays[name] = np.zeros(shape, dtype=array_info['dtype'])
+            else:
+                self.arrays[name] = np.memmap(bundle_file, dtype=array_info['dtype'], mode='r', offset=data_start + array_info['offset'], shape=shape)
+
+        self.offsets = np.array(self.arrays['offsets'])
+        self.categories = {name: self.arrays[name].tolist() for name in PackageTable.category_names}
+
+    def getPackageTable(self, i):
+        """Function that reads the package table of one partition.
+
+        Args:
+            i: the index of the partition
+
+        Returns:
+            A PackageTable object with the rows of the partition only.
+
+        """
+
+        start, end = self.offsets[i], self.offsets[i+1]
+
+        package_table = PackageTable()
+        for name in vars(package_table):
+            if name in PackageTable.category_names:
+                setattr(package_table, name, self.categories[name])
+
+            else:
+                # Only the rows of this partition are read from the file
+                column = np.array(self.arrays[name][start:end])
+                setattr(package_table, name, column.astype(object) if column.dtype.kind == 'U' else column)
+
+        return package_table
+
+    def getModelInput(self, i, distance):
+        """Function that creates the model input of one partition.
+
+        Args:
+            i: the index of the partition
+            distance: the file/dataframe/DistanceMatrix that stores the pair-wise distance.
+
+        Returns:
+            the partitioned model input object
+
+        """
+
+        model_input = ModelInput()
+        model_input.package_table = self.getPackageTable(i)
+        model_input.truck_types = model_input.getTruckTypes()
+        model_input.distances = model_input.getDistances(distance)
+        model_input.all_trucks = model_input.getAllTrucks(model_input.all_packages, model_input.truck_types)
+
+        return model_input
@@ -0,0 +1,323 @@
+# Copyright (c) Microsoft. All rights reserved.
+# Licensed under the MIT license.
+
+import hashlib
+import json
+import uuid
+
+from .structure import *
+from .logger import *
+
+class FileCache:
+
+    def __init__(self, cache_dir=None, max_size=1024 * 1024 * 1024):
+        """Function that initializes a size bounded folder of cache files.
+
+        Args:
+            cache_dir: the folder of the cache, ~/.cache/route_optimization if None.
+            max_size: the max total size in bytes of the cached files.
+
+        """
+        self.cache_dir = cache_dir if cache_dir is not None else os.path.join(os.path.expanduser("~"), ".cache", "route_optimization")
+        self.max_size = max_size
+
+        self.hits = 0
+        self.misses = 0
+
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    def store(self, save, cache_file):
+        """Function that writes a file into the cache.
+
+        Args:
+            save: the function that writes the content into an open binary file
+            cache_file: the cache file
+
+        Returns:
+            None
+
+        """
+        # Write to a temporary file first, so other processes never load a partial cache file
+        tmp_file = f"{cache_file}.{os.getpid()}.tmp"
+
+        with open(tmp_file, 'wb') as f:
+            save(f)
+
+        os.replace(tmp_file, cache_file)
+
+        self.evict()
+
+    def lookup(self, name, cache_file):
+        """Function that checks if a file is cached and counts the hits and misses.
+
+        Args:
+            name: the name of what is cached, for logging
+            cache_file: the cache file
+
+        Returns:
+            True if the cache file exists.
+
+        """
+        # Another process can evict the file at any time, so a missing file is a miss whenever it is noticed
+        try:
+            # The modification time orders the cache files by last use
+            os.utime(cache_file)
+
+            self.hits += 1
+
+            logger.info(f"{type(self).__name__} hit for {name}. Hits: {self.hits}, misses: {self.misses}")
+            return True
+
+        except FileNotFoundError:
+            pass
+
+        self.misses += 1
+
+        logger.info(f"{type(self).__name__} miss for {name}. Hits: {self.hits}, misses: {self.misses}")
+        return False
+
+    def load(self, name, load, cache_file):
+        """Function that loads a cached file if it is still there.
+
+        Args:
+            name: the name of what is cached, for logging
+            load: the function that reads the cache file
+            cache_file: the cache file
+
+        Returns:
+            True if the cache file was loaded, False if it is missing or evicted before it was read.
+
+        """
+        if not self.lookup(name, cache_file):
+            return False
+
+        try:
+            load(cache_file)
+
+        except FileNotFoundError:
+            # Evicted by another process after the lookup, the hit turns into a miss
+            self.hits -= 1
+            self.misses += 1
+
+            logger.info(f"{type(self).__name__} lost {name} to eviction. Hits: {self.hits}, misses: {self.misses}")
+            return False
+
+        return True
+
+    def evict(self):
+        """Function that removes the least recently used cache files until the cache fits in max_size.
+
+        Args:
+            None
+
+        Returns:
+            None
+
+        """
+        # The files evicted by other processes meanwhile are skipped
+        cache_files = []
+        for f in os.listdir(self.cache_dir):
+            if f.endswith('.tmp'):
+                continue
+
+            try:
+                stat = os.stat(os.path.join(self.cache_dir, f))
+            except FileNotFoundError:
+                continue
+
+            cache_files.append((stat.st_mtime, stat.st_size, os.path.join(self.cache_dir, f)))
+
+        cache_files = sorted(cache_files)
+
+        total_size = sum(size for mtime, size, cache_file in cache_files)
+
+        # The newest file is kept even if it alone is bigger than max_size
+        for mtime, size, cache_file in cache_files[:-1]:
+            if total_size <= self.max_size:
+                break
+
+            total_size -= size
+
+            try:
+                os.remove(cache_file)
+            except FileNotFoundError:
+                continue
+
+            logger.info(f"{type(self).__name__} evicted {cache_file}")
+
+class InputCache(FileCache):
+
+    def getKey(self, input_file, kind):
+        """Function that gets the cache key of an input file.
+
+        Args:
+            input_file: the input file
+            kind: the kind of parsed input, order or distance
+
+        Returns:
+            the hash of the content of the file, the kind and the parser version.
+
+        """
+        sha = hashlib.sha256(f"{kind}:{parser_version}:".encode('utf-8'))
+
+        with open(input_file, 'rb') as f:
+            for block in iter(lambda: f.read(1024 * 1024), b''):
+                sha.update(block)
+
+        return sha.hexdigest()
+
+    def getPackageTable(self, order_file):
+        """Function that gets the package table of an order file from the cache, parsing it on a miss.
+
+        Args:
+            order_file: the file that stores the order
+
+        Returns:
+            A PackageTable object.
+
+        """
+        cache_file = os.path.join(self.cache_dir, f"order-{self.getKey(order_file, 'order')}.npz")
+
+        package_table = PackageTable()
+
+        if not self.load(order_file, package_table.load, cache_file):
+            package_table = ModelInput().getPackageTable(order_file)
+            self.store(package_table.save, cache_file)
+
+        return package_table
+
+    def getDistances(self, distance_file):
+        """Function that gets the distance matrix of a distance file from the cache, parsing it on a miss.
+
+        Args:
+            distance_file: the file that stores the pair-wise distance
+
+        Returns:
+            A DistanceMatrix object.
+
+        """
+        cache_file = os.path.join(self.cache_dir, f"distance-{self.getKey(distance_file, 'distance')}.npz")
+
+        distances = DistanceMatrix()
+
+        if not self.load(distance_file, distances.load, cache_file):
+            distances = ModelInput().getDistances(distance_file)
+            self.store(distances.save, cache_file)
+
+        return distances
+
+class ResultCache(FileCache):
+
+    def getSignature(self, model_input):
+        """Function that gets the canonical signature of a partition.
+
+        Packages are described relative to the earliest available time and without their ids, 
+        so partitions with the same lanes, sizes and time-of-day offsets on other dates share the signature.
+
+        Args:
+            model_input: the model input of the partition
+
+        Returns:
+            signature: the hash of the canonical partition and the model settings.
+            p_ids: the package ids in canonical order.
+            base_time: the earliest available time.
+
+        """
+        base_time = min(package.available_time for package in model_input.all_packages.values())
+
+        rows = sorted((package.source, package.destination, package.danger_type, 
+                       int(package.available_time - base_time), int(package.deadline - base_time), 
+                       float(package.area), float(package.weight), p_id) 
+                      for p_id, package in model_input.all_packages.items())
+
+        canonical = {
+            'packages': [list(row[:-1]) for row in rows],
+            'truck_types': [[truck_type.id, truck_type.area_capacity, truck_type.weight_capacity, truck_type.speed, truck_type.cost_per_km] 
+                            for truck_type in model_input.truck_types],
+            'settings': [model_input.max_time_difference_between_package, model_input.stop_time, model_input.stop_cost, model_input.max_stops]
+        }
+
+        signature = hashlib.sha256(json.dumps(canonical).encode('utf-8')).hexdigest()
+
+        return signature, [row[-1] for row in rows], base_time
+
+    def get(self, model_input):
+        """Function that gets the cached scheduling of a partition, re-timed to its dates.
+
+        Args:
+            model_input: the model input of the partition
+
+        Returns:
+            the model result if a cached scheduling is feasible for the partition, None otherwise.
+
+        """
+        signature, p_ids, base_time = self.getSignature(model_input)
+        cache_file = os.path.join(self.cache_dir, f"result-{signature}.json")
+
+        cached_result = {}
+
+        def load(cache_file):
+            with open(cache_file, 'rb') as f:
+                cached_result.update(json.loads(f.read().decode('utf-8')))
+
+        if not self.load(signature, load, cache_file):
+            return None
+
+        truck_types = {truck_type.id: truck_type for truck_type in model_input.truck_types}
+
+        model_result = ModelResult()
+        model_result.all_packages = model_input.all_packages
+
+        t_ids = []
+        for truck_type_id, route in zip(cached_result['truck_types'], cached_result['routes']):
+            truck = Truck()
+            truck.id = uuid.uuid4()
+            truck.type = truck_types[truck_type_id]
+
+            model_result.all_trucks[truck.id] = truck
+            model_result.truck_assigned_route[truck.id] = route
+            t_ids.append(truck.id)
+
+        for p_id, (truck_index, start_time, arrival_time) in zip(p_ids, cached_result['packages']):
+            t_id = t_ids[truck_index]
+
+            model_result.package_assigned_truck[p_id] = t_id
+            model_result.truck_assigned_packages[t_id].append(p_id)
+            model_result.package_start_time[p_id] = base_time + start_time
+            model_result.package_arrival_time[p_id] = base_time + arrival_time
+
+        # The distance matrix is not part of the signature, so the scheduling is checked again
+        if not model_result.isFeasible(model_input):
+            logger.info(f"Cached result {signature} is not feasible for the partition")
+            return None
+
+        return model_result
+
+    def put(self, model_input, model_result):
+        """Function that caches the scheduling of a partition.
+
+        Args:
+            model_input: the model input of the partition
+            model_result: the scheduling of the partition
+
+        Returns:
+            None
+
+        """
+        signature, p_ids, base_time = self.getSignature(model_input)
+        cache_file = os.path.join(self.cache_dir, f"result-{signature}.json")
+
+        # Trucks are numbered by their first package in canonical order
+        truck_index = {}
+        for p_id in p_ids:
+            truck_index.setdefault(model_result.package_assigned_truck[p_id], len(truck_index))
+
+        cached_result = {
+            'truck_types': [model_result.all_trucks[t_id].type.id for t_id in truck_index],
+            'routes': [list(model_result.truck_assigned_route[t_id]) for t_id in truck_index],
+            'packages': [[truck_index[model_result.package_assigned_truck[p_id]], 
+                          int(model_result.package_start_time[p_id] - base_time), 
+                          int(model_result.package_arrival_time[p_id] - base_time)] for p_id in p_ids]
+        }
+
+        self.store(lambda f: f.write(json.dumps(cached_result).encode('utf-8')), cache_file)
@@ -0,0 +1,202 @@
+# Copyright (c) Microsoft. All rights reserved.
+# Licensed under the MIT license.
+
+import collections
+import time
+
+from .structure import *
+from .reducer import *
+from .logger import *
+
+class GreedySolver:
+
+    model_input = None
+    model_result = None
+    objective_value = None
+    wall_time = None
+
+    def __init__(self):
+        self.reducer = SearchSpaceReducer()
+
+    def setModelInput(self, model_input):
+        """Function that sets the model input object.
+
+        Args:
+            model_input: the object that stores the model input.
+
+        Returns:
+            None
+
+        """
+        self.model_input = model_input
+
+    def solve(self):
+        """Function that schedules all packages by sorted first-fit across truck types.
+
+           Heuristic:
+           Packages are sorted by available time, order and destination, and each one is put
+           into the first loaded truck that can still take it, bigger truck types first when a
+           new truck is needed. The stops of a truck are visited nearest first when all deadlines
+           are met. Every truck is then downsized to its cheapest type that carries the same packages.
+
+        Args:
+            None
+
+        Returns:
+            None
+
+        """
+
+        logger.info("Solving by greedy construction.")
+
+        start = time.perf_counter()
+
+        truck_loads = []
+
+        for p_id, package in sorted(self.model_input.all_packages.items(),
+                                    key=lambda item: (item[1].available_time, item[1].order_id, item[1].destination)):
+
+            if any(self.reducer.load(truck_load, package, self.model_input, by_distance=True) for truck_load in truck_loads):
+                continue
+
+            for truck_type in self.model_input.truck_types:
+                truck_load = self.createTruckLoad(truck_type)
+
+                if self.reducer.load(truck_load, package, self.model_input, by_distance=True):
+                    truck_loads.append(truck_load)
+                    break
+
+            else:
+                logger.info(f"No truck is available for package: {p_id}")
+
+        truck_loads = [self.downsize(truck_load) for truck_load in truck_loads]
+
+        self.model_result = self.getScheduling(truck_loads)
+        self.objective_value = sum(self.getTruckCost(truck_load) for truck_load in truck_loads)
+        self.wall_time = time.perf_counter() - start
+
+        logger.info(f"Number of trucks: {len(truck_loads)}; Cost: {self.objective_value}")
+
+    def createTruckLoad(self, truck_type):
+        """Function that creates an empty truck load of a truck type.
+
+        Args:
+            truck_type: the type of the truck.
+
+        Returns:
+            the TruckLoad object, its truck gets an id in getScheduling.
+
+        """
+        truck = Truck()
+        truck.type = truck_type
+
+        truck_load = TruckLoad()
+        truck_load.truck = truck
+
+        return truck_load
+
+    def downsize(self, truck_load):
+        """Function that moves the packages of a truck to the cheapest truck type that can carry them.
+
+        Args:
+            truck_load: the loaded truck.
+
+        Returns:
+            the cheapest TruckLoad with the same packages.
+
+        """
+        best_truck_load = truck_load
+
+        for truck_type in self.model_input.truck_types:
+            if truck_type.id == truck_load.truck.type.id:
+                continue
+
+            new_truck_load = self.createTruckLoad(truck_type)
+
+            if not all(self.reducer.load(new_truck_load, package, self.model_input, by_distance=True) for package in truck_load.packages):
+                continue
+
+            if self.getTruckCost(new_truck_load) < self.getTruckCost(best_truck_load):
+                best_truck_load = new_truck_load
+
+        return best_truck_load
+
+    def getTruckCost(self, truck_load):
+        """Function that computes the cost of a truck the same way as the objective of the model.
+
+        Args:
+            truck_load: the loaded truck.
+
+        Returns:
+            the scaled cost of the truck.
+
+        """
+        truck_type = truck_load.truck.type
+        num_stops = len(truck_load.destinations)
+        travel_time = max(truck_load.arrival_time.values()) - truck_load.start_time - (num_stops - 1) * self.model_input.stop_time
+
+        return (travel_time * int(truck_type.speed * truck_type.cost_per_km / 1000 * self.model_input.cost_scale_factor) +
+            (num_stops - 1) * self.model_input.stop_cost * self.model_input.cost_scale_factor)
+
+    def getScheduling(self, truck_loads):
+        """Function that converts the loaded trucks into the scheduling.
+
+        Args:
+            truck_loads: the list of loaded trucks.
+
+        Returns:
+            model_result: the result of the solver
+
+        """
+        model_result = ModelResult()
+        model_result.all_packages = self.model_input.all_packages
+
+        if len(truck_loads) == 0:
+            return model_result
+
+        # The trucks get deterministic ids from the fleet of the used truck types
+        fleet_size = collections.Counter(truck_load.truck.type.id for truck_load in truck_loads)
+        fleet = collections.defaultdict(list)
+        for t_id, truck in self.model_input.getFleet(self.model_input.all_packages, self.model_input.truck_types, fleet_size).items():
+            fleet[truck.type.id].append(truck)
+
+        for truck_load in truck_loads:
+            truck = fleet[truck_load.truck.type.id].pop(0)
+            t_id = truck.id
+
+            model_result.all_trucks[t_id] = truck
+            model_result.truck_assigned_route[t_id] = [truck_load.packages[0].source] + truck_load.destinations
+
+            for package in truck_load.packages:
+                p_id = (package.order_id, package.material_id, package.item_id)
+
+                model_result.package_assigned_truck[p_id] = t_id
+                model_result.truck_assigned_packages[t_id].append(p_id)
+                model_result.package_start_time[p_id] = truck_load.start_time
+                model_result.package_arrival_time[p_id] = truck_load.arrival_time[package.destination]
+
+        return model_result
+
+    def getModelResult(self):
+        """Function that gets the route schedule after the problem is solved.
+
+        Args:
+            None
+
+        Returns:
+            model_result: the result of the solver
+
+        """
+        return self.model_result
+
+    def getObjectiveValue(self):
+        """Function that gets the total cost after the problem is solved.
+
+        Args:
+            None
+
+        Returns:
+            the objective value, in the same scale as Model.getObjectiveValue.
+
+        """
+        return self.objective_value
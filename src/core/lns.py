@@ -0,0 +1,214 @@
+# Copyright (c) Microsoft. All rights reserved.
+# Licensed under the MIT license.
+
+import copy
+import random
+import time
+import uuid
+
+from .structure import *
+from .model import *
+from .logger import *
+
+class LargeNeighborhoodSearch:
+
+    def __init__(self, max_package_num=30, max_time_in_seconds=10, num_emptiest_trucks=10, seed=0):
+        """Function that initializes the search.
+
+        Args:
+            max_package_num: the max number of packages of a neighborhood.
+            max_time_in_seconds: the maximum search time of the solver per neighborhood.
+            num_emptiest_trucks: the number of emptiest trucks a neighborhood of the emptiest trucks starts from.
+            seed: the seed of the random neighborhood selection.
+
+        """
+        self.max_package_num = max_package_num
+        self.max_time_in_seconds = max_time_in_seconds
+        self.num_emptiest_trucks = num_emptiest_trucks
+        self.random = random.Random(seed)
+
+    def improve(self, model_input, model_result, time_budget=60):
+        """Function that improves a scheduling of the full problem by large neighborhood search.
+
+           Each iteration selects a neighborhood of trucks, rebuilds the model for their packages only,
+           with the current scheduling as search hints, and keeps the new scheduling if it is cheaper.
+
+        Args:
+            model_input: the object that stores the model input of the full problem.
+            model_result: the scheduling to start from, it is not changed.
+            time_budget: the wall clock budget in seconds for all iterations.
+
+        Returns:
+            model_result: the improved scheduling.
+
+        """
+
+        start = time.perf_counter()
+
+        # The search owns its scheduling, the trucks of accepted neighborhoods are replaced in place
+        current_result = ModelResult()
+        current_result.addResult(model_result)
+
+        cost = current_result.getCost(model_input)
+        logger.info(f"Large neighborhood search starts from cost: {cost}")
+
+        iteration = 0
+        num_improvements = 0
+
+        while len(current_result.truck_assigned_packages) > 0:
+            remaining_time = time_budget - (time.perf_counter() - start)
+            if remaining_time < 1:
+                break
+
+            t_ids = self.selectNeighborhood(model_input, current_result, iteration)
+            iteration += 1
+
+            neighborhood_result = self.solveNeighborhood(model_input, current_result, t_ids, iteration, min(self.max_time_in_seconds, remaining_time))
+            if neighborhood_result is None:
+                continue
+
+            old_cost = sum(current_result.getTruckCost(t_id, model_input) for t_id in t_ids)
+            new_cost = neighborhood_result.getCost(model_input)
+
+            if new_cost < old_cost:
+                self.replaceTrucks(current_result, t_ids, neighborhood_result)
+
+                cost += new_cost - old_cost
+                num_improvements += 1
+
+                logger.debug(f"Iteration {iteration} improves the cost by {old_cost - new_cost}")
+
+        logger.info(f"Number of iterations: {iteration}; Number of improvements: {num_improvements}; Cost: {cost}")
+
+        return current_result
+
+    def selectNeighborhood(self, model_input, model_result, iteration):
+        """Function that selects the trucks whose packages are scheduled again.
+
+           The neighborhood starts from one of the emptiest trucks on even iterations and from
+           a random truck on odd ones. It grows with the trucks of the same source whose available
+           times are close enough to share a truck, the emptiest ones or the closest in time first,
+           until it has max_package_num packages.
+
+        Args:
+            model_input: the object that stores the model input.
+            model_result: the current scheduling.
+            iteration: the number of the iteration.
+
+        Returns:
+            the list of truck ids.
+
+        """
+
+        def get_fill_rate(t_id):
+            truck_type = model_result.all_trucks[t_id].type
+            packages = [model_result.all_packages[p_id] for p_id in model_result.truck_assigned_packages[t_id]]
+
+            return max(sum(p.area for p in packages) / truck_type.area_capacity, sum(p.weight for p in packages) / truck_type.weight_capacity)
+
+        def get_available_times(t_id):
+            available_times = [model_result.all_packages[p_id].available_time for p_id in model_result.truck_assigned_packages[t_id]]
+
+            return min(available_times), max(available_times)
+
+        t_ids = list(model_result.truck_assigned_packages)
+        fill_rate = {t_id: get_fill_rate(t_id) for t_id in t_ids}
+
+        emptiest = iteration % 2 == 0
+
+        if emptiest:
+            seed_t_id = self.random.choice(sorted(t_ids, key=lambda t_id: fill_rate[t_id])[:self.num_emptiest_trucks])
+        else:
+            seed_t_id = self.random.choice(t_ids)
+
+        source = model_result.all_packages[model_result.truck_assigned_packages[seed_t_id][0]].source
+        min_available_time, max_available_time = get_available_times(seed_t_id)
+
+        # The trucks whose packages could share a truck with the packages of the first one
+        candidates = []
+        for t_id in t_ids:
+            if t_id == seed_t_id or model_result.all_packages[model_result.truck_assigned_packages[t_id][0]].source != source:
+                continue
+
+            truck_min_available_time, truck_max_available_time = get_available_times(t_id)
+            if (truck_min_available_time > max_available_time + model_input.max_time_difference_between_package or
+                truck_max_available_time < min_available_time - model_input.max_time_difference_between_package):
+                continue
+
+            if emptiest:
+                candidates.append((fill_rate[t_id], t_id))
+            else:
+                candidates.append((abs(truck_min_available_time - min_available_time), t_id))
+
+        neighborhood = [seed_t_id]
+        num_packages = len(model_result.truck_assigned_packages[seed_t_id])
+
+        for key, t_id in sorted(candidates, key=lambda x: x[0]):
+            if num_packages + len(model_result.truck_assigned_packages[t_id]) > self.max_package_num:
+                continue
+
+            neighborhood.append(t_id)
+            num_packages += len(model_result.truck_assigned_packages[t_id])
+
+        return neighborhood
+
+    def solveNeighborhood(self, model_input, model_result, t_ids, iteration, max_time_in_seconds):
+        """Function that schedules the packages of a neighborhood again.
+
+        The model can use the trucks of the neighborhood and one more truck of each type.
+
+        Args:
+            model_input: the object that stores the model input.
+            model_result: the current scheduling.
+            t_ids: the trucks of the neighborhood.
+            iteration: the number of the iteration, the ids of the new trucks are derived from it.
+            max_time_in_seconds: the maximum search time of the solver.
+
+        Returns:
+            the scheduling of the neighborhood, None if the solver finds no feasible one.
+
+        """
+
+        neighborhood_input = copy.copy(model_input)
+        neighborhood_input.all_packages = {p_id: model_input.all_packages[p_id] for t_id in t_ids for p_id in model_result.truck_assigned_packages[t_id]}
+        neighborhood_input.all_trucks = {t_id: model_result.all_trucks[t_id] for t_id in t_ids}
+
+        first_package_id = next(iter(neighborhood_input.all_packages))
+        for truck_type in model_input.truck_types:
+            truck = Truck()
+            truck.id = uuid.uuid5(uuid.NAMESPACE_OID, f'lns/{first_package_id}/{iteration}/{truck_type.id}')
+            truck.type = truck_type
+
+            neighborhood_input.all_trucks[truck.id] = truck
+
+        model, wall_time = solveModelInput(neighborhood_input, max_time_in_seconds, model_result=model_result)
+
+        if model.solver.StatusName() not in ['OPTIMAL', 'FEASIBLE']:
+            return None
+
+        neighborhood_result = model.getModelResult()
+
+        if not neighborhood_result.isFeasible(neighborhood_input):
+            return None
+
+        return neighborhood_result
+
+    def replaceTrucks(self, model_result, t_ids, neighborhood_result):
+        """Function that replaces the trucks of a neighborhood by its new scheduling.
+
+        Args:
+            model_result: the current scheduling, updated in place.
+            t_ids: the trucks of the neighborhood.
+            neighborhood_result: the new scheduling of the packages of the neighborhood.
+
+        Returns:
+            None
+
+        """
+        model_result.removeTrucks(t_ids)
+
+        # Only the used trucks are kept
+        neighborhood_result = copy.copy(neighborhood_result)
+        neighborhood_result.all_trucks = {t_id: neighborhood_result.all_trucks[t_id] for t_id in neighborhood_result.truck_assigned_packages}
+
+        model_result.addResult(neighborhood_result)
@@ -1,7 +1,16 @@
 # Copyright (c) Microsoft. All rights reserved.
 # Licensed under the MIT license.
 
+import collections
+import contextlib
+import copy
+import os
+import shutil
+import tempfile
+import uuid
+
 from .structure import *
+from .greedy import *
 
 class ResultMerger:
 
@@ -14,6 +23,7 @@ class ResultMerger:
         Args:
             model_input: the object that stores the model input.
             model_result_list: the list of partial results in DataFrame.
+            optimized: consolidate the underfilled trucks of the partial results, see optimize.
 
         Returns:
             model_result: the final model result after merged in DataFrame.
@@ -23,19 +33,251 @@ class ResultMerger:
         if not optimized:
             return pd.concat(model_result_list)
         else:
-            return self.optimize(model_input, model_result_list)
+            model_result, cost_delta = self.optimize(model_input, model_result_list)
+            logger.info(f"Cost change of the merged result by optimization: {cost_delta}")
+
+            return model_result
+
+    def mergeSorted(self, schedule_chunks, schedule_file, chunk_size=100000, tmp_dir=None, max_fan_in=64):
+        """Function that merges partial results into a csv file sorted by Schedule_ID, Order_ID and Material_ID with bounded memory.
+
+           Each chunk is sorted into a run file, then the run files are merged k-way, at most max_fan_in 
+           at a time, so the number of open files stays bounded. The runs are merged block by block: a block 
+           of each run is read, and all rows up to the smallest last key of the blocks are sorted and written. 
+           About chunk_size rows are in memory at any time. The values are compared as strings, see getSortKey.
+
+        Args:
+            schedule_chunks: an iterable of DataFrame chunks of the partial results, read with all columns as strings.
+            schedule_file: the csv file to write.
+            chunk_size: the max number of rows of a run and of all blocks being merged.
+            tmp_dir: the folder of the run files, a temporary folder that is removed afterwards if None.
+            max_fan_in: the max number of run files merged at a time.
+
+        Returns:
+            the number of rows written.
+
+        """
+
+        run_dir = tempfile.mkdtemp(dir=tmp_dir)
+
+        try:
+            # Step 1 - Sort each chunk into a run file
+            run_files = []
+            for schedule_df in schedule_chunks:
+                for start in range(0, schedule_df.shape[0], chunk_size):
+                    run_df = schedule_df.iloc[start:start + chunk_size]
+                    run_df = run_df.iloc[np.argsort(self.getSortKey(run_df), kind='stable')]
+
+                    run_file = os.path.join(run_dir, f"run_{len(run_files)}.csv")
+                    run_df[schedule_columns].to_csv(run_file, index=False)
+                    run_files.append(run_file)
+
+            logger.info(f"Number of sorted runs: {len(run_files)}")
+
+            # Step 2 - Merge the runs into fewer and longer runs until one pass is left
+            num_runs = len(run_files)
+            while len(run_files) > max_fan_in:
+                merged_run_files = []
+                for start in range(0, len(run_files), max_fan_in):
+                    run_file = os.path.join(run_dir, f"run_{num_runs}.csv")
+                    num_runs += 1
+
+                    self.mergeRuns(run_files[start:start + max_fan_in], run_file, chunk_size)
+                    merged_run_files.append(run_file)
+
+                    for merged_run_file in run_files[start:start + max_fan_in]:
+                        os.remove(merged_run_file)
+
+                run_files = merged_run_files
+
+            # Step 3 - Merge the last runs into the schedule
+            return self.mergeRuns(run_files, schedule_file, chunk_size)
+
+        finally:
+            shutil.rmtree(run_dir, ignore_errors=True)
 
-        
+    def mergeRuns(self, run_files, schedule_file, chunk_size=100000):
+        """Function that merges sorted run files k-way into a sorted csv file.
+
+        Args:
+            run_files: the list of run files sorted by getSortKey.
+            schedule_file: the csv file to write.
+            chunk_size: the max number of rows of all blocks being merged.
+
+        Returns:
+            the number of rows written.
+
+        """
+
+        block_size = max(1, chunk_size // max(1, len(run_files)))
+
+        pd.DataFrame(columns=schedule_columns).to_csv(schedule_file, index=False)
+        num_rows = 0
+
+        # The readers are closed when the merge ends or fails
+        with contextlib.ExitStack() as stack:
+            runs = []
+            for run_file in run_files:
+                run = stack.enter_context(pd.read_csv(run_file, dtype=str, keep_default_na=False, chunksize=block_size))
+
+                block = next(run, None)
+                if block is not None:
+                    runs.append([run, block])
+
+            while len(runs) > 0:
+                keys = [self.getSortKey(block) for run, block in runs]
+
+                # Every row up to the smallest last key is before all rows not read yet
+                frontier = min(key[-1] for key in keys)
+
+                merged_blocks = []
+                for i, (run, block) in enumerate(runs):
+                    end = np.searchsorted(keys[i], frontier, side='right')
+                    merged_blocks.append(block.iloc[:end])
+                    runs[i][1] = block.iloc[end:]
+
+                merged_df = pd.concat(merged_blocks)
+                merged_df = merged_df.iloc[np.argsort(self.getSortKey(merged_df), kind='stable')]
+                merged_df[schedule_columns].to_csv(schedule_file, mode='a', header=False, index=False)
+                num_rows += merged_df.shape[0]
+
+                # Read the next block of the runs being used up
+                for i in range(len(runs)):
+                    if runs[i][1].shape[0] == 0:
+                        runs[i][1] = next(runs[i][0], runs[i][1])
+
+                runs = [[run, block] for run, block in runs if block.shape[0] > 0]
+
+        return num_rows
+
+    def getSortKey(self, schedule_df):
+        """Function that gets the sort key of the rows of a route schedualing.
+
+        Args:
+            schedule_df: the DataFrame that stores the route schedualing.
 
-    def optimize(self, model_input, model_result_list):
+        Returns:
+            A numpy array of strings that sort like (Schedule_ID, Order_ID, Material_ID) compared as strings, 
+            so numeric ids sort lexicographically, e.g. "10" before "9".
+
+        """
+
+        # The separator sorts before any character, so the joined strings sort like the tuples
+        return (schedule_df['Schedule_ID'].astype(str) + '\x00' + schedule_df['Order_ID'].astype(str) + '\x00' + 
+            schedule_df['Material_ID'].astype(str)).to_numpy()
+
+    def optimize(self, model_input, model_result_list, max_capacity_rate=0.5):
         """Function that further optimizes the result from a list of partial results.
+
+           Heuristic:
+           The trucks under max_capacity_rate are indexed by source, danger type and time bucket, 
+           where a bucket is as long as the max time difference between packages of a truck. The 
+           packages of the trucks in a bucket are packed again by the GreedySolver, and replace 
+           them if it is cheaper. A second pass shifts the buckets by half their length, so that 
+           trucks on both sides of a bucket boundary also meet.
            
         Args:
             model_input: the object that stores the model input.
             model_result_list: the list of partial results in DataFrame.
+            max_capacity_rate: the capacity rate under which a truck is underfilled.
 
         Returns:
             model_result: the model result after optimized in DataFrame.
+            cost_delta: the change of the total cost, negative when the cost is reduced.
 
         """
-        pass
+
+        schedule_df = pd.concat(model_result_list)
+
+        model_result = ModelResult()
+        model_result.initFromScheduleDF(schedule_df, model_input)
+
+        # The capacity rate is the same on every row of a truck
+        capacity_rate = schedule_df.groupby('Schedule_ID', sort=False)['Capacity_Rate'].first()
+        underfilled_trucks = set(capacity_rate.index[capacity_rate.to_numpy() < max_capacity_rate])
+
+        logger.info(f"Number of underfilled trucks: {len(underfilled_trucks)} of {len(capacity_rate)}")
+
+        bucket_length = model_input.max_time_difference_between_package
+        cost_delta = 0
+
+        for offset in [0, bucket_length // 2]:
+            buckets = collections.defaultdict(list)
+
+            # The trucks are visited in the order of the scheduling, so the result is deterministic
+            for t_id in [t_id for t_id in model_result.truck_assigned_packages if t_id in underfilled_trucks]:
+                packages = [model_result.all_packages[p_id] for p_id in model_result.truck_assigned_packages[t_id]]
+
+                # A truck carries at most one danger type
+                danger_types = set(p.danger_type for p in packages) - {'non_danger'}
+                danger_type = danger_types.pop() if len(danger_types) > 0 else 'non_danger'
+
+                # Trucks whose packages span two buckets are left for the shifted pass
+                bucket = (min(p.available_time for p in packages) + offset) // bucket_length
+                if (max(p.available_time for p in packages) + offset) // bucket_length != bucket:
+                    continue
+
+                buckets[packages[0].source, danger_type, bucket].append(t_id)
+
+            for key, t_ids in buckets.items():
+                if len(t_ids) > 1:
+                    cost_delta += self.consolidate(model_input, model_result, t_ids, underfilled_trucks, max_capacity_rate, offset)
+
+        return model_result.toScheduleDF(), cost_delta
+
+    def consolidate(self, model_input, model_result, t_ids, underfilled_trucks, max_capacity_rate, key):
+        """Function that packs the packages of some trucks again and keeps the new trucks if they are cheaper.
+
+        Args:
+            model_input: the object that stores the model input.
+            model_result: the merged scheduling, updated in place.
+            t_ids: the trucks to consolidate.
+            underfilled_trucks: the set of underfilled trucks, updated in place.
+            max_capacity_rate: the capacity rate under which a truck is underfilled.
+            key: the key the ids of the new trucks are derived from, unique for each pass.
+
+        Returns:
+            the change of the total cost.
+
+        """
+
+        consolidated_input = copy.copy(model_input)
+        consolidated_input.all_packages = {p_id: model_input.all_packages[p_id] for t_id in t_ids for p_id in model_result.truck_assigned_packages[t_id]}
+
+        solver = GreedySolver()
+        solver.setModelInput(consolidated_input)
+        solver.solve()
+
+        consolidated_result = solver.getModelResult()
+
+        if len(consolidated_result.package_assigned_truck) < len(consolidated_input.all_packages):
+            return 0
+
+        cost_delta = consolidated_result.getCost(model_input) - sum(model_result.getTruckCost(t_id, model_input) for t_id in t_ids)
+
+        if cost_delta >= 0:
+            return 0
+
+        model_result.removeTrucks(t_ids)
+        underfilled_trucks.difference_update(t_ids)
+
+        # The new trucks get ids that no partial result uses
+        for t_id, p_ids in consolidated_result.truck_assigned_packages.items():
+            truck = Truck()
+            truck.id = uuid.uuid5(uuid.NAMESPACE_OID, f'merge/{key}/{t_id}')
+            truck.type = consolidated_result.all_trucks[t_id].type
+
+            model_result.all_trucks[truck.id] = truck
+            model_result.truck_assigned_route[truck.id] = consolidated_result.truck_assigned_route[t_id]
+            model_result.truck_assigned_packages[truck.id] = p_ids
+
+            for p_id in p_ids:
+                model_result.package_assigned_truck[p_id] = truck.id
+                model_result.package_start_time[p_id] = consolidated_result.package_start_time[p_id]
+                model_result.package_arrival_time[p_id] = consolidated_result.package_arrival_time[p_id]
+
+            packages = [model_result.all_packages[p_id] for p_id in p_ids]
+            if max(sum(p.area for p in packages) / truck.type.area_capacity, sum(p.weight for p in packages) / truck.type.weight_capacity) < max_capacity_rate:
+                underfilled_trucks.add(truck.id)
+
+        return cost_delta
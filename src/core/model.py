@@ -3,18 +3,95 @@
 
 from ortools.sat.python import cp_model
 import collections
+import copy
 
 from .structure import *
+from .reducer import *
 from .logger import * 
 
 work_dir = os.path.dirname(os.path.abspath(__file__))
 
+# Model size, in truck assignment and same truck variables, below which one search worker is used
+small_model_size = 500
+# Model size from which all cores given to the partition are used
+large_model_size = 5000
+
+def solveModelInput(model_input, max_time_in_seconds=120, num_search_workers=None, concurrent_partitions=1, 
+    aggregate=False, symmetry_breaking=False, fleet_sizing=False, model_result=None):
+    """Function that builds and solves the model of a model input.
+
+    With fleet sizing, the trucks of the model input are replaced by the fleet of 
+    SearchSpaceReducer.getFleetSize. The fleet is doubled and the model solved again 
+    while the model is proven infeasible and time is left.
+
+    The items of an aggregated group share one truck type, stop and arrival time on all 
+    the trucks they are spread over, so an infeasible aggregated model is solved again item by item.
+
+    Args:
+        model_input: the object that stores the model input.
+        max_time_in_seconds: the maximum search time of all solves.
+        num_search_workers: the number of parallel search workers, decided by the model size if None.
+        concurrent_partitions: the number of partitions being solved at the same time on this node.
+        aggregate: model identical items as one package with a quantity.
+        symmetry_breaking: order the interchangeable trucks of the same type.
+        fleet_sizing: solve with the sized fleet instead of the trucks of the model input.
+        model_result: the scheduling set as search hints, the greedy scheduling is used if None.
+
+    Returns:
+        model: the solved Model object.
+        wall_time: the wall time in seconds of all solves.
+
+    """
+
+    fleet_size = SearchSpaceReducer().getFleetSize(model_input) if fleet_sizing else None
+    wall_time = 0
+
+    while True:
+        model_input_fleet = model_input
+
+        if fleet_size is not None:
+            logger.info(f"Fleet size: {fleet_size}")
+
+            model_input_fleet = copy.copy(model_input)
+            model_input_fleet.all_trucks = model_input.getFleet(model_input.all_packages, model_input.truck_types, fleet_size)
+
+        model = Model()
+        model.setModelInput(model_input_fleet)
+
+        model.createVariables(aggregate=aggregate)
+        model.setConstraints(symmetry_breaking)
+        model.setObjective(objective="Cost")
+        model.setHints(model_result)
+        model.solve(max_time_in_seconds - wall_time, num_search_workers, concurrent_partitions)
+
+        wall_time += model.solver.WallTime()
+
+        if aggregate and model.solver.StatusName() == 'INFEASIBLE' and wall_time < max_time_in_seconds:
+            logger.info("The aggregated model is infeasible, solving the items one by one.")
+            aggregate = False
+            continue
+
+        if fleet_size is None or model.solver.StatusName() != 'INFEASIBLE' or wall_time >= max_time_in_seconds:
+            return model, wall_time
+
+        # No truck type needs more trucks than packages
+        num_packages = len(model_input.all_packages)
+        fleet_size_grown = {truck_type_id: min(max(1, size * 2), num_packages) for truck_type_id, size in fleet_size.items()}
+
+        if fleet_size_grown == fleet_size:
+            return model, wall_time
+
+        logger.info("The fleet is too small, growing the fleet.")
+        fleet_size = fleet_size_grown
+
 class Model:
 
     model = None
     solver = None
     model_input = None
     model_result = None
+    first_solution_time = None
+    symmetry_breaking = False
 
     def __init__(self):
         self.model = cp_model.CpModel()
@@ -38,11 +115,11 @@ class Model:
             logger.info("No valid objective is set. The valid objectives are: Cost")
             sys.exit(1)
 
-    def setConstraints(self):
+    def setConstraints(self, symmetry_breaking=False):
         """Function that sets the constraints of the model.
 
         Args:
-            None
+            symmetry_breaking: order the interchangeable trucks of the same type, see setSymmetryBreakingConstraint.
             
         Returns:
             None
@@ -57,23 +134,98 @@ class Model:
         self.setTruckVolumeCapacityConstraint()
         self.setTruckWeightCapacityConstraint()
 
-    def setHints(self, *args):
+        self.symmetry_breaking = symmetry_breaking
+        if symmetry_breaking:
+            self.setSymmetryBreakingConstraint()
+
+    def setHints(self, model_result=None):
         """Function that sets the search hints of the model.
 
         Args:
-            None
+            model_result: a feasible scheduling to start the search from, 
+                the greedy scheduling of SearchSpaceReducer.assignGreedy is used if None.
             
         Returns:
             None
 
         """
-        pass
 
-    def solve(self, max_time_in_seconds=120):
+        logger.info("Setting search hints.")
+
+        if model_result is None:
+            model_result = SearchSpaceReducer().assignGreedy(self.item_model_input)
+
+        # The trucks of the hint are reordered the same way as the trucks of the model
+        truck_map = self.getSymmetricTruckMap(model_result) if self.symmetry_breaking else {}
+
+        # The number of items of each package on each truck
+        package_truck_count = {}
+
+        for p_id, items in self.package_groups.items():
+            if any(item not in model_result.package_assigned_truck for item in items):
+                continue
+
+            truck_count = collections.Counter(truck_map.get(model_result.package_assigned_truck[item], model_result.package_assigned_truck[item]) for item in items)
+            if any(t_id not in self.model_input.all_trucks for t_id in truck_count):
+                continue
+
+            package_truck_count[p_id] = truck_count
+
+            for t_id in self.model_input.all_trucks:
+                self.model.AddHint(self.truck_to_packages[t_id, p_id], truck_count[t_id] > 0)
+
+                if self.truck_package_count[t_id, p_id] is not self.truck_to_packages[t_id, p_id]:
+                    self.model.AddHint(self.truck_package_count[t_id, p_id], truck_count[t_id])
+
+            # The route starts with the source, so the index of the destination is the stop
+            t_id = model_result.package_assigned_truck[p_id]
+            self.model.AddHint(self.package_stops[p_id], model_result.truck_assigned_route[t_id].index(self.model_input.all_packages[p_id].destination))
+            self.model.AddHint(self.package_start_time[p_id], model_result.package_start_time[p_id])
+            self.model.AddHint(self.package_arrival_time[p_id], model_result.package_arrival_time[p_id])
+
+        for p_id_1, p_id_2 in self.same_truck_packages:
+            if p_id_1 in package_truck_count and p_id_2 in package_truck_count:
+                self.model.AddHint(self.same_truck_packages[p_id_1, p_id_2], 
+                    len(package_truck_count[p_id_1].keys() & package_truck_count[p_id_2].keys()) > 0)
+
+    def getSymmetricTruckMap(self, model_result):
+        """Function that maps the trucks of a scheduling to the trucks of the model in the order of setSymmetryBreakingConstraint.
+
+        Args:
+            model_result: the scheduling that uses the trucks of the model input.
+            
+        Returns:
+            a dict from the truck id in the scheduling to the truck id in the model
+
+        """
+        trucks_with_type = collections.defaultdict(list)
+        for t_id, truck in self.model_input.all_trucks.items():
+            trucks_with_type[truck.type.id].append(t_id)
+
+        used_trucks_with_type = collections.defaultdict(list)
+        for t_id, p_ids in model_result.truck_assigned_packages.items():
+            if t_id not in self.model_input.all_trucks or len(p_ids) == 0:
+                continue
+
+            load = (sum(model_result.all_packages[p_id].area for p_id in p_ids), sum(model_result.all_packages[p_id].weight for p_id in p_ids))
+            used_trucks_with_type[self.model_input.all_trucks[t_id].type.id].append((load, t_id))
+
+        truck_map = {}
+        for truck_type_id, used_trucks in used_trucks_with_type.items():
+            used_trucks = sorted(used_trucks, key=lambda x: x[0], reverse=True)
+
+            for (load, t_id), model_t_id in zip(used_trucks, trucks_with_type[truck_type_id]):
+                truck_map[t_id] = model_t_id
+
+        return truck_map
+
+    def solve(self, max_time_in_seconds=120, num_search_workers=None, concurrent_partitions=1):
         """Function that solves the optimization problem.
 
         Args:
             max_time_in_seconds: the maximum search time of the solver.
+            num_search_workers: the number of parallel search workers, decided by getNumSearchWorkers if None.
+            concurrent_partitions: the number of partitions being solved at the same time on this node.
             
         Returns:
             None
@@ -86,20 +238,34 @@ class Model:
             def __init__(self):
                 cp_model.CpSolverSolutionCallback.__init__(self)
                 self.__solution_count = 0
+                self.__first_solution_time = None
 
             def on_solution_callback(self):
                 self.__solution_count += 1
 
+                if self.__first_solution_time is None:
+                    self.__first_solution_time = self.WallTime()
+
             def solution_count(self):
                 return self.__solution_count
 
-        # self.solver.parameters.num_search_workers = max(1, multiprocessing.cpu_count()-1)
-        self.solver.parameters.num_search_workers = 1
+            def first_solution_time(self):
+                return self.__first_solution_time
+
+        if num_search_workers is None:
+            num_search_workers = self.getNumSearchWorkers(concurrent_partitions, multiprocessing.cpu_count())
+
+        logger.info(f"Number of search workers: {num_search_workers}")
+
+        self.solver.parameters.num_search_workers = num_search_workers
         self.solver.parameters.max_time_in_seconds = max_time_in_seconds # Solver will stop after this number of seconds
 
         printer = SolutionPrinter()
         status = self.solver.SolveWithSolutionCallback(self.model, printer)
 
+        # Wall time in seconds until the first solution, None if no solution is found
+        self.first_solution_time = printer.first_solution_time()
+
         # Limit the number of search
         # status = self.solver.SearchForAllSolutions(self.model, logger.infoer)
 
@@ -125,6 +291,37 @@ class Model:
         elif status == cp_model.UNKNOWN:
             logger.info("The status of the model is unknown because a search limit was reached.")
 
+    def getNumSearchWorkers(self, concurrent_partitions=1, num_cores=1):
+        """Function that decides how many parallel search workers the solver uses.
+
+        Small models are solved fastest by a single worker, while bigger models benefit 
+        from the portfolio of parallel workers. The cores of the node are shared evenly 
+        by the partitions being solved at the same time.
+
+        Args:
+            concurrent_partitions: the number of partitions being solved at the same time on this node.
+            num_cores: the number of cores of this node.
+            
+        Returns:
+            the number of search workers
+
+        """
+        cores_per_partition = max(1, num_cores // max(1, concurrent_partitions))
+
+        # The model size is dominated by the truck assignment and the same truck variables
+        model_size = len(self.truck_to_packages) + len(self.same_truck_packages)
+
+        if model_size < small_model_size:
+            num_search_workers = 1
+
+        elif model_size < large_model_size:
+            num_search_workers = 8
+
+        else:
+            num_search_workers = cores_per_partition
+
+        return min(num_search_workers, cores_per_partition)
+
     def setModelInput(self, model_input):
         """Function that sets the model input object.
 
@@ -149,18 +346,24 @@ class Model:
         """
 
         package_assigned_truck = {}
-    
-        for key in self.truck_to_packages:
-            
-            if self.solver.Value(self.truck_to_packages[key]) == 1:
-                t_id, p_id = key
-                package_assigned_truck[p_id] = t_id
+        item_package = {}
+
+        # The items of a package are handed out to its trucks by their counts
+        for p_id, items in self.package_groups.items():
+            remaining_items = iter(items)
+
+            for t_id in self.model_input.all_trucks:
+                for i in range(self.solver.Value(self.truck_package_count[t_id, p_id])):
+                    item = next(remaining_items)
+                    package_assigned_truck[item] = t_id
+                    item_package[item] = p_id
 
         truck_assigned_packages = collections.defaultdict(list)
         
         for p_id, t_id in package_assigned_truck.items():
             truck_assigned_packages[t_id].append(p_id)
 
+        all_packages = self.item_model_input.all_packages
         
         truck_assigned_route = collections.defaultdict(list)
         for t_id in truck_assigned_packages:
@@ -171,12 +374,12 @@ class Model:
             for p_id in truck_assigned_packages[t_id]:
                 
                 # Assumption: All packages have the same source
-                source = self.model_input.all_packages[p_id].source
-                package_stop = self.solver.Value(self.package_stops[p_id])
+                source = all_packages[p_id].source
+                package_stop = self.solver.Value(self.package_stops[item_package[p_id]])
                 if package_stop in stops:
-                    assert(self.model_input.all_packages[p_id].destination == stops[package_stop])
+                    assert(all_packages[p_id].destination == stops[package_stop])
                 else:
-                    stops[package_stop] = self.model_input.all_packages[p_id].destination
+                    stops[package_stop] = all_packages[p_id].destination
 
             route = [(stop, destination) for stop, destination in stops.items()] 
 
@@ -186,16 +389,16 @@ class Model:
 
         package_start_time = {}
 
-        for key in self.package_start_time:
-            package_start_time[key] = self.solver.Value(self.package_start_time[key])
+        for p_id in package_assigned_truck:
+            package_start_time[p_id] = self.solver.Value(self.package_start_time[item_package[p_id]])
 
         package_arrival_time = {}
 
-        for key in self.package_arrival_time:
-            package_arrival_time[key] = self.solver.Value(self.package_arrival_time[key])
+        for p_id in package_assigned_truck:
+            package_arrival_time[p_id] = self.solver.Value(self.package_arrival_time[item_package[p_id]])
       
         self.model_result = ModelResult()
-        self.model_result.all_packages = self.model_input.all_packages
+        self.model_result.all_packages = all_packages
         self.model_result.all_trucks = self.model_input.all_trucks
         self.model_result.package_assigned_truck = package_assigned_truck
         self.model_result.truck_assigned_route = truck_assigned_route
@@ -217,11 +420,13 @@ class Model:
         """
         return self.solver.ObjectiveValue()
 
-    def createVariables(self):
+    def createVariables(self, sparse_pairs=False, aggregate=False):
         """Function that creates necessary global decision variables.
 
         Args:
-            None
+            sparse_pairs: only create the same truck variables for package pairs that can share a truck, 
+                the partitions of partitionByComponent leave few pairs to drop, see benchmarks/model_size.py.
+            aggregate: model identical items as one package with a quantity, see getPackageGroups.
             
         Returns:
             None
@@ -230,6 +435,16 @@ class Model:
 
         logger.info("Creating variables")
 
+        # The model works on one package per group, the items are expanded back in getModelResult
+        self.item_model_input = self.model_input
+        self.package_groups = self.getPackageGroups(aggregate)
+
+        if aggregate:
+            self.model_input = copy.copy(self.item_model_input)
+            self.model_input.all_packages = {p_id: self.item_model_input.all_packages[p_id] for p_id in self.package_groups}
+
+            logger.info(f"Aggregated {len(self.item_model_input.all_packages)} items into {len(self.package_groups)} packages")
+
         def get_min_max_start_time(all_packages):
             
             min_start = float('inf')
@@ -259,8 +474,9 @@ class Model:
         self.max_deadline = get_max_deadline(self.model_input.all_packages)
 
 
-        # The truck to package assignment variables
+        # The truck to package assignment variables, and the number of items of the package on the truck
         truck_to_packages = {}
+        truck_package_count = {}
         package_stops = {}
 
         all_orders = set()
@@ -276,21 +492,27 @@ class Model:
                 assignment_var = self.model.NewBoolVar(f'truck_to_package_assignment[{t_id}, {p_id}]')
                 
                 truck_to_packages[t_id, p_id] = assignment_var 
+
+                quantity = len(self.package_groups[p_id])
+                if quantity > 1:
+                    count_var = self.model.NewIntVar(0, quantity, f'truck_package_count[{t_id}, {p_id}]')
+
+                    self.model.Add(count_var >= 1).OnlyEnforceIf(assignment_var)
+                    self.model.Add(count_var == 0).OnlyEnforceIf(assignment_var.Not())
+
+                    truck_package_count[t_id, p_id] = count_var
+                else:
+                    truck_package_count[t_id, p_id] = assignment_var
                 
                 all_orders.add(package.order_id)
         
+        self.sparse_pairs = sparse_pairs
+
         same_truck_packages = {}
-        for p_id_1 in self.model_input.all_packages:
-  
-            for p_id_2 in self.model_input.all_packages:
+        for p_id_1, p_id_2 in self.getPackagePairs(sparse_pairs):
+            assignment_var = self.model.NewBoolVar(f'same_truck_packages[{p_id_1}, {p_id_2}]')
 
-                if p_id_1 != p_id_2:
-                    if (p_id_1, p_id_2) in same_truck_packages or (p_id_2, p_id_1) in same_truck_packages:
-                        continue
-                    else:
-                        assignment_var = self.model.NewBoolVar(f'same_truck_packages[{p_id_1}, {p_id_2}]')
-                
-                        same_truck_packages[p_id_1, p_id_2] = assignment_var 
+            same_truck_packages[p_id_1, p_id_2] = assignment_var 
 
 
         self.package_start_time = {}
@@ -300,12 +522,88 @@ class Model:
             self.package_start_time[p_id] = start_time_var
 
         self.truck_to_packages = truck_to_packages
+        self.truck_package_count = truck_package_count
         self.package_stops = package_stops
 
         self.same_truck_packages = same_truck_packages
     
         self.countVariables()
 
+    def getPackageGroups(self, aggregate=False):
+        """Function that groups the identical items of an order.
+
+        Items of the same order and material with the same source, destination, danger type, 
+        area, weight and times are interchangeable, so the model only needs to decide how many 
+        of them each truck carries.
+
+        Args:
+            aggregate: group the identical items, otherwise every item is a group of its own.
+            
+        Returns:
+            a dict from the id of the first item of each group to the ids of all items in the group
+
+        """
+        package_groups = {}
+
+        if not aggregate:
+            for p_id in self.model_input.all_packages:
+                package_groups[p_id] = [p_id]
+
+            return package_groups
+
+        group_keys = {}
+        for p_id, package in self.model_input.all_packages.items():
+            key = (package.order_id, package.material_id, package.source, package.destination, package.danger_type, 
+                package.area, package.weight, package.available_time, package.deadline)
+
+            if key not in group_keys:
+                group_keys[key] = p_id
+                package_groups[p_id] = []
+
+            package_groups[group_keys[key]].append(p_id)
+
+        return package_groups
+
+    def getPackagePairs(self, sparse_pairs=False):
+        """Function that gets the package pairs which need a same truck variable.
+
+        Args:
+            sparse_pairs: only keep the pairs that can share a truck.
+            
+        Returns:
+            the list of (p_id_1, p_id_2) pairs
+
+        """
+        p_ids = list(self.model_input.all_packages)
+
+        package_pairs = []
+        for i, p_id_1 in enumerate(p_ids):
+            for p_id_2 in p_ids[i+1:]:
+                if not sparse_pairs or self.isCompatible(self.model_input.all_packages[p_id_1], self.model_input.all_packages[p_id_2]):
+                    package_pairs.append((p_id_1, p_id_2))
+
+        return package_pairs
+
+    def isCompatible(self, package_1, package_2):
+        """Function that checks if two packages can be delivered by the same truck.
+
+        Args:
+            package_1: the first package
+            package_2: the second package
+            
+        Returns:
+            True if they have the same source, no conflicting danger types and close enough available time.
+
+        """
+        if package_1.source != package_2.source:
+            return False
+
+        if (package_1.danger_type != 'non_danger' and package_2.danger_type != 'non_danger' and 
+            package_1.danger_type != package_2.danger_type):
+            return False
+
+        return abs(package_1.available_time - package_2.available_time) <= self.model_input.max_time_difference_between_package
+
     def countVariables(self):
         """Function that counts how many decision variables and constraints being created.
 
@@ -313,10 +611,16 @@ class Model:
             None
             
         Returns:
-            None
+            num_variables: the number of variables
+            num_constraints: the number of constraints
 
         """
-        logger.info(f"Number of Variables:{str(vars(self.model)).count('variables')}; Number of Constraints: {str(vars(self.model)).count('constraints')}")
+        model_proto = self.model.Proto()
+        num_variables, num_constraints = len(model_proto.variables), len(model_proto.constraints)
+
+        logger.info(f"Number of Variables:{num_variables}; Number of Constraints: {num_constraints}")
+
+        return num_variables, num_constraints
 
     def validateInput(self):
         """Function that validates if there are any violation of the constraints before modeling.
@@ -341,7 +645,7 @@ class Model:
                 if t_id not in truck_being_used:
                     truck = self.model_input.all_trucks[t_id]
                     
-                    if self.model_input.distance_matrix.loc[package.source][package.destination] / truck.type.speed <= (package.deadline - package.available_time):
+                    if self.model_input.distances.getDistance(package.source, package.destination) / truck.type.speed <= (package.deadline - package.available_time):
                         truck_being_used.add(t_id)
                         allocated = True
                         break
@@ -425,9 +729,9 @@ class Model:
         ''' 
         logger.info("Adding package to truck assignment constraint.")
 
-        # Pacakge need to be assigned to one truck exactly
+        # Pacakge need to be assigned to one truck exactly, the items of a group can be spread over trucks
         for p_id in self.model_input.all_packages:
-            self.model.Add(sum(self.truck_to_packages[t_id, p_id] for t_id in self.model_input.all_trucks) == 1)
+            self.model.Add(sum(self.truck_package_count[t_id, p_id] for t_id in self.model_input.all_trucks) == len(self.package_groups[p_id]))
 
         multiply_t_p1_p2_dict = {}
 
@@ -437,15 +741,12 @@ class Model:
             all_t_ids.append((t_id, i))
             i+=1
 
-        # if two packages have differnet sources, they cannot be assigned to the same truck
+        # With sparse pairs, only packages in the same pair can share a truck, the other combinations 
+        # are excluded by the danger type and time window constraints of each truck
         for p_id_1, p_id_2 in self.same_truck_packages:
-            package_1 = self.model_input.all_packages[p_id_1]
-            package_2 = self.model_input.all_packages[p_id_2]
-            if package_1.source != package_2.source:
-                for t_id in all_trucks:
-                    self.model.Add(self.truck_to_packages[t_id, p_id_1] + self.truck_to_packages[t_id, p_id_2] <= 1)
-                
-                self.model.Add(self.same_truck_packages[p_id_1, p_id_2] == 0)
+            if len(self.package_groups[p_id_1]) > 1 or len(self.package_groups[p_id_2]) > 1:
+                self.setSharedTruckConstraint(p_id_1, p_id_2)
+                continue
 
             self.model.Add(sum(self.truck_to_packages[t_id, p_id_1]*i for t_id, i in all_t_ids) 
                     == (sum(self.truck_to_packages[t_id, p_id_2]*i for t_id, i in all_t_ids))).OnlyEnforceIf(
@@ -459,6 +760,23 @@ class Model:
         self.countVariables()
 
 
+    def setSharedTruckConstraint(self, p_id_1, p_id_2):
+        '''
+        Two packages whose items can be spread over several trucks share a truck if both are on any of them.
+
+        '''
+        both_on_truck = []
+
+        for t_id in self.model_input.all_trucks:
+            both_on_truck_var = self.model.NewBoolVar(f'both_on_truck[{t_id}, {p_id_1}, {p_id_2}]')
+
+            self.model.AddBoolAnd([self.truck_to_packages[t_id, p_id_1], self.truck_to_packages[t_id, p_id_2]]).OnlyEnforceIf(both_on_truck_var)
+            self.model.AddBoolOr([self.truck_to_packages[t_id, p_id_1].Not(), self.truck_to_packages[t_id, p_id_2].Not()]).OnlyEnforceIf(both_on_truck_var.Not())
+
+            both_on_truck.append(both_on_truck_var)
+
+        self.model.AddMaxEquality(self.same_truck_packages[p_id_1, p_id_2], both_on_truck)
+
     def setPackageStartTimeConstraint(self):
         '''
         The start time of the truck should be greater or equal to the maximum available time of the packages in the same truck.
@@ -521,7 +839,7 @@ class Model:
                 package_truck_type_var = self.model.NewBoolVar(f'package_truck_type_[{p_id, truck_type.id}]')
                 self.package_truck_type[p_id, truck_type.id] = package_truck_type_var
 
-                self.model.Add(sum(self.truck_to_packages[t_id, p_id] for t_id in self.trucks_with_type[truck_type.id]) == 1
+                self.model.Add(sum(self.truck_to_packages[t_id, p_id] for t_id in self.trucks_with_type[truck_type.id]) >= 1
                                 ).OnlyEnforceIf(self.package_truck_type[p_id, truck_type.id])
                 self.model.Add(sum(self.truck_to_packages[t_id, p_id] for t_id in self.trucks_with_type[truck_type.id]) == 0
                                 ).OnlyEnforceIf(self.package_truck_type[p_id, truck_type.id].Not())
@@ -534,10 +852,15 @@ class Model:
 
         self.p1_before_p2 = {}
 
+        # Distance from the source to each package destination, gathered in table order
+        package_table = self.model_input.package_table
+        location_ids = self.model_input.location_ids
+        package_distance = self.model_input.distances.gather(location_ids[package_table.source_codes], location_ids[package_table.destination_codes])
+
         # Package arrival time should larger than the time from the source to package destination.
-        for p_id, package in self.model_input.all_packages.items():
+        for p_id, distance in zip(self.model_input.all_packages, package_distance.tolist()):
             self.model.Add(self.package_arrival_time[p_id] >= 
-                sum(int(self.model_input.distance_matrix[package.source][package.destination] / truck_type.speed) 
+                sum(int(distance / truck_type.speed) 
                 * self.package_truck_type[p_id, truck_type.id] for truck_type in self.model_input.truck_types)
                 + self.package_start_time[p_id])
 
@@ -569,14 +892,14 @@ class Model:
 
                 # If p1 and p2 in the same truck and p1 stop first
                 self.model.Add(self.package_arrival_time[p_id_2] >= 
-                    sum(int(self.model_input.distance_matrix[package_1.destination][package_2.destination] / truck_type.speed)
+                    sum(int(self.model_input.distances.getDistance(package_1.destination, package_2.destination) / truck_type.speed)
                     * self.package_truck_type[p_id_2, truck_type.id] for truck_type in self.model_input.truck_types)
                     + self.package_arrival_time[p_id_1] + self.model_input.stop_time).OnlyEnforceIf(self.same_truck_packages[p_id_1, p_id_2],
                     p1_before_p2_var)
 
                 # If p1 and p2 in the same truck and p2 stop first
                 self.model.Add(self.package_arrival_time[p_id_1] >= 
-                    sum(int(self.model_input.distance_matrix[package_2.destination][package_1.destination] / truck_type.speed)
+                    sum(int(self.model_input.distances.getDistance(package_2.destination, package_1.destination) / truck_type.speed)
                     * self.package_truck_type[p_id_1, truck_type.id] for truck_type in self.model_input.truck_types)
                     + self.package_arrival_time[p_id_2] + self.model_input.stop_time).OnlyEnforceIf(self.same_truck_packages[p_id_1, p_id_2],
                     p1_before_p2_var.Not())                 
@@ -597,7 +920,7 @@ class Model:
         logger.info("Adding truck volume capacity constraint.")
 
         for t_id in self.model_input.all_trucks:
-            self.model.Add(sum(self.truck_to_packages[t_id, p_id]*self.model_input.all_packages[p_id].area 
+            self.model.Add(sum(self.truck_package_count[t_id, p_id]*self.model_input.all_packages[p_id].area 
                 for p_id in self.model_input.all_packages)
                 <= self.model_input.all_trucks[t_id].type.area_capacity)
         self.countVariables()
@@ -609,7 +932,7 @@ class Model:
         logger.info("Adding truck weight capacity constraint.")
 
         for t_id in self.model_input.all_trucks:
-            self.model.Add(sum(self.truck_to_packages[t_id, p_id]*self.model_input.all_packages[p_id].weight for p_id in self.model_input.all_packages)
+            self.model.Add(sum(self.truck_package_count[t_id, p_id]*self.model_input.all_packages[p_id].weight for p_id in self.model_input.all_packages)
                 <= self.model_input.all_trucks[t_id].type.weight_capacity)
         self.countVariables()
 
@@ -620,14 +943,60 @@ class Model:
 
         logger.info("Adding danger type constraint.")
 
-        for p_id_1, p_id_2 in self.same_truck_packages:
-            # If neither one is "non_danger" type of package
-            if self.model_input.all_packages[p_id_1].danger_type != 'non_danger' and self.model_input.all_packages[p_id_2].danger_type != 'non_danger':
-                self.model.Add(self.model_input.all_packages[p_id_1].danger_type == self.model_input.all_packages[p_id_2].danger_type).OnlyEnforceIf(
-                self.same_truck_packages[p_id_1, p_id_2])
+        if not self.sparse_pairs:
+            for p_id_1, p_id_2 in self.same_truck_packages:
+                # If neither one is "non_danger" type of package
+                if self.model_input.all_packages[p_id_1].danger_type != 'non_danger' and self.model_input.all_packages[p_id_2].danger_type != 'non_danger':
+                    if self.model_input.all_packages[p_id_1].danger_type != self.model_input.all_packages[p_id_2].danger_type:
+                        self.model.Add(self.same_truck_packages[p_id_1, p_id_2]==0)
+
+            self.countVariables()
+            return
 
-                if self.model_input.all_packages[p_id_1].danger_type != self.model_input.all_packages[p_id_2].danger_type:
-                    self.model.Add(self.same_truck_packages[p_id_1, p_id_2]==0)
+        danger_types = set(package.danger_type for package in self.model_input.all_packages.values()) - {'non_danger'}
+
+        # A truck can carry at most one danger type
+        if len(danger_types) > 1:
+            for t_id in self.model_input.all_trucks:
+                truck_danger_type = {}
+                for danger_type in danger_types:
+                    truck_danger_type[danger_type] = self.model.NewBoolVar(f'truck_danger_type[{t_id}, {danger_type}]')
+
+                for p_id, package in self.model_input.all_packages.items():
+                    if package.danger_type != 'non_danger':
+                        self.model.AddImplication(self.truck_to_packages[t_id, p_id], truck_danger_type[package.danger_type])
+
+                self.model.Add(sum(truck_danger_type.values()) <= 1)
+
+        self.countVariables()
+
+    def setSymmetryBreakingConstraint(self):
+        '''
+        Trucks of the same type are interchangeable, so they are loaded in lexicographically decreasing order of area and weight.
+        The empty trucks come last.
+        '''
+        logger.info("Adding truck symmetry breaking constraint.")
+
+        trucks_with_type = collections.defaultdict(list)
+        for t_id, truck in self.model_input.all_trucks.items():
+            trucks_with_type[truck.type.id].append(t_id)
+
+        for truck_type_id, t_ids in trucks_with_type.items():
+            truck_area = {}
+            truck_weight = {}
+
+            for t_id in t_ids:
+                truck_area[t_id] = sum(self.truck_package_count[t_id, p_id]*package.area for p_id, package in self.model_input.all_packages.items())
+                truck_weight[t_id] = sum(self.truck_package_count[t_id, p_id]*package.weight for p_id, package in self.model_input.all_packages.items())
+
+            for t_id_1, t_id_2 in zip(t_ids, t_ids[1:]):
+                self.model.Add(truck_area[t_id_1] >= truck_area[t_id_2])
+
+                same_area_var = self.model.NewBoolVar(f'same_area[{t_id_1}, {t_id_2}]')
+                self.model.Add(truck_area[t_id_1] == truck_area[t_id_2]).OnlyEnforceIf(same_area_var)
+                self.model.Add(truck_area[t_id_1] != truck_area[t_id_2]).OnlyEnforceIf(same_area_var.Not())
+
+                self.model.Add(truck_weight[t_id_1] >= truck_weight[t_id_2]).OnlyEnforceIf(same_area_var)
 
         self.countVariables()
 
@@ -637,12 +1006,29 @@ class Model:
         '''
         logger.info("Adding package time window constraint.")
 
-        for p_id_1, p_id_2 in self.same_truck_packages:    
+        if not self.sparse_pairs:
+            for p_id_1, p_id_2 in self.same_truck_packages:
+                package1 = self.model_input.all_packages[p_id_1]
+                package2 = self.model_input.all_packages[p_id_2]
+
+                if abs(package1.available_time - package2.available_time) > self.model_input.max_time_difference_between_package:
+                    self.model.Add(self.same_truck_packages[p_id_1, p_id_2] == 0)
+
+            self.countVariables()
+            return
 
-            package1 = self.model_input.all_packages[p_id_1]
-            package2 = self.model_input.all_packages[p_id_2]
+        available_times = [package.available_time for package in self.model_input.all_packages.values()]
 
-            if abs(package1.available_time - package2.available_time) > self.model_input.max_time_difference_between_package:
-                self.model.Add(self.same_truck_packages[p_id_1, p_id_2] == 0)                                
+        # The window of a truck spans from the minimum to the maximum available time of its packages
+        if max(available_times) - min(available_times) > self.model_input.max_time_difference_between_package:
+            for t_id in self.model_input.all_trucks:
+                truck_min_available_time = self.model.NewIntVar(self.min_start, self.max_start, f'truck_min_available_time[{t_id}]')
+                truck_max_available_time = self.model.NewIntVar(self.min_start, self.max_start, f'truck_max_available_time[{t_id}]')
+
+                for p_id, package in self.model_input.all_packages.items():
+                    self.model.Add(truck_min_available_time <= package.available_time).OnlyEnforceIf(self.truck_to_packages[t_id, p_id])
+                    self.model.Add(truck_max_available_time >= package.available_time).OnlyEnforceIf(self.truck_to_packages[t_id, p_id])
+
+                self.model.Add(truck_max_available_time - truck_min_available_time <= self.model_input.max_time_difference_between_package)
             
-        self.countVariables()
\ No newline at end of file
+        self.countVariables()
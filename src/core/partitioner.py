@@ -10,20 +10,33 @@ class ProblemPartitioner:
     def __init__(self):
         pass
 
-    def partition(self, model_input, max_package_num=30):
+    def partition(self, model_input, max_package_num=30, method='time_interval'):
         """Function that partitions the big problem into many smaller problems.
 
         Args:
             model_input: the original model input
             max_package_num: the max number of packages per partition
+            method: how the big subproblems are split, time_interval for partitionByTimeInterval then partitionByHardNumber, 
+                or cluster for partitionByCluster
             
         Returns:
             the list of partitioned model input objects
 
         """
 
-        # Step 1: partition by package source
-        model_input_list_step1 = self.partitionBySrc(model_input)
+        # Step 1: decompose into independent subproblems, packages in different ones can never share a truck
+        model_input_list_step1 = self.partitionByComponent(model_input)
+
+        if method == 'cluster':
+            model_input_list = []
+            for model_input_small in model_input_list_step1:
+                if len(model_input_small.all_packages) <= max_package_num:
+                    model_input_list.append(model_input_small)
+
+                else:
+                    model_input_list += self.partitionByCluster(model_input_small, max_package_num)
+
+            return model_input_list
 
         # Step 2: further partition if the num of package is larger than threshold
         model_input_list_step2 = []
@@ -48,9 +61,10 @@ class ProblemPartitioner:
         return model_input_list_step3
 
 
-    def partitionBySrc(self, model_input):
-        """Function that partitions the model input by delivery source.
-        Constraint: packages from different source cannot be delivered by the same truck.
+    def partitionByComponent(self, model_input):
+        """Function that partitions the model input into the connected components of the package compatibility graph.
+        Constraint: packages from different source, with different danger types or having available time larger than threshold 
+        cannot be delivered by the same truck.
 
         Args:
             model_input: the original model input
@@ -59,19 +73,69 @@ class ProblemPartitioner:
             the list of partitioned model input objects
 
         """
-        model_input_list = []
+        package_table = model_input.package_table
 
-        same_source_packages = collections.defaultdict(list)
+        component_ids = self.getComponentIds(model_input)
 
-        for p_id, package in model_input.all_packages.items():
-            same_source_packages[package.source].append(package)
+        sorted_index = np.lexsort((package_table.material_codes, package_table.order_codes, package_table.available_time, component_ids))
+        split_points = np.flatnonzero(np.diff(component_ids[sorted_index])) + 1
 
-        for source, packages in same_source_packages.items():
-            model_input_small = self.createModelInput(model_input, packages)
-            model_input_list.append(model_input_small)
+        return self.createModelInputList(model_input, sorted_index, split_points)
 
-        return model_input_list
+    def getComponentIds(self, model_input):
+        """Function that labels each package with the connected component it belongs to.
+        Two packages are connected if they could share a truck: same source, same or non danger type, 
+        and available time within max_time_difference_between_package.
+
+        Args:
+            model_input: the original model input
+            
+        Returns:
+            the array of component ids in package table order, numbered from 0 by the first package of each component
+
+        """
+        package_table = model_input.package_table
+
+        parent = list(range(len(package_table)))
+
+        def find(i):
+            while parent[i] != i:
+                parent[i] = parent[parent[i]]
+                i = parent[i]
+            return i
 
+        non_danger = np.zeros(len(package_table), dtype=bool)
+        if 'non_danger' in package_table.danger_types:
+            non_danger = package_table.danger_codes == package_table.danger_types.index('non_danger')
+
+        # Non danger packages are compatible with each other and with every danger type,
+        # so every edge of the graph lies within the non danger packages plus the packages of one danger type.
+        groups = [non_danger]
+        for danger_code, danger_type in enumerate(package_table.danger_types):
+            if danger_type != 'non_danger':
+                groups.append(non_danger | (package_table.danger_codes == danger_code))
+
+        for group in groups:
+            indices = np.flatnonzero(group)
+
+            # All pairs in a group are compatible by danger type, so sorted by source and time 
+            # the components are the chains of consecutive packages within the time window
+            sorted_index = indices[np.lexsort((package_table.available_time[indices], package_table.source_codes[indices]))]
+
+            linked = ((package_table.source_codes[sorted_index[1:]] == package_table.source_codes[sorted_index[:-1]]) & 
+                (np.diff(package_table.available_time[sorted_index]) <= model_input.max_time_difference_between_package))
+
+            for i, j in zip(sorted_index[:-1][linked].tolist(), sorted_index[1:][linked].tolist()):
+                root_i, root_j = find(i), find(j)
+                if root_i != root_j:
+                    parent[max(root_i, root_j)] = min(root_i, root_j)
+
+        roots = np.array([find(i) for i in range(len(package_table))], dtype=np.int64)
+
+        # The root is the smallest row in the component, so the ids follow the first appearance
+        component_ids = np.unique(roots, return_inverse=True)[1]
+
+        return component_ids.astype(np.int32)
 
     def partitionByTimeInterval(self, model_input):
         """Function that partitions the model input by time interval.
@@ -84,42 +148,129 @@ class ProblemPartitioner:
             the list of partitioned model input objects
 
         """
-        model_input_list = []
+        package_table = model_input.package_table
 
-        all_packages = list(model_input.all_packages.values())
+        sorted_index = np.lexsort((package_table.material_codes, package_table.order_codes, package_table.available_time))
 
-        candidate_packages = []
+        # Split wherever the gap between consecutive available times is too big
+        gaps = np.diff(package_table.available_time[sorted_index])
+        split_points = np.flatnonzero(gaps > model_input.max_time_difference_between_package) + 1
 
-        sorted_all_packages = sorted(all_packages, key=lambda p: (p.available_time, p.order_id, p.material_id))
+        return self.createModelInputList(model_input, sorted_index, split_points)
+        
 
-        previous_available_time = 0
-        for package in sorted_all_packages:
-            if previous_available_time == 0:
-                previous_available_time = package.available_time
-                candidate_packages.append(package)
+    def partitionByHardNumber(self, model_input, max_package_num):
+        """Function that partitions the model input by a hard number of packages.
+        Orders are kept whole and packed first-fit in time order into partitions of at most max_package_num packages,
+        with the area and weight of a partition bounded by max_package_num average packages. A partition is closed once 
+        the packages coming next can no longer share a truck with its first package. An order bigger than a partition 
+        is split by material, and a material by items.
+
+        Args:
+            model_input: the original model input
+            max_package_num: the max number of packages per partition
+            
+        Returns:
+            the list of partitioned model input objects
+
+        """
+        
+        package_table = model_input.package_table
+
+        if len(package_table) == 0:
+            return []
+
+        area_limit = package_table.area.mean() * max_package_num
+        weight_limit = package_table.weight.mean() * max_package_num
+
+        # Each bin is [the list of units, number of packages, area, weight, earliest available time]
+        bins = []
+        open_bins = []
+
+        for indices in self.getPackingUnits(model_input, max_package_num):
+            area = package_table.area[indices].sum()
+            weight = package_table.weight[indices].sum()
+            available_time = package_table.available_time[indices].min()
+
+            open_bins = [b for b in open_bins if available_time - b[4] <= model_input.max_time_difference_between_package]
+
+            for b in open_bins:
+                if b[1] + len(indices) <= max_package_num and b[2] + area <= area_limit and b[3] + weight <= weight_limit:
+                    b[0].append(indices)
+                    b[1] += len(indices)
+                    b[2] += area
+                    b[3] += weight
+                    break
 
             else:
-                if abs(package.available_time - previous_available_time) <= model_input.max_time_difference_between_package:
-                    previous_available_time = package.available_time
-                    candidate_packages.append(package)
+                b = [[indices], len(indices), area, weight, available_time]
+                bins.append(b)
+                open_bins.append(b)
 
-                else:
-                    model_input_small = self.createModelInput(model_input, candidate_packages)
-                    model_input_list.append(model_input_small)
+        sorted_index = []
+        for b in bins:
+            indices = np.concatenate(b[0])
+            sorted_index.append(indices[np.lexsort((package_table.material_codes[indices], package_table.order_codes[indices], package_table.available_time[indices]))])
 
-                    candidate_packages = [package]
-                    previous_available_time = package.available_time
+        split_points = np.cumsum([len(indices) for indices in sorted_index])[:-1]
 
-        # Check if there is any left
-        if len(candidate_packages) > 0:
-            model_input_small = self.createModelInput(model_input, candidate_packages)
-            model_input_list.append(model_input_small)
+        return self.createModelInputList(model_input, np.concatenate(sorted_index), split_points)
 
-        return model_input_list
-        
+    def getPackingUnits(self, model_input, max_package_num):
+        """Function that groups the packages into the units that are not split by partitioning.
 
-    def partitionByHardNumber(self, model_input, max_package_num):
-        """Function that partitions the model input by a hard number of packages.
+        Args:
+            model_input: the original model input
+            max_package_num: the max number of packages per unit
+            
+        Returns:
+            the list of row index arrays, one per order or split order, sorted by earliest available time
+
+        """
+        package_table = model_input.package_table
+
+        sorted_index = np.lexsort((package_table.material_codes, package_table.order_codes))
+        split_points = np.flatnonzero(np.diff(package_table.order_codes[sorted_index])) + 1
+
+        units = []
+        for indices in np.split(sorted_index, split_points):
+            units += self.splitOrder(model_input, indices, max_package_num)
+
+        available_time = [package_table.available_time[indices].min() for indices in units]
+        order_codes = [package_table.order_codes[indices[0]] for indices in units]
+
+        return [units[i] for i in np.lexsort((order_codes, available_time))]
+
+    def splitOrder(self, model_input, indices, max_package_num):
+        """Function that splits the packages of an order bigger than max_package_num by material, then by items.
+
+        Args:
+            model_input: the original model input
+            indices: the row indices of the packages of the order, sorted by material
+            max_package_num: the max number of packages per unit
+            
+        Returns:
+            the list of row index arrays, the order itself if it is small enough
+
+        """
+        package_table = model_input.package_table
+
+        if len(indices) <= max_package_num:
+            return [indices]
+
+        units = []
+        split_points = np.flatnonzero(np.diff(package_table.material_codes[indices])) + 1
+        for material_indices in np.split(indices, split_points):
+            material_indices = material_indices[np.argsort(package_table.available_time[material_indices], kind='stable')]
+            units += np.split(material_indices, np.arange(max_package_num, len(material_indices), max_package_num))
+
+        return units
+
+    def partitionByCluster(self, model_input, max_package_num):
+        """Function that partitions the model input into balanced clusters of orders that could share trucks.
+        Orders are sorted by source, danger type, time window of max_time_difference_between_package and 
+        destination proximity, then cut into runs of about the same number of packages. An order is only split
+        when it alone has more than max_package_num packages.
 
         Args:
             model_input: the original model input
@@ -129,32 +280,106 @@ class ProblemPartitioner:
             the list of partitioned model input objects
 
         """
-        
-        model_input_list = []
+        package_table = model_input.package_table
 
-        all_packages = list(model_input.all_packages.values())
+        if len(package_table) == 0:
+            return []
 
-        candidate_packages = []
+        destination_rank = self.getDestinationRank(model_input)
 
-        sorted_all_packages = sorted(all_packages, key=lambda p: (p.available_time, p.order_id, p.material_id))
+        # Orders are the units of the clustering
+        orders, package_order, order_size = np.unique(package_table.order_codes, return_inverse=True, return_counts=True)
+        num_orders = len(orders)
 
-        for package in sorted_all_packages:
-            if len(candidate_packages) < max_package_num:
-                candidate_packages.append(package)
-            
-            else:
-                model_input_small = self.createModelInput(model_input, candidate_packages)
-                model_input_list.append(model_input_small)
+        order_source = np.zeros(num_orders, dtype=np.int64)
+        order_source[package_order] = package_table.source_codes
 
-                candidate_packages = [package]
+        # Non danger orders go last, they are compatible with every danger type
+        danger_key = package_table.danger_codes.astype(np.int64)
+        if 'non_danger' in package_table.danger_types:
+            danger_key[package_table.danger_codes == package_table.danger_types.index('non_danger')] = len(package_table.danger_types)
 
-        # Check if there is any left
-        if len(candidate_packages) > 0:
-            model_input_small = self.createModelInput(model_input, candidate_packages)
-            model_input_list.append(model_input_small)
+        order_danger = np.zeros(num_orders, dtype=np.int64)
+        np.maximum.at(order_danger, package_order, danger_key)
+
+        order_time = np.full(num_orders, np.iinfo(np.int64).max, dtype=np.int64)
+        np.minimum.at(order_time, package_order, package_table.available_time.astype(np.int64))
+
+        order_rank = np.full(num_orders, len(destination_rank), dtype=np.int64)
+        np.minimum.at(order_rank, package_order, destination_rank[package_table.destination_codes])
+
+        time_window = order_time // max(1, model_input.max_time_difference_between_package)
+        sorted_orders = np.lexsort((order_time, order_rank, time_window, order_danger, order_source))
+
+        # Balanced partitions: as few as the limit allows, all about the same size
+        num_partitions = -(-len(package_table) // max_package_num)
+        target_size = -(-len(package_table) // num_partitions)
+
+        order_packages = np.split(np.argsort(package_order, kind='stable'), np.cumsum(order_size)[:-1])
+
+        groups = []
+        group = []
+        group_size = 0
+        for order in sorted_orders.tolist():
+            if order_size[order] > max_package_num:
+                # An order too big for a partition is cut into partitions of its own
+                indices = order_packages[order]
+                groups += self.splitOrder(model_input, indices[np.argsort(package_table.material_codes[indices], kind='stable')], max_package_num)
+                continue
+
+            if group_size > 0 and (group_size + order_size[order] > target_size or order_source[order] != order_source[group[0]]):
+                groups.append(np.concatenate([order_packages[o] for o in group]))
+                group = []
+                group_size = 0
+
+            group.append(order)
+            group_size += order_size[order]
+
+        if group_size > 0:
+            groups.append(np.concatenate([order_packages[o] for o in group]))
+
+        model_input_list = []
+        for indices in groups:
+            indices = indices[np.lexsort((package_table.material_codes[indices], package_table.order_codes[indices], package_table.available_time[indices]))]
+            model_input_list.append(self.createModelInputByIndex(model_input, indices))
 
         return model_input_list
-        
+
+    def getDestinationRank(self, model_input):
+        """Function that ranks the destinations along a nearest neighbour tour, so close destinations get close ranks.
+
+        Args:
+            model_input: the original model input
+            
+        Returns:
+            the array of ranks indexed by the location codes of the package table
+
+        """
+        package_table = model_input.package_table
+        location_ids = model_input.location_ids
+
+        destination_codes = np.unique(package_table.destination_codes)
+        destination_rank = np.zeros(len(package_table.locations), dtype=np.int64)
+
+        # The tour starts from the destination closest to the most common source
+        source_code = np.bincount(package_table.source_codes).argmax()
+        distances = model_input.distances.gather(location_ids[source_code], location_ids[destination_codes])
+
+        remaining = np.ones(len(destination_codes), dtype=bool)
+        current = int(np.argmin(distances))
+
+        for rank in range(len(destination_codes)):
+            destination_rank[destination_codes[current]] = rank
+            remaining[current] = False
+
+            if not remaining.any():
+                break
+
+            distances = model_input.distances.gather(location_ids[destination_codes[current]], location_ids[destination_codes]).astype(np.float64)
+            distances[~remaining] = np.inf
+            current = int(np.argmin(distances))
+
+        return destination_rank
 
     def createModelInput(self, model_input, candidate_packages):
         """Function that create a new model input object.
@@ -175,8 +400,51 @@ class ProblemPartitioner:
             all_packages[package.order_id, package.material_id, package.item_id] = package
 
         new_model_input.all_packages = all_packages
-        new_model_input.distance_matrix = model_input.distance_matrix
+        new_model_input.distances = model_input.distances
+        new_model_input.truck_types = model_input.truck_types 
+        new_model_input.all_trucks = new_model_input.getAllTrucks(new_model_input.all_packages, new_model_input.truck_types)
+
+        return new_model_input
+
+    def createModelInputList(self, model_input, sorted_index, split_points):
+        """Function that create new model input objects from consecutive slices of sorted packages.
+
+        Args:
+            model_input: the original model input
+            sorted_index: the row indices of the packages in the package table, in partition order
+            split_points: the positions in sorted_index where a new partition starts
+            
+        Returns:
+            the list of partitioned model input objects
+
+        """
+        model_input_list = []
+
+        if len(sorted_index) == 0:
+            return model_input_list
+
+        for indices in np.split(sorted_index, split_points):
+            model_input_small = self.createModelInputByIndex(model_input, indices)
+            model_input_list.append(model_input_small)
+
+        return model_input_list
+
+    def createModelInputByIndex(self, model_input, indices):
+        """Function that create a new model input object from rows of the package table.
+
+        Args:
+            model_input: the original model input
+            indices: the row indices of the packages in the package table
+            
+        Returns:
+            the partitioned model input object
+
+        """
+        new_model_input = ModelInput()
+
+        new_model_input.package_table = model_input.package_table.take(indices)
+        new_model_input.distances = model_input.distances
         new_model_input.truck_types = model_input.truck_types 
         new_model_input.all_trucks = new_model_input.getAllTrucks(new_model_input.all_packages, new_model_input.truck_types)
 
-        return new_model_input
\ No newline at end of file
+        return new_model_input
@@ -0,0 +1,107 @@
+# Copyright (c) Microsoft. All rights reserved.
+# Licensed under the MIT license.
+
+from .structure import *
+from .reducer import *
+from .partitioner import *
+from .runner import *
+from .merger import *
+from .lns import *
+from .logger import *
+
+class Pipeline:
+
+    def __init__(self, reduce_method='reduce1', max_package_num=30, num_workers=None, max_time_in_seconds=120, time_budget=None, result_cache_dir=None, aggregate=False, symmetry_breaking=False, 
+        fleet_sizing=False, engine='cpsat', lns_time_budget=None, 
+        optimize_merge=False, partition_method='time_interval'):
+        """Function that initializes the pipeline.
+
+        Args:
+            reduce_method: the heuristic of SearchSpaceReducer to use, reduce1 or reduce2.
+            max_package_num: the max number of packages per partition.
+            num_workers: the number of worker processes to solve the partitions, one per core if None.
+            max_time_in_seconds: the maximum search time of the solver per partition.
+            time_budget: the wall clock budget in seconds for all partitions, used instead of max_time_in_seconds if not None.
+            result_cache_dir: the folder of the ResultCache to reuse the scheduling of recurring partitions, not used if None.
+            aggregate: model identical items of an order as one package with a quantity.
+            symmetry_breaking: order the interchangeable trucks of the same type in the model.
+            fleet_sizing: solve each partition with the sized fleet, grown while the model is infeasible.
+            engine: the solver of the partitions, cpsat for the Model or greedy for the GreedySolver.
+            lns_time_budget: the wall clock budget in seconds to improve the merged scheduling by LargeNeighborhoodSearch, not used if None.
+            optimize_merge: consolidate the underfilled trucks of different partitions by ResultMerger.optimize.
+            partition_method: how ProblemPartitioner splits the big subproblems, time_interval or cluster.
+
+        """
+        self.reduce_method = reduce_method
+        self.max_package_num = max_package_num
+        self.num_workers = num_workers
+        self.max_time_in_seconds = max_time_in_seconds
+        self.time_budget = time_budget
+        self.result_cache_dir = result_cache_dir
+        self.aggregate = aggregate
+        self.symmetry_breaking = symmetry_breaking
+        self.fleet_sizing = fleet_sizing
+        self.engine = engine
+        self.lns_time_budget = lns_time_budget
+        self.optimize_merge = optimize_merge
+        self.partition_method = partition_method
+
+    def run(self, order, distance, input_cache=None):
+        """Function that runs reduce, partition, solve and merge on in-memory objects.
+
+        Args:
+            order: the file/dataframe that stores the order
+            distance: the file/dataframe that stores the pair-wise distance
+            input_cache: the InputCache to load the parsed files from, the files are parsed if None
+            
+        Returns:
+            A DataFrame that stores the final route schedualing.
+
+        """
+
+        # The inputs are parsed once and shared by all stages
+        model_input_origin = ModelInput()
+        model_input_origin.initInputFromFile(order, distance, input_cache)
+
+        return self.runModelInput(model_input_origin)
+
+    def runModelInput(self, model_input_origin):
+        """Function that runs reduce, partition, solve and merge on a parsed model input.
+
+        Args:
+            model_input_origin: the object that stores the model input.
+            
+        Returns:
+            A DataFrame that stores the final route schedualing.
+
+        """
+
+        # Step 1 - Reduce the search space
+        reducer = SearchSpaceReducer()
+        model_input_reduced, model_result_partial = getattr(reducer, self.reduce_method)(model_input_origin)
+
+        # Step 2 - Partition the problem into smaller problems
+        partitioner = ProblemPartitioner()
+        model_input_list = partitioner.partition(model_input_reduced, self.max_package_num, self.partition_method)
+        logger.info(f"Number of partitions: {len(model_input_list)}")
+
+        # Step 3 - Solve each smaller problems
+        model_result_list = [model_result_partial.toScheduleDF()]
+
+        runner = LocalRunner(model_input_origin.distances, self.num_workers, self.result_cache_dir, self.aggregate, self.symmetry_breaking, self.fleet_sizing, self.engine)
+        for schedule_df in runner.run(model_input_list, self.max_time_in_seconds, time_budget=self.time_budget):
+            model_result_list.append(schedule_df)
+
+        # Step 4 - Merge the individual results
+        merger = ResultMerger()
+        schedule_df = merger.merge(model_input_origin, model_result_list, self.optimize_merge)
+
+        # Step 5 - Improve the trucks across partition boundaries
+        if self.lns_time_budget is not None:
+            model_result = ModelResult()
+            model_result.initFromScheduleDF(schedule_df, model_input_origin)
+
+            lns = LargeNeighborhoodSearch(self.max_package_num)
+            schedule_df = lns.improve(model_input_origin, model_result, self.lns_time_budget).toScheduleDF()
+
+        return schedule_df
@@ -5,6 +5,22 @@ from .structure import *
 from .logger import *
 import collections
 
+class TruckLoad:
+
+    def __init__(self):
+        # The truck being loaded
+        self.truck = None
+
+        # The packages in the truck and their total size
+        self.packages = []
+        self.total_area = 0
+        self.total_weight = 0
+
+        # The stops of the truck in delivery order and the arrival time at each stop
+        self.start_time = 0
+        self.destinations = []
+        self.arrival_time = {}
+
 class SearchSpaceReducer:
 
     def __init__(self):
@@ -33,32 +49,25 @@ class SearchSpaceReducer:
 
 
 
-        same_order_packages = collections.defaultdict(list)
-
-        for key, package in model_input.all_packages.items():
-            order_id, material_id, item_id = key
-
-            same_order_packages[order_id].append(package)
+        package_table = model_input.package_table
+        all_packages = list(model_input.all_packages.values())
 
-        remaining_packages = []
+        # Group the packages by order
+        sorted_index = np.argsort(package_table.order_codes, kind='stable')
+        order_codes = package_table.order_codes[sorted_index]
+        same_order = order_codes[1:] == order_codes[:-1]
 
-        same_order_packages_sorted = {}
+        # Assumption: packages of same order have same source, destination, available_time and danger_type
+        for column in [package_table.source_codes, package_table.destination_codes, package_table.available_time, package_table.danger_codes]:
+            values = column[sorted_index]
+            assert((values[1:] == values[:-1])[same_order].all())
 
-        for order_id, packages in same_order_packages.items():
-            source = set()
-            destination = set()
-            available_time = set()
-            danger_type = set()
+        split_points = np.flatnonzero(~same_order) + 1
 
-            for package in packages:
-                source.add(package.source)
-                destination.add(package.destination)
-                available_time.add(package.available_time)
-                danger_type.add(package.danger_type)
-            # same_order_packages_sorted[order_id] = sorted(packages, key=lambda p: (p.danger_type, p.available_time, p.material_id))
-
-            # Assumption: packages of same order have same source, destination, available_time and danger_type
-            assert(len(source) == 1 and len(destination) == 1 and len(available_time) == 1 and len(danger_type) == 1)
+        same_order_packages = {}
+        for indices in np.split(sorted_index, split_points):
+            if len(indices) > 0:
+                same_order_packages[package_table.orders[package_table.order_codes[indices[0]]]] = [all_packages[i] for i in indices]
 
         truck_type = model_input.truck_types[0] # truck type is sorted by size
 
@@ -73,8 +82,7 @@ class SearchSpaceReducer:
                 p_id = (package.order_id, package.material_id, package.item_id)
 
                 # Can put into the truck
-                if (total_area + package.area <= truck_type.area_capacity and 
-                total_weight + package.weight <= truck_type.weight_capacity):
+                if self.canLoad(truck_type, total_area, total_weight, package):
                     candidate_packages.append(package)
                     total_area += package.area
                     total_weight += package.weight
@@ -82,7 +90,7 @@ class SearchSpaceReducer:
                     # check if the packages are big enough
                     if (total_area > truck_type.area_capacity * threshold or 
                         total_weight > truck_type.weight_capacity * threshold):
-                        model_result_partial = self.addResult(candidate_packages, model_result_partial, model_input.distance_matrix, truck_type)
+                        model_result_partial = self.addResult(candidate_packages, model_result_partial, model_input.distances, truck_type)
 
                         candidate_packages = []
                         total_area = 0
@@ -104,7 +112,7 @@ class SearchSpaceReducer:
         # remove the scheduled packages
         model_input_reduced.all_packages = all_packages_reduced
         model_input_reduced.truck_types = model_input.truck_types
-        model_input_reduced.distance_matrix = model_input.distance_matrix
+        model_input_reduced.distances = model_input.distances
         model_input_reduced.all_trucks = model_input.getAllTrucks(model_input_reduced.all_packages, model_input_reduced.truck_types)
 
         logger.info(f"Number of packages before reduce step: {len(model_input.all_packages)}")
@@ -133,18 +141,19 @@ class SearchSpaceReducer:
         model_result_partial = ModelResult()
         model_input_reduced = ModelInput()
 
-        same_destination_packages = collections.defaultdict(list)
-
-        for key, package in model_input.all_packages.items():
-
-            same_destination_packages[package.destination].append(package)
-
-        same_destination_packages_sorted = {}
+        package_table = model_input.package_table
+        all_packages = list(model_input.all_packages.values())
 
         # Assumption: packages of same order have same source, destination, available_time and danger_type
-        for destination, packages in same_destination_packages.items():
-            same_destination_packages_sorted[destination] = sorted(packages, key=lambda p: (p.available_time, p.danger_type, p.order_id))
+        # Group the packages by destination, sorted by available time, danger type and order
+        sorted_index = np.lexsort((package_table.order_codes, package_table.danger_codes, package_table.available_time, package_table.destination_codes))
+        destination_codes = package_table.destination_codes[sorted_index]
+        split_points = np.flatnonzero(destination_codes[1:] != destination_codes[:-1]) + 1
 
+        same_destination_packages_sorted = {}
+        for indices in np.split(sorted_index, split_points):
+            if len(indices) > 0:
+                same_destination_packages_sorted[package_table.locations[package_table.destination_codes[indices[0]]]] = [all_packages[i] for i in indices]
 
         truck_type = model_input.truck_types[0] # truck type is sorted by size
 
@@ -161,8 +170,7 @@ class SearchSpaceReducer:
                 p_id = (package.order_id, package.material_id, package.item_id)
 
                 # Can put into the truck by capacity constraint
-                if (total_area + package.area <= truck_type.area_capacity and 
-                total_weight + package.weight <= truck_type.weight_capacity):
+                if self.canLoad(truck_type, total_area, total_weight, package):
 
                     # Check if they are the same danger type
                     if package.danger_type != 'non_danger':
@@ -206,7 +214,7 @@ class SearchSpaceReducer:
                     # check if the packages are big enough
                     if (total_area > truck_type.area_capacity * threshold or 
                         total_weight > truck_type.weight_capacity * threshold):
-                        model_result_partial = self.addResult(candidate_packages, model_result_partial, model_input.distance_matrix, truck_type)
+                        model_result_partial = self.addResult(candidate_packages, model_result_partial, model_input.distances, truck_type)
 
                         candidate_packages = []
                         total_area = 0
@@ -228,7 +236,7 @@ class SearchSpaceReducer:
         # remove the scheduled packages
         model_input_reduced.all_packages = all_packages_reduced
         model_input_reduced.truck_types = model_input.truck_types
-        model_input_reduced.distance_matrix = model_input.distance_matrix
+        model_input_reduced.distances = model_input.distances
         model_input_reduced.all_trucks = model_input.getAllTrucks(model_input_reduced.all_packages, model_input_reduced.truck_types)
 
         logger.info(f"Number of packages before reduce step: {len(model_input.all_packages)}")
@@ -242,7 +250,7 @@ class SearchSpaceReducer:
         Args:
             candidate_packages: the list of packages to be delivered by the same truck
             model_result_partial: the current partial scheduling.
-            distance_matrix: the matrix for storing distance between locations
+            distance_matrix: the DistanceMatrix for storing distance between locations
             truck_speed: the speed of the truck
 
         Returns:
@@ -259,7 +267,7 @@ class SearchSpaceReducer:
         first_package = True
 
         truck_start_time = max(p.available_time for p in candidate_packages)
-        truck_stop_time = truck_start_time + int(distance_matrix.loc[candidate_packages[0].source][candidate_packages[0].destination]/truck_speed)
+        truck_stop_time = truck_start_time + int(distance_matrix.getDistance(candidate_packages[0].source, candidate_packages[0].destination)/truck_speed)
 
         model_result_partial.all_trucks[truck.id] = truck
 
@@ -282,5 +290,239 @@ class SearchSpaceReducer:
         
         return model_result_partial
 
+    def canLoad(self, truck_type, total_area, total_weight, package):
+        """Function that checks if a package still fits into a truck by capacity.
+
+        Args:
+            truck_type: the type of the truck
+            total_area: the area already loaded into the truck
+            total_weight: the weight already loaded into the truck
+            package: the package to be loaded
+
+        Returns:
+            True if both the area and the weight stay within the capacity
+
+        """
+        return (total_area + package.area <= truck_type.area_capacity and 
+                total_weight + package.weight <= truck_type.weight_capacity)
+
+    def assignGreedy(self, model_input):
+        """Function to schedule all packages by heuristic on the trucks of the model input.
+
+           Heuristic:
+           Packages are sorted by available time, order and destination, and each one is put 
+           into the first loaded truck that can still take it. A new truck is used when none can, 
+           bigger truck types first. Packages left when the trucks run out are not scheduled.
+
+        Args:
+            model_input: the object that stores the model input.
+
+        Returns:
+            model_result: the scheduling that respects all constraints of the model.
+
+        """
+
+        model_result = ModelResult()
+        model_result.all_packages = model_input.all_packages
+        model_result.all_trucks = model_input.all_trucks
+
+        # The trucks not used yet by truck type
+        unused_trucks = collections.defaultdict(list)
+        for t_id, truck in model_input.all_trucks.items():
+            unused_trucks[truck.type.id].append(truck)
+
+        truck_loads = []
+
+        for p_id, package in sorted(model_input.all_packages.items(), 
+                                    key=lambda item: (item[1].available_time, item[1].order_id, item[1].destination)):
+
+            loaded = False
+
+            for truck_load in truck_loads:
+                if self.load(truck_load, package, model_input):
+                    loaded = True
+                    break
+
+            if not loaded:
+                for truck_type in model_input.truck_types:
+                    if len(unused_trucks[truck_type.id]) == 0:
+                        continue
+
+                    truck_load = TruckLoad()
+                    truck_load.truck = unused_trucks[truck_type.id][-1]
+
+                    if self.load(truck_load, package, model_input):
+                        unused_trucks[truck_type.id].pop()
+                        truck_loads.append(truck_load)
+                        loaded = True
+                        break
+
+            if not loaded:
+                logger.info(f"No truck is available for package: {p_id}")
+
+        for truck_load in truck_loads:
+            t_id = truck_load.truck.id
+
+            model_result.truck_assigned_route[t_id] = [truck_load.packages[0].source] + truck_load.destinations
+
+            for package in truck_load.packages:
+                p_id = (package.order_id, package.material_id, package.item_id)
+
+                model_result.package_assigned_truck[p_id] = t_id
+                model_result.truck_assigned_packages[t_id].append(p_id)
+                model_result.package_start_time[p_id] = truck_load.start_time
+                model_result.package_arrival_time[p_id] = truck_load.arrival_time[package.destination]
+
+        return model_result
+
+    def getFleetSize(self, model_input):
+        """Function that sizes the fleet of each truck type by bin packing.
+
+           Heuristic:
+           For each truck type, the packages are put by first-fit into trucks of this type only, 
+           in the order of assignGreedy. The trucks used can carry every package that fits the 
+           type on its own, which bounds the trucks of this type a scheduling needs.
+
+        Args:
+            model_input: the object that stores the model input.
+
+        Returns:
+            A dict from the truck type id to the number of trucks.
+
+        """
+
+        packages = sorted(model_input.all_packages.values(), key=lambda package: (package.available_time, package.order_id, package.destination))
+
+        fleet_size = {}
+        for truck_type in model_input.truck_types:
+            truck = Truck()
+            truck.type = truck_type
+
+            truck_loads = []
+            for package in packages:
+                if any(self.load(truck_load, package, model_input) for truck_load in truck_loads):
+                    continue
+
+                truck_load = TruckLoad()
+                truck_load.truck = truck
+
+                if self.load(truck_load, package, model_input):
+                    truck_loads.append(truck_load)
+
+            fleet_size[truck_type.id] = len(truck_loads)
+
+        return fleet_size
+
+    def load(self, truck_load, package, model_input, by_distance=False):
+        """Function that puts a package into a truck if no constraint is violated.
+
+        Args:
+            truck_load: the truck being loaded
+            package: the package to be loaded
+            model_input: the object that stores the model input.
+            by_distance: deliver the nearest destination first if all deadlines are met, 
+                the most urgent destination first otherwise.
+
+        Returns:
+            True if the package is loaded
+
+        """
+        truck_type = truck_load.truck.type
+        packages = truck_load.packages + [package]
+
+        if not self.canLoad(truck_type, truck_load.total_area, truck_load.total_weight, package):
+            return False
+
+        # All packages have the same source
+        if package.source != packages[0].source:
+            return False
+
+        # Dangerous packages with different danger types cannot be put on the same truck
+        if len(set(p.danger_type for p in packages) - {'non_danger'}) > 1:
+            return False
+
+        available_times = [p.available_time for p in packages]
+        if max(available_times) - min(available_times) > model_input.max_time_difference_between_package:
+            return False
+
+        deadlines = collections.defaultdict(lambda: float("inf"))
+        for p in packages:
+            deadlines[p.destination] = min(deadlines[p.destination], p.deadline)
+
+        if len(deadlines) > model_input.max_stops:
+            return False
+
+        # Deliver the most urgent destination first
+        routes = [sorted(deadlines, key=lambda destination: deadlines[destination])]
+
+        if by_distance:
+            routes.insert(0, self.getNearestRoute(package.source, list(deadlines), model_input))
+
+        start_time = max(available_times)
+
+        for destinations in routes:
+            arrival_time = self.getArrivalTime(package.source, destinations, start_time, truck_type, model_input)
+
+            if all(arrival_time[destination] <= deadlines[destination] for destination in destinations):
+                break
+        else:
+            return False
+
+        truck_load.packages = packages
+        truck_load.total_area += package.area
+        truck_load.total_weight += package.weight
+        truck_load.start_time = start_time
+        truck_load.destinations = destinations
+        truck_load.arrival_time = arrival_time
+
+        return True
+
+    def getNearestRoute(self, source, destinations, model_input):
+        """Function that orders the destinations by always going to the nearest one next.
+
+        Args:
+            source: the location the truck starts from
+            destinations: the destinations to be visited
+            model_input: the object that stores the model input.
+
+        Returns:
+            the list of destinations in visiting order
+
+        """
+        route = []
+        location = source
+        remaining = list(destinations)
+
+        while len(remaining) > 0:
+            location = min(remaining, key=lambda destination: model_input.distances.getDistance(location, destination))
+            remaining.remove(location)
+            route.append(location)
+
+        return route
+
+    def getArrivalTime(self, source, destinations, start_time, truck_type, model_input):
+        """Function that computes the arrival time at each stop of a route.
+
+        Arrival times follow the travel and stop times the model requires between stops.
+
+        Args:
+            source: the location the truck starts from
+            destinations: the destinations in visiting order
+            start_time: the time the truck starts
+            truck_type: the type of the truck
+            model_input: the object that stores the model input.
+
+        Returns:
+            a dict from destination to arrival time
+
+        """
+        arrival_time = {}
+        for i, destination in enumerate(destinations):
+            arrival_time[destination] = start_time + int(model_input.distances.getDistance(source, destination) / truck_type.speed)
+
+            for previous_destination in destinations[:i]:
+                arrival_time[destination] = max(arrival_time[destination], 
+                    arrival_time[previous_destination] + model_input.stop_time + 
+                    int(model_input.distances.getDistance(previous_destination, destination) / truck_type.speed))
 
-    
+        return arrival_time
@@ -0,0 +1,212 @@
+# Copyright (c) Microsoft. All rights reserved.
+# Licensed under the MIT license.
+
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+import copy
+import multiprocessing
+
+from .structure import *
+from .model import *
+from .greedy import *
+from .scheduler import *
+from .cache import *
+from .logger import *
+
+# The distance matrix loaded once by each worker process
+worker_distances = None
+
+def initWorker(distance):
+    """Function that loads the distance matrix of a worker process.
+
+    Args:
+        distance: the file/dataframe/DistanceMatrix that stores the pair-wise distance.
+
+    Returns:
+        None
+
+    """
+    global worker_distances
+
+    worker_distances = ModelInput().getDistances(distance)
+
+def solvePartition(partition, max_time_in_seconds=120, num_search_workers=None, concurrent_partitions=1, result_cache_dir=None, aggregate=False, symmetry_breaking=False, 
+    fleet_sizing=False, engine='cpsat'):
+    """Function that solves one partition with the distance matrix of the worker process.
+
+    Args:
+        partition: the order file of the partition or a ModelInput object without distance.
+        max_time_in_seconds: the maximum search time of the solver.
+        num_search_workers: the number of parallel search workers per partition.
+        concurrent_partitions: the number of partitions being solved at the same time.
+        result_cache_dir: the folder of the ResultCache, no result is cached if None.
+        aggregate: model identical items as one package with a quantity.
+        symmetry_breaking: order the interchangeable trucks of the same type.
+        fleet_sizing: solve with the sized fleet instead of the trucks of the partition.
+        engine: the solver, cpsat for the Model or greedy for the GreedySolver.
+
+    Returns:
+        schedule_df: the DataFrame that stores the route schedualing of the partition.
+        wall_time: the wall time in seconds of the solve.
+
+    """
+
+    if isinstance(partition, str):
+        model_input = ModelInput()
+        model_input.initInputFromFile(partition, worker_distances)
+
+    else:
+        model_input = partition
+        model_input.distances = worker_distances
+
+    result_cache = ResultCache(result_cache_dir) if result_cache_dir is not None else None
+
+    if result_cache is not None:
+        model_result = result_cache.get(model_input)
+
+        if model_result is not None:
+            return model_result.toScheduleDF(), 0
+
+    if engine == 'greedy':
+        solver = GreedySolver()
+        solver.setModelInput(model_input)
+        solver.solve()
+
+        # The greedy scheduling is not cached for the CP-SAT runs
+        return solver.getModelResult().toScheduleDF(), solver.wall_time
+
+    model, wall_time = solveModelInput(model_input, max_time_in_seconds, num_search_workers, concurrent_partitions, 
+        aggregate, symmetry_breaking, fleet_sizing)
+
+    model_result = model.getModelResult()
+
+    if result_cache is not None and model.solver.StatusName() in ['OPTIMAL', 'FEASIBLE']:
+        result_cache.put(model_input, model_result)
+
+    return model_result.toScheduleDF(), wall_time
+
+class LocalRunner:
+
+    def __init__(self, distance, num_workers=None, result_cache_dir=None, aggregate=False, symmetry_breaking=False, fleet_sizing=False, 
+        engine='cpsat'):
+        """Function that initializes the runner.
+
+        Args:
+            distance: the file/dataframe/DistanceMatrix that stores the pair-wise distance.
+            num_workers: the number of worker processes, one per core if None.
+            result_cache_dir: the folder of the ResultCache to reuse the scheduling of recurring partitions, not used if None.
+            aggregate: model identical items as one package with a quantity.
+            symmetry_breaking: order the interchangeable trucks of the same type.
+            fleet_sizing: solve with the sized fleet instead of the trucks of each partition.
+            engine: the solver, cpsat for the Model or greedy for the GreedySolver.
+
+        """
+        self.distance = distance
+        self.num_workers = num_workers if num_workers is not None else multiprocessing.cpu_count()
+        self.result_cache_dir = result_cache_dir
+        self.aggregate = aggregate
+        self.symmetry_breaking = symmetry_breaking
+        self.fleet_sizing = fleet_sizing
+        self.engine = engine
+
+    def run(self, partitions, max_time_in_seconds=120, num_search_workers=None, time_budget=None):
+        """Function that solves the partitions across a pool of worker processes.
+
+        The biggest partitions are submitted first so that they do not end up running alone at the end.
+
+        Args:
+            partitions: the list of order files or ModelInput objects of the partitions.
+            max_time_in_seconds: the maximum search time of the solver.
+            num_search_workers: the number of parallel search workers per partition, decided by the model size if None.
+            time_budget: the wall clock budget in seconds for all partitions, shared by their difficulty 
+                instead of max_time_in_seconds if not None.
+
+        Returns:
+            A generator of the route schedualing DataFrame of each partition, in the order they finish.
+
+        """
+
+        partitions = sorted(partitions, key=self.getPartitionSize, reverse=True)
+
+        scheduler = None
+        if time_budget is not None:
+            scheduler = TimeBudgetScheduler(time_budget, self.num_workers)
+
+            for i, partition in enumerate(partitions):
+                scheduler.addPartition(i, self.getPackageNum(partition))
+
+        with ProcessPoolExecutor(max_workers=self.num_workers, initializer=initWorker, initargs=(self.distance,)) as executor:
+            running = {}
+            next_partition = 0
+
+            while next_partition < len(partitions) or len(running) > 0:
+
+                # Submit lazily so the time limit of a partition includes the time released by the solved ones
+                while next_partition < len(partitions) and len(running) < self.num_workers:
+                    partition = partitions[next_partition]
+
+                    if not isinstance(partition, str):
+                        # Each worker has its own distance matrix, so it is not sent with every partition,
+                        # and only the package table is sent since the package objects are rebuilt from it
+                        partition = copy.copy(partition)
+                        partition.package_table = partition.package_table
+                        partition.distances = None
+
+                    engine = self.engine
+                    if scheduler is not None:
+                        max_time_in_seconds = scheduler.allocate(next_partition)
+
+                        # Past the deadline the partitions are still scheduled, by the greedy engine
+                        if max_time_in_seconds <= 0:
+                            engine = 'greedy'
+
+                    future = executor.submit(solvePartition, partition, max_time_in_seconds, num_search_workers, self.num_workers, 
+                        self.result_cache_dir, self.aggregate, self.symmetry_breaking, self.fleet_sizing, engine)
+                    running[future] = next_partition
+                    next_partition += 1
+
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+
+                for future in done:
+                    i = running.pop(future)
+                    schedule_df, wall_time = future.result()
+
+                    if scheduler is not None:
+                        scheduler.release(i, wall_time)
+
+                    yield schedule_df
+
+    def getPackageNum(self, partition):
+        """Function that gets the number of packages of a partition without parsing it.
+
+        Args:
+            partition: the order file or the ModelInput object of the partition.
+
+        Returns:
+            the number of packages.
+
+        """
+        if isinstance(partition, str):
+            if partition.endswith('.npz'):
+                with np.load(partition) as arrays:
+                    return len(arrays['area'])
+
+            # One package per row after the header
+            with open(partition, 'rb') as f:
+                return max(0, sum(1 for line in f) - 1)
+
+        return len(partition.package_table)
+
+    def getPartitionSize(self, partition):
+        """Function that estimates the size of a partition.
+
+        Args:
+            partition: the order file or the ModelInput object of the partition.
+
+        Returns:
+            the file size for an order file, the number of packages for a ModelInput object.
+
+        """
+        if isinstance(partition, str):
+            return os.path.getsize(partition)
+
+        return len(partition.package_table)
@@ -0,0 +1,115 @@
+# Copyright (c) Microsoft. All rights reserved.
+# Licensed under the MIT license.
+
+import time
+
+from .logger import *
+
+class TimeBudgetScheduler:
+
+    def __init__(self, total_time_in_seconds, concurrent_partitions=1, min_time_in_seconds=1):
+        """Function that initializes the scheduler.
+
+        Args:
+            total_time_in_seconds: the wall clock budget for solving all partitions.
+            concurrent_partitions: the number of partitions being solved at the same time.
+            min_time_in_seconds: the minimum time limit of any partition.
+
+        """
+        self.total_time_in_seconds = total_time_in_seconds
+        self.concurrent_partitions = concurrent_partitions
+        self.min_time_in_seconds = min_time_in_seconds
+
+        # The wall clock deadline of the run
+        self.deadline = time.monotonic() + total_time_in_seconds
+
+        # Solver seconds not given to any partition yet, each concurrent slot runs for the whole budget
+        self.remaining_time = total_time_in_seconds * concurrent_partitions
+
+        # The difficulty of each partition and the total of the ones without a time limit yet
+        self.difficulty = {}
+        self.pending_difficulty = 0
+
+        # The time limit given to each partition
+        self.allocated_time = {}
+
+    def addPartition(self, key, num_packages):
+        """Function that adds a partition to be scheduled.
+
+        Args:
+            key: the key to refer to the partition.
+            num_packages: the number of packages of the partition.
+
+        Returns:
+            None
+
+        """
+        self.difficulty[key] = self.getDifficulty(num_packages)
+        self.pending_difficulty += self.difficulty[key]
+
+    def getDifficulty(self, num_packages):
+        """Function that estimates how hard a partition is to solve from its model size.
+
+        Args:
+            num_packages: the number of packages of the partition.
+
+        Returns:
+            the estimated difficulty.
+
+        """
+        num_pairs = num_packages * (num_packages - 1) // 2
+
+        # Each package and each pair comes with constraints over all trucks, and the trucks grow with the packages
+        return max(1, (num_packages + num_pairs) * num_packages)
+
+    def allocate(self, key):
+        """Function that gives a partition its time limit before it is solved.
+
+        Args:
+            key: the key of the partition.
+
+        Returns:
+            the time limit in seconds, 0 if the budget is used up.
+
+        """
+        difficulty = self.difficulty[key]
+
+        allocated_time = self.remaining_time * difficulty / self.pending_difficulty
+
+        # No partition can run beyond the deadline of the run or the solver time left, 
+        # so once the deadline is reached the partitions get no time at all
+        allocated_time = max(allocated_time, self.min_time_in_seconds)
+        allocated_time = max(0, min(allocated_time, self.deadline - time.monotonic(), self.remaining_time))
+
+        self.pending_difficulty -= difficulty
+        self.remaining_time -= allocated_time
+        self.allocated_time[key] = allocated_time
+
+        logger.info(f"Time limit of partition {key}: {allocated_time:.1f} s")
+
+        return allocated_time
+
+    def release(self, key, used_time):
+        """Function that gives the time unused by a solved partition back to the others.
+
+        Args:
+            key: the key of the partition.
+            used_time: the wall time in seconds the partition was solved in.
+
+        Returns:
+            None
+
+        """
+        self.remaining_time += max(0, self.allocated_time[key] - used_time)
+
+    def skip(self, key):
+        """Function that removes a partition that needs no solve, e.g. one found in the result cache.
+
+        Args:
+            key: the key of the partition.
+
+        Returns:
+            None
+
+        """
+        self.pending_difficulty -= self.difficulty[key]
@@ -2,6 +2,7 @@
 # Licensed under the MIT license.
 
 import pandas as pd
+import numpy as np
 import collections
 import uuid
 import math
@@ -11,6 +12,152 @@ from .logger import *
 # scale floating value of area and weight to integer with enough precision
 scale_factor = 10000
 
+# version of the input parsing, bump it whenever the parsed package table or distance matrix changes
+parser_version = 1
+
+# format of the time columns in the order file
+time_format = '%Y-%m-%d %H:%M:%S'
+
+# columns of the order file
+order_columns = [
+    "Order_ID",
+    "Material_ID",
+    "Item_ID",
+    "Source",
+    "Destination",
+    "Available_Time",
+    "Deadline",
+    "Danger_Type",
+    "Area",
+    "Weight"
+]
+
+# columns of the schedule file
+schedule_columns = [
+    "Schedule_ID",
+    "Truck_Route",
+    "Order_ID",
+    "Material_ID",
+    "Item_ID",
+    "Danger_Type",
+    "Source",
+    "Destination",
+    "Start_Time",
+    "Arrival_Time",
+    "Deadline",
+    "Shared_Truck",
+    "Truck_Type",
+    "Area_Rate",
+    "Weight_Rate",
+    "Capacity_Rate"
+]
+
+def toTimestamps(times):
+    """Function that converts a column of times to epoch seconds in bulk.
+
+    Args:
+        times: the Series of time strings, datetime values or epoch seconds.
+
+    Returns:
+        A numpy array of epoch seconds.
+
+    """
+
+    if pd.api.types.is_integer_dtype(times):
+        return times.to_numpy(dtype=np.int64)
+
+    # Order files carry few distinct times, so each one is parsed once and the rows gather the result
+    codes, uniques = pd.factorize(times)
+
+    if (codes < 0).any():
+        raise ValueError(f"Missing values in time column {times.name}")
+
+    if pd.api.types.is_datetime64_any_dtype(uniques):
+        parsed = pd.DatetimeIndex(uniques)
+    else:
+        parsed = pd.to_datetime(uniques, format=time_format)
+
+    # Times are local, same as datetime.timestamp
+    seconds = np.array([int(datetime.timestamp(t)) for t in parsed.to_pydatetime()], dtype=np.int64)
+
+    return seconds[codes]
+
+def fromTimestamps(seconds):
+    """Function that converts epoch seconds to times in bulk.
+
+    Args:
+        seconds: the array of epoch seconds.
+
+    Returns:
+        A numpy datetime64 array of local times.
+
+    """
+
+    # Schedules carry few distinct times, so each one is converted once and the rows gather the result
+    uniques, codes = np.unique(seconds, return_inverse=True)
+
+    # Times are local, same as datetime.fromtimestamp
+    times = pd.DatetimeIndex([datetime.fromtimestamp(t) for t in uniques.tolist()]).to_numpy()
+
+    return times[codes.reshape(-1)]
+
+def saveDFToNPZ(df, npz_file):
+    """Function that saves a DataFrame to a npz file with one typed array per column.
+
+    Args:
+        df: the DataFrame to save.
+        npz_file: the npz file to write.
+
+    Returns:
+        None
+
+    """
+
+    arrays = {}
+    for column in df.columns:
+        # Object columns such as ids are saved as fixed width unicode, so the file loads without pickle
+        if df[column].dtype == object:
+            arrays[column] = df[column].astype(str).to_numpy(dtype=str)
+        else:
+            arrays[column] = df[column].to_numpy()
+
+    np.savez(npz_file, **arrays)
+
+def loadDFFromNPZ(npz_file):
+    """Function that loads a DataFrame from a npz file written by saveDFToNPZ.
+
+    Args:
+        npz_file: the npz file to read.
+
+    Returns:
+        A DataFrame with the columns in the saved order.
+
+    """
+
+    with np.load(npz_file) as arrays:
+        columns = {}
+        for column in arrays.files:
+            value = arrays[column]
+            columns[column] = value.astype(object) if value.dtype.kind == 'U' else value
+
+    return pd.DataFrame(columns)
+
+def readScheduleDF(schedule_file):
+    """Function that reads a route schedualing from a csv or npz file.
+
+    Args:
+        schedule_file: the csv/npz file that stores the route schedualing.
+
+    Returns:
+        A DataFrame that stores the route schedualing.
+
+    """
+
+    if schedule_file.endswith('.npz'):
+        return loadDFFromNPZ(schedule_file)
+
+    return pd.read_csv(schedule_file)
+
 class Package:
     
     def __init__(self):
@@ -67,18 +214,503 @@ class Truck:
         self.type = None
 
 
+class PackageTable:
+
+    def __init__(self):
+        # ID, order and material ids are interned as integer codes
+        self.order_codes = None
+        self.material_codes = None
+        self.item_ids = None
+        self.orders = None
+        self.materials = None
+
+        # size
+        self.area = None
+        self.weight = None
+
+        # type of dangerours goods as integer codes
+        self.danger_codes = None
+        self.danger_types = None
+
+        # source and destination as integer codes into the same location list
+        self.source_codes = None
+        self.destination_codes = None
+        self.locations = None
+
+        # available time and deadline in seconds
+        self.available_time = None
+        self.deadline = None
+
+    # the attributes that are lists of distinct values
+    category_names = ['orders', 'materials', 'danger_types', 'locations']
+
+    def __len__(self):
+        return 0 if self.area is None else len(self.area)
+
+    def save(self, table_file):
+        """Function that saves the table to a npz file with typed columns.
+
+        Args:
+            table_file: the npz file to write
+
+        Returns:
+            None
+
+        """
+
+        arrays = {}
+        for name, value in vars(self).items():
+            # Strings are saved as fixed width unicode, so the file loads without pickle
+            if isinstance(value, np.ndarray) and value.dtype == object:
+                arrays[name] = value.astype(str)
+            else:
+                arrays[name] = np.asarray(value)
+
+        np.savez(table_file, **arrays)
+
+    def load(self, table_file):
+        """Function that loads the table from a npz file.
+
+        Args:
+            table_file: the npz file written by save
+
+        Returns:
+            None
+
+        """
+
+        with np.load(table_file) as arrays:
+            for name in arrays.files:
+                value = arrays[name]
+
+                if name in self.category_names:
+                    setattr(self, name, value.tolist())
+                elif value.dtype.kind == 'U':
+                    setattr(self, name, value.astype(object))
+                else:
+                    setattr(self, name, value)
+
+    def intern(self, values):
+        """Function that interns a column of values as integer codes.
+
+        Args:
+            values: the Series of values
+
+        Returns:
+            codes: the array of integer codes.
+            categories: the list of distinct values in sorted order.
+
+        """
+
+        codes, categories = pd.factorize(values, sort=True)
+
+        return codes.astype(np.int32), list(categories)
+
+    def initFromDF(self, order_df):
+        """Function that initializes the table from the order dataframe.
+
+        Args:
+            order_df: the dataframe that stores the order
+
+        Returns:
+            None
+
+        """
+
+        self.order_codes, self.orders = self.intern(order_df['Order_ID'])
+        self.material_codes, self.materials = self.intern(order_df['Material_ID'])
+        self.item_ids = order_df['Item_ID'].to_numpy(dtype=object)
+
+        self.area = order_df['Area'].to_numpy()
+        self.weight = order_df['Weight'].to_numpy()
+
+        self.danger_codes, self.danger_types = self.intern(order_df['Danger_Type'])
+
+        # source and destination share the same location codes
+        location_codes, self.locations = self.intern(pd.concat([order_df['Source'], order_df['Destination']], ignore_index=True))
+        self.source_codes = location_codes[:order_df.shape[0]]
+        self.destination_codes = location_codes[order_df.shape[0]:]
+
+        self.available_time = toTimestamps(order_df['Available_Time'])
+        self.deadline = toTimestamps(order_df['Deadline'])
+
+    def initFromPackages(self, all_packages):
+        """Function that initializes the table from package objects.
+
+        Args:
+            all_packages: the dict of package objects.
+
+        Returns:
+            None
+
+        """
+
+        packages = list(all_packages.values())
+
+        order_df = pd.DataFrame({
+            "Order_ID": [p.order_id for p in packages],
+            "Material_ID": [p.material_id for p in packages],
+            "Item_ID": [p.item_id for p in packages],
+            "Source": [p.source for p in packages],
+            "Destination": [p.destination for p in packages],
+            "Available_Time": np.array([p.available_time for p in packages], dtype=np.int64),
+            "Deadline": np.array([p.deadline for p in packages], dtype=np.int64),
+            "Danger_Type": [p.danger_type for p in packages],
+            "Area": [p.area for p in packages],
+            "Weight": [p.weight for p in packages]
+        }, columns=order_columns)
+
+        self.initFromDF(order_df)
+
+    def decode(self, codes, categories):
+        """Function that decodes integer codes back to values.
+
+        Args:
+            codes: the array of integer codes.
+            categories: the list of distinct values.
+
+        Returns:
+            A list of values.
+
+        """
+
+        return np.asarray(categories, dtype=object)[codes].tolist()
+
+    def getKeys(self):
+        """Function that gets the package ids in table order.
+
+        Args:
+            None
+
+        Returns:
+            A list of (order_id, material_id, item_id) tuples.
+
+        """
+
+        return list(zip(self.decode(self.order_codes, self.orders),
+                        self.decode(self.material_codes, self.materials),
+                        self.item_ids.tolist()))
+
+    def take(self, indices):
+        """Function that creates a new table with the selected rows.
+
+        Args:
+            indices: the array of row indices.
+
+        Returns:
+            A PackageTable object sharing the categories with this one.
+
+        """
+
+        package_table = PackageTable()
+
+        for name, value in vars(self).items():
+            if isinstance(value, np.ndarray):
+                setattr(package_table, name, value[indices])
+            else:
+                setattr(package_table, name, value)
+
+        return package_table
+
+    def toPackages(self):
+        """Function that converts the table into package objects.
+
+        Args:
+            None
+
+        Returns:
+            A dict of package objects keyed by (order_id, material_id, item_id).
+
+        """
+
+        all_packages = {}
+        for order_id, material_id, item_id, source, destination, available_time, deadline, danger_type, area, weight in zip(
+            self.decode(self.order_codes, self.orders),
+            self.decode(self.material_codes, self.materials),
+            self.item_ids.tolist(),
+            self.decode(self.source_codes, self.locations),
+            self.decode(self.destination_codes, self.locations),
+            self.available_time.tolist(),
+            self.deadline.tolist(),
+            self.decode(self.danger_codes, self.danger_types),
+            self.area.tolist(),
+            self.weight.tolist()):
+
+            package = Package()
+            package.order_id = order_id
+            package.material_id = material_id
+            package.item_id = item_id
+            package.source = source
+            package.destination = destination
+            package.available_time = available_time
+            package.deadline = deadline
+            package.danger_type = danger_type
+            package.area = area
+            package.weight = weight
+
+            all_packages[order_id, material_id, item_id] = package
+
+        return all_packages
+
+
+class DistanceMatrix:
+
+    def __init__(self):
+        # location names, the last one is reserved as a placeholder
+        self.locations = None
+        # location name to row/column id
+        self.location_index = None
+        # contiguous matrix of the pair-wise distance in M, rows are sources and columns are destinations
+        self.matrix = None
+
+    @property
+    def shape(self):
+        return self.matrix.shape
+
+    def initFromDF(self, distance_df):
+        """Function that initializes the matrix from the pair-wise distance dataframe.
+
+        Args:
+            distance_df: the dataframe with Source, Destination and Distance(M) columns.
+
+        Returns:
+            None
+
+        """
+
+        num_sources = distance_df['Source'].nunique()
+        num_destinations = distance_df['Destination'].nunique()
+        assert(num_sources == num_destinations)
+
+        location_ids, locations = pd.factorize(pd.concat([distance_df['Source'], distance_df['Destination']], ignore_index=True), sort=True)
+        self.setLocations(list(locations))
+
+        distances = distance_df['Distance(M)'].to_numpy()
+        num_locations = len(self.locations)
+
+        # Missing pairs and the placeholder row/column stay 0
+        self.matrix = np.zeros((num_locations, num_locations), dtype=self.getDType(distances))
+        self.matrix[location_ids[:distance_df.shape[0]], location_ids[distance_df.shape[0]:]] = np.nan_to_num(distances)
+
+    def initFromMatrixDF(self, distance_matrix):
+        """Function that initializes the matrix from a pivoted distance dataframe.
+
+        Args:
+            distance_matrix: the dataframe indexed by source with one column per destination.
+
+        Returns:
+            None
+
+        """
+
+        locations = [location for location in distance_matrix.index if location != "Placeholder"]
+        self.setLocations(locations)
+
+        location_ids = self.getIds(locations)
+        distances = distance_matrix.loc[locations, locations].fillna(0).to_numpy()
+
+        self.matrix = np.zeros((len(self.locations), len(self.locations)), dtype=self.getDType(distances))
+        self.matrix[np.ix_(location_ids, location_ids)] = distances
+
+    def setLocations(self, locations):
+        """Function that sets the location list and its index.
+
+        Args:
+            locations: the list of location names without the placeholder.
+
+        Returns:
+            None
+
+        """
+
+        self.locations = locations + ["Placeholder"] # The last location is reserved as a placeholder.
+        self.location_index = {location: i for i, location in enumerate(self.locations)}
+
+    def getDType(self, distances):
+        """Function that gets the smallest dtype that holds the distance.
+
+        Args:
+            distances: the array of distance.
+
+        Returns:
+            int32 for integer distance, float32 otherwise.
+
+        """
+
+        if np.issubdtype(distances.dtype, np.integer) and (len(distances) == 0 or distances.max() <= np.iinfo(np.int32).max):
+            return np.int32
+
+        return np.float32
+
+    def getId(self, location):
+        """Function that gets the id of a location.
+
+        Args:
+            location: the location name.
+
+        Returns:
+            The integer id of the location.
+
+        """
+
+        return self.location_index[location]
+
+    def getIds(self, locations):
+        """Function that gets the ids of a list of locations.
+
+        Args:
+            locations: the list of location names.
+
+        Returns:
+            A numpy array of integer ids.
+
+        """
+
+        return np.array([self.location_index[location] for location in locations], dtype=np.int32)
+
+    def getDistance(self, source, destination):
+        """Function that gets the distance between two locations.
+
+        Args:
+            source: the source location name.
+            destination: the destination location name.
+
+        Returns:
+            The distance in M.
+
+        """
+
+        return self.matrix[self.location_index[source], self.location_index[destination]].item()
+
+    def gather(self, source_ids, destination_ids):
+        """Function that gets the distance of many location pairs at once.
+
+        Args:
+            source_ids: the array of source ids.
+            destination_ids: the array of destination ids.
+
+        Returns:
+            A numpy array of distance in M.
+
+        """
+
+        return self.matrix[source_ids, destination_ids]
+
+    def toDF(self):
+        """Function that converts the matrix into a pivoted DataFrame.
+
+        Args:
+            None
+
+        Returns:
+            A DataFrame indexed by source with one column per destination.
+
+        """
+
+        return pd.DataFrame(self.matrix, index=self.locations, columns=self.locations)
+
+    def save(self, matrix_file):
+        """Function that saves the matrix and its locations to a npz file.
+
+        Args:
+            matrix_file: the npz file to write
+
+        Returns:
+            None
+
+        """
+
+        np.savez(matrix_file, matrix=self.matrix, locations=np.array(self.locations[:-1], dtype=str))
+
+    def load(self, matrix_file):
+        """Function that loads the matrix and its locations from a npz file.
+
+        Args:
+            matrix_file: the npz file written by save
+
+        Returns:
+            None
+
+        """
+
+        with np.load(matrix_file) as arrays:
+            self.setLocations(arrays['locations'].tolist())
+            self.matrix = arrays['matrix']
+
+
 class ModelInput:
     
     @property
-    def location_list(self):
-        if self._location_list is None:
-            locations = set()
+    def all_packages(self):
+        # The package objects are a view that is built from the package table on first access
+        if self._all_packages is None and self._package_table is not None:
+            self._all_packages = self._package_table.toPackages()
+
+        return self._all_packages
+
+    @all_packages.setter
+    def all_packages(self, all_packages):
+        self._all_packages = all_packages
+        self._package_table = None
+        self._location_list = None
+        self._location_ids = None
+
+    @property
+    def package_table(self):
+        # The package table is built from the package objects on first access
+        if self._package_table is None and self._all_packages is not None:
+            self._package_table = PackageTable()
+            self._package_table.initFromPackages(self._all_packages)
+
+        return self._package_table
+
+    @package_table.setter
+    def package_table(self, package_table):
+        self._package_table = package_table
+        self._all_packages = None
+        self._location_list = None
+        self._location_ids = None
+
+    @property
+    def distance_matrix(self):
+        # The pivoted DataFrame is a view that is built from the distance store on first access
+        if self._distance_matrix is None and self._distances is not None:
+            self._distance_matrix = self._distances.toDF()
 
-            for key in self.all_packages:
-                locations.add(self.all_packages[key].source)
-                locations.add(self.all_packages[key].destination)
+        return self._distance_matrix
+
+    @distance_matrix.setter
+    def distance_matrix(self, distance_matrix):
+        self._distance_matrix = distance_matrix
+        self._distances = None
+        self._location_ids = None
+
+        if distance_matrix is not None:
+            self._distances = DistanceMatrix()
+            self._distances.initFromMatrixDF(distance_matrix)
+
+    @property
+    def distances(self):
+        return self._distances
 
-            locations_list = list(locations)
+    @distances.setter
+    def distances(self, distances):
+        self._distances = distances
+        self._distance_matrix = None
+        self._location_ids = None
+
+    @property
+    def location_ids(self):
+        # The ids in the distance store of each location in location_list
+        if self._location_ids is None:
+            self._location_ids = self.distances.getIds(self.location_list)
+
+        return self._location_ids
+
+    @property
+    def location_list(self):
+        if self._location_list is None:
+            locations_list = list(self.package_table.locations)
             locations_list.append("Placeholder") # The last location is reserved as a placeholder. 
 
             self._location_list = locations_list
@@ -88,7 +720,13 @@ class ModelInput:
             return self._location_list
 
     def __init__(self):
-        self.all_packages = None
+        self._all_packages = None
+        self._package_table = None
+        self._location_list = None
+        self._location_ids = None
+        self._distances = None
+        self._distance_matrix = None
+
         self.truck_types = None
         self.all_trucks = None
         self.max_time_difference_between_package = 2 * 60 * 60 # The available time between two package in the same truck must be less than 2 hours
@@ -98,15 +736,14 @@ class ModelInput:
 
         self.cost_scale_factor = 1000 # Scale the cost to make it integer
 
-        self.distance_matrix = None
-        self._location_list = None
 
-    def initInputFromFile(self, order_file, distance_file):
+    def initInputFromFile(self, order_file, distance_file, input_cache=None):
         """Function that initialize model input from files.
 
         Args:
             order_file: the file that stores the order
             distance_file: the file that stores the pair-wised distance
+            input_cache: the InputCache to load the parsed files from, the files are parsed if None
             
         Returns:
             None
@@ -114,11 +751,17 @@ class ModelInput:
         """
         
         # Initialize the package to be delivered
-        self.all_packages = self.getAllPackages(order_file)
+        if input_cache is not None and isinstance(order_file, str):
+            self.package_table = input_cache.getPackageTable(order_file)
+        else:
+            self.package_table = self.getPackageTable(order_file)
         # Initialize the truck types
         self.truck_types = self.getTruckTypes()
         # Initialize the distance matrix
-        self.distance_matrix = self.getDistanceMatrix(distance_file)
+        if input_cache is not None and isinstance(distance_file, str):
+            self.distances = input_cache.getDistances(distance_file)
+        else:
+            self.distances = self.getDistances(distance_file)
         # Get the upper bound of trucks we need to use for each truck type
         self.all_trucks = self.getAllTrucks(self.all_packages, self.truck_types)
 
@@ -136,11 +779,11 @@ class ModelInput:
         """
 
         # Initialize the package to be delivered
-        self.all_packages = self.getAllPackages(order_df)
+        self.package_table = self.getPackageTable(order_df)
         # Initialize the truck types
         self.truck_types = self.getTruckTypes()
         # Initialize the distance matrix
-        self.distance_matrix = self.getDistanceMatrix(distance_df)
+        self.distances = self.getDistances(distance_df)
         # Get the upper bound of trucks we need to use for each truck type
         self.all_trucks = self.getAllTrucks(self.all_packages, self.truck_types)
 
@@ -155,29 +798,65 @@ class ModelInput:
 
         """
 
+        return self.getPackageTable(order).toPackages()
+
+    def getPackageTable(self, order):
+        """Function that constructs the package table from a file.
+
+        Args:
+            order: the csv/npz file or dataframe that stores the order
+            
+        Returns:
+            A PackageTable object.
+
+        """
+
+        if isinstance(order, str) and order.endswith('.npz'):
+            package_table = PackageTable()
+            package_table.load(order)
+
+            return package_table
+
         if isinstance(order, str):
             order_df = pd.read_csv(order)
 
         else:
             order_df = order
 
-        all_packages = {}
-        for index, row in order_df.iterrows():
-            package = Package()
-            package.order_id = row['Order_ID']
-            package.material_id = row['Material_ID']
-            package.item_id = row['Item_ID']
-            package.source = row['Source']
-            package.destination = row['Destination']
-            package.available_time = int(datetime.timestamp(datetime.strptime(row['Available_Time'], '%Y-%m-%d %H:%M:%S')))
-            package.deadline = int(datetime.timestamp(datetime.strptime(row['Deadline'], '%Y-%m-%d %H:%M:%S')))
-            package.danger_type = row['Danger_Type']
-            package.area = row['Area']
-            package.weight = row['Weight']
-
-            all_packages[package.order_id, package.material_id, package.item_id] = package
+        self.validateOrderDF(order_df)
 
-        return all_packages
+        # Duplicated package ids are kept once, the last one wins
+        package_keys = ['Order_ID', 'Material_ID', 'Item_ID']
+        if order_df.duplicated(package_keys).any():
+            order_df = order_df.drop_duplicates(package_keys, keep='last')
+
+        package_table = PackageTable()
+        package_table.initFromDF(order_df)
+
+        return package_table
+
+    def validateOrderDF(self, order_df):
+        """Function that validates the columns of the order dataframe.
+
+        Args:
+            order_df: the dataframe that stores the order
+
+        Returns:
+            None
+
+        """
+
+        missing_columns = [column for column in order_columns if column not in order_df.columns]
+        if len(missing_columns) > 0:
+            raise ValueError(f"Missing columns in the order: {missing_columns}")
+
+        for column in ['Area', 'Weight']:
+            if not pd.api.types.is_numeric_dtype(order_df[column]):
+                raise ValueError(f"Column {column} of the order must be numeric")
+
+        null_columns = [column for column in order_columns if order_df[column].isnull().any()]
+        if len(null_columns) > 0:
+            raise ValueError(f"Missing values in columns of the order: {null_columns}")
 
     def getTruckTypes(self):
         """Function that create the list of truck type we can use.
@@ -257,9 +936,11 @@ class ModelInput:
             
             # assumption: the same order id will be delivered to the same destination
             groupby_order_id = collections.defaultdict(list)
+            first_package_id = {}
 
             for key, package in all_packages.items():
                 groupby_order_id[package.order_id].append(package)
+                first_package_id.setdefault(package.order_id, key)
 
             for order_id, packages in groupby_order_id.items():
                 min_num_by_area = math.ceil(sum(package.area for package in packages) / (truck_type.area_capacity))
@@ -281,7 +962,8 @@ class ModelInput:
 
                 for i in range(0, min_num):
                     truck = Truck()
-                    truck.id = uuid.uuid4()
+                    # The same input always gets the same trucks, and the items are unique across partitions
+                    truck.id = uuid.uuid5(uuid.NAMESPACE_OID, f'{first_package_id[order_id]}/{truck_type.id}/{i}')
                     truck.type = truck_type
 
                     all_trucks[truck.id] = truck
@@ -289,6 +971,33 @@ class ModelInput:
         return all_trucks
 
 
+    def getFleet(self, all_packages, truck_types, fleet_size):
+        """Function that creates the trucks of a fleet.
+
+        Args:
+            all_packages: the packages to be delivered, the truck ids are derived from the first one.
+            truck_types: the list of truck types
+            fleet_size: a dict from the truck type id to the number of trucks.
+            
+        Returns:
+            A dict of truck objects.
+
+        """
+        all_trucks = {}
+
+        first_package_id = next(iter(all_packages))
+
+        for truck_type in truck_types:
+            # A bigger fleet keeps the ids of the smaller one
+            for i in range(fleet_size.get(truck_type.id, 0)):
+                truck = Truck()
+                truck.id = uuid.uuid5(uuid.NAMESPACE_OID, f'fleet/{first_package_id}/{truck_type.id}/{i}')
+                truck.type = truck_type
+
+                all_trucks[truck.id] = truck
+
+        return all_trucks
+
     def getDistanceMatrix(self, distance):
         """Function that constructs the distance matrix from a file.
 
@@ -300,28 +1009,34 @@ class ModelInput:
 
         """
 
+        return self.getDistances(distance).toDF()
+
+    def getDistances(self, distance):
+        """Function that constructs the dense distance store from a file.
+
+        Args:
+            distance: a file/dataframe that stores the pair-wise distance, or a DistanceMatrix that is used as it is.
+            
+        Returns:
+            A DistanceMatrix object that stores the pair-wise distance.
+
+        """
+
         # distance are in M
 
+        if isinstance(distance, DistanceMatrix):
+            return distance
+
         if isinstance(distance, str):
             distance_df = pd.read_csv(distance)
 
         else:
             distance_df = distance
 
-        distance_matrix_raw = distance_df.pivot('Source', 'Destination', 'Distance(M)')
-        assert(distance_matrix_raw.shape[0] == distance_matrix_raw.shape[1])
-
-        distance_matrix = distance_matrix_raw.copy()
-
-        # Add the last one as a placeholder
-        distance_matrix["Placeholder"] = 0
-        # Add the row for the placeholder location
-        distance_matrix.loc["Placeholder"] = [0] * (distance_matrix_raw.shape[1] + 1)
-        
-        # fill na
-        distance_matrix = distance_matrix.fillna(0)
+        distances = DistanceMatrix()
+        distances.initFromDF(distance_df)
                         
-        return distance_matrix
+        return distances
 
     def toOrderDF(self):
         """Function that convert the model input into DataFrame format.
@@ -335,18 +1050,7 @@ class ModelInput:
         """
         order_list = []
 
-        columns = [
-            "Order_ID",
-            "Material_ID",
-            "Item_ID",
-            "Source",
-            "Destination",
-            "Available_Time",
-            "Deadline",
-            "Danger_Type",
-            "Area",
-            "Weight"
-        ]
+        columns = order_columns
 
         for p_id, p in self.all_packages.items():
             order = (p.order_id, 
@@ -367,6 +1071,19 @@ class ModelInput:
 
         return order_df
 
+    def toOrderNPZ(self, order_file):
+        """Function that saves the packages of the model input to a npz file.
+
+        Args:
+            order_file: the npz file to write
+            
+        Returns:
+            None
+
+        """
+
+        self.package_table.save(order_file)
+
 class ModelResult:
 
     def __init__(self):
@@ -381,6 +1098,7 @@ class ModelResult:
 
     def addResult(self, partial_result):
         """Function that adds partial result to the current one.
+        The dicts of the current result are updated in place, so it should own them, e.g. start from an empty ModelResult.
 
         Args:
             partial_result: the partial model result
@@ -390,18 +1108,194 @@ class ModelResult:
 
         """
 
-        # works in python 3.5 or higher
-        self.all_packages = {**self.all_packages, **partial_result.all_packages}
-        self.all_trucks = {**self.all_trucks, **partial_result.all_trucks}
+        # Update in place, so adding a partial result costs the size of the partial result only
+        self.all_packages.update(partial_result.all_packages)
+        self.all_trucks.update(partial_result.all_trucks)
+
+        self.package_assigned_truck.update(partial_result.package_assigned_truck)
+        self.truck_assigned_route.update(partial_result.truck_assigned_route)
+        self.truck_assigned_packages.update(partial_result.truck_assigned_packages)
+        self.package_start_time.update(partial_result.package_start_time)
+        self.package_arrival_time.update(partial_result.package_arrival_time)
+
+        logger.debug(f"Number of packages after adding the partial result: {len(self.package_assigned_truck)}")
+
+    def addResults(self, partial_results):
+        """Function that adds many partial results to the current one.
+
+        Args:
+            partial_results: the iterable of partial model results
+            
+        Returns:
+            None
+
+        """
+
+        for partial_result in partial_results:
+            self.addResult(partial_result)
+
+    def isFeasible(self, model_input):
+        """Function that checks if the scheduling satisfies all constraints of the model.
+
+        Args:
+            model_input: the object that stores the model input.
+            
+        Returns:
+            True if every package is scheduled and no constraint is violated.
+
+        """
+
+        for p_id in model_input.all_packages:
+            if p_id not in self.package_assigned_truck:
+                logger.info(f"Package {p_id} is not scheduled")
+                return False
+
+        for t_id, p_ids in self.truck_assigned_packages.items():
+            truck_type = self.all_trucks[t_id].type
+            packages = [self.all_packages[p_id] for p_id in p_ids]
+            route = self.truck_assigned_route[t_id]
+
+            if (sum(p.area for p in packages) > truck_type.area_capacity or 
+                sum(p.weight for p in packages) > truck_type.weight_capacity):
+                logger.info(f"Truck {t_id} is over capacity")
+                return False
+
+            if len(set(p.source for p in packages)) > 1 or len(set(p.danger_type for p in packages) - {'non_danger'}) > 1:
+                logger.info(f"Truck {t_id} mixes sources or danger types")
+                return False
+
+            available_times = [p.available_time for p in packages]
+            if max(available_times) - min(available_times) > model_input.max_time_difference_between_package:
+                logger.info(f"Truck {t_id} mixes packages out of the time window")
+                return False
+
+            if len(route) - 1 > model_input.max_stops or route[0] != packages[0].source:
+                logger.info(f"Truck {t_id} has an invalid route")
+                return False
+
+            # The arrival time at each stop, all packages to the same stop arrive together
+            stop_arrival_time = {}
+            for p_id, package in zip(p_ids, packages):
+                if package.destination not in route[1:]:
+                    logger.info(f"Package {p_id} is not on the route of truck {t_id}")
+                    return False
+
+                if stop_arrival_time.setdefault(package.destination, self.package_arrival_time[p_id]) != self.package_arrival_time[p_id]:
+                    logger.info(f"Packages to {package.destination} arrive at different times")
+                    return False
+
+                if self.package_start_time[p_id] < max(available_times) or self.package_arrival_time[p_id] > package.deadline:
+                    logger.info(f"Package {p_id} starts before available or arrives after deadline")
+                    return False
+
+            # The travel and stop times the model requires along the route
+            start_time = min(self.package_start_time[p_id] for p_id in p_ids)
+            for i, destination in enumerate(route[1:]):
+                earliest_arrival_time = start_time + int(model_input.distances.getDistance(route[0], destination) / truck_type.speed)
+
+                for previous_destination in route[1:i+1]:
+                    if previous_destination not in stop_arrival_time:
+                        continue
+
+                    earliest_arrival_time = max(earliest_arrival_time, stop_arrival_time[previous_destination] + model_input.stop_time + 
+                        int(model_input.distances.getDistance(previous_destination, destination) / truck_type.speed))
+
+                if stop_arrival_time.get(destination, earliest_arrival_time) < earliest_arrival_time:
+                    logger.info(f"Truck {t_id} arrives at {destination} too early")
+                    return False
+
+        return True
+
+    def removeTrucks(self, t_ids):
+        """Function that removes some trucks and their packages from the scheduling in place.
+
+        Args:
+            t_ids: the ids of the trucks to remove.
+            
+        Returns:
+            None
+
+        """
+        for t_id in t_ids:
+            for p_id in self.truck_assigned_packages.pop(t_id, []):
+                self.package_assigned_truck.pop(p_id, None)
+                self.package_start_time.pop(p_id, None)
+                self.package_arrival_time.pop(p_id, None)
+
+            self.all_trucks.pop(t_id, None)
+            self.truck_assigned_route.pop(t_id, None)
+
+    def getTruckCost(self, t_id, model_input):
+        """Function that computes the cost of a truck the same way as the objective of the model.
+
+        Args:
+            t_id: the id of the truck.
+            model_input: the object that stores the model input.
+            
+        Returns:
+            the scaled cost of the truck, 0 if it carries no package.
+
+        """
+        p_ids = self.truck_assigned_packages.get(t_id, [])
 
-        self.package_assigned_truck = {**self.package_assigned_truck, **partial_result.package_assigned_truck}
-        self.truck_assigned_route = {**self.truck_assigned_route, **partial_result.truck_assigned_route}
-        self.truck_assigned_packages = {**self.truck_assigned_packages, **partial_result.truck_assigned_packages}
-        self.package_start_time = {**self.package_start_time, **partial_result.package_start_time}
-        self.package_arrival_time = {**self.package_arrival_time, **partial_result.package_arrival_time}
+        if len(p_ids) == 0:
+            return 0
 
-        print(f"package start time: {self.package_start_time}")
-               
+        truck_type = self.all_trucks[t_id].type
+        num_stops = len(self.truck_assigned_route[t_id]) - 1
+
+        travel_time = (max(self.package_arrival_time[p_id] for p_id in p_ids) - max(self.package_start_time[p_id] for p_id in p_ids) - 
+            (num_stops - 1) * model_input.stop_time)
+
+        return (travel_time * int(truck_type.speed * truck_type.cost_per_km / 1000 * model_input.cost_scale_factor) + 
+            (num_stops - 1) * model_input.stop_cost * model_input.cost_scale_factor)
+
+    def getCost(self, model_input):
+        """Function that computes the total cost of the scheduling.
+
+        Args:
+            model_input: the object that stores the model input.
+            
+        Returns:
+            the scaled cost of all trucks.
+
+        """
+        return sum(self.getTruckCost(t_id, model_input) for t_id in self.truck_assigned_packages)
+
+    def initFromScheduleDF(self, schedule_df, model_input):
+        """Function that loads the route schedualing from its DataFrame format.
+
+        Args:
+            schedule_df: the DataFrame that stores the route schedualing, as built by toScheduleDF.
+            model_input: the object that stores the packages and the truck types of the scheduling.
+            
+        Returns:
+            None
+
+        """
+        truck_types = {truck_type.id: truck_type for truck_type in model_input.truck_types}
+
+        self.all_packages = model_input.all_packages
+
+        p_ids = list(zip(schedule_df['Order_ID'], schedule_df['Material_ID'], schedule_df['Item_ID']))
+        start_times = toTimestamps(schedule_df['Start_Time']).tolist()
+        arrival_times = toTimestamps(schedule_df['Arrival_Time']).tolist()
+
+        for p_id, t_id, route, truck_type_id, start_time, arrival_time in zip(p_ids, schedule_df['Schedule_ID'], schedule_df['Truck_Route'], 
+                schedule_df['Truck_Type'], start_times, arrival_times):
+
+            if t_id not in self.all_trucks:
+                truck = Truck()
+                truck.id = t_id
+                truck.type = truck_types[truck_type_id]
+
+                self.all_trucks[t_id] = truck
+                self.truck_assigned_route[t_id] = route.split("->")
+
+            self.package_assigned_truck[p_id] = t_id
+            self.truck_assigned_packages[t_id].append(p_id)
+            self.package_start_time[p_id] = start_time
+            self.package_arrival_time[p_id] = arrival_time
 
     def toScheduleDF(self):
         """Function that convert the model result into DataFrame format.
@@ -414,62 +1308,143 @@ class ModelResult:
 
         """
 
-        columns = [
-            "Schedule_ID",
-            "Truck_Route",
-            "Order_ID",
-            "Material_ID",
-            "Item_ID",
-            "Danger_Type",
-            "Source",
-            "Destination",
-            "Start_Time",
-            "Arrival_Time",
-            "Deadline",
-            "Shared_Truck",
-            "Truck_Type",
-            "Area_Rate",
-            "Weight_Rate",
-            "Capacity_Rate"
-        ]
-        
-        schedule_list = []
-        
-        truck_assigned_order = {}
-        truck_area_rate = {}
-        truck_weight_rate = {}
-        truck_capacity_rate = {}
-
-        for t_id, packages in self.truck_assigned_packages.items():
-            truck_assigned_order[t_id] = set([self.all_packages[p].order_id for p in packages])
-            truck_area_rate[t_id] = sum([self.all_packages[p].area for p in packages])/self.all_trucks[t_id].type.area_capacity
-            truck_weight_rate[t_id] = sum([self.all_packages[p].weight for p in packages])/self.all_trucks[t_id].type.weight_capacity
-            truck_capacity_rate[t_id] = max(truck_area_rate[t_id], truck_weight_rate[t_id])
-        
-        for t_id, packages in self.truck_assigned_packages.items():
-            for p_id in packages:
-                p = self.all_packages[p_id]
-
-                schedule = (t_id, 
-                            "->".join(self.truck_assigned_route[t_id]), 
-                            p.order_id, 
-                            p.material_id, 
-                            p.item_id, 
-                            p.danger_type,
-                            p.source,
-                            p.destination,
-                            datetime.fromtimestamp(self.package_start_time[p_id]), 
-                            datetime.fromtimestamp(self.package_arrival_time[p_id]),
-                            datetime.fromtimestamp(p.deadline),
-                            "Y" if len(truck_assigned_order[t_id]) > 1 else "N",
-                            self.all_trucks[t_id].type.id,
-                            truck_area_rate[t_id],
-                            truck_weight_rate[t_id],
-                            truck_capacity_rate[t_id]
-                        )
-
-                schedule_list.append(schedule)
-
-        schedule_df = pd.DataFrame(schedule_list, columns=columns).sort_values(['Schedule_ID', 'Order_ID', 'Material_ID'])
-
-        return schedule_df
\ No newline at end of file
+        schedule_rows = self.getScheduleRows()
+
+        return self.getScheduleChunk(schedule_rows, schedule_rows['sorted_index'])
+
+    def iterScheduleDF(self, chunk_size=100000):
+        """Function that convert the model result into DataFrame format chunk by chunk.
+
+        Args:
+            chunk_size: the max number of rows per chunk
+            
+        Returns:
+            A generator of DataFrames that store the route schedualing in sorted order.
+
+        """
+
+        schedule_rows = self.getScheduleRows()
+        sorted_index = schedule_rows['sorted_index']
+
+        for start in range(0, len(sorted_index), chunk_size):
+            yield self.getScheduleChunk(schedule_rows, sorted_index[start:start + chunk_size])
+
+    def writeScheduleCSV(self, schedule_file, chunk_size=100000):
+        """Function that writes the route schedualing to a csv file chunk by chunk.
+
+        Args:
+            schedule_file: the csv file to write
+            chunk_size: the max number of rows per chunk
+            
+        Returns:
+            None
+
+        """
+
+        # The header is written even if there is no row
+        pd.DataFrame(columns=schedule_columns).to_csv(schedule_file, index=False)
+
+        for schedule_df in self.iterScheduleDF(chunk_size):
+            schedule_df.to_csv(schedule_file, mode='a', header=False, index=False)
+
+    def writeScheduleNPZ(self, schedule_file):
+        """Function that writes the route schedualing to a npz file with typed columns.
+
+        Args:
+            schedule_file: the npz file to write
+            
+        Returns:
+            None
+
+        """
+
+        saveDFToNPZ(self.toScheduleDF(), schedule_file)
+
+    def getScheduleRows(self):
+        """Function that gets the rows of the route schedualing with the statistics of each truck.
+
+        Args:
+            None
+            
+        Returns:
+            A dict with the package ids of the rows grouped by truck, their times and trucks, 
+            the per truck columns, and the row order sorted by Schedule_ID, Order_ID and Material_ID.
+
+        """
+
+        truck_ids = list(self.truck_assigned_packages)
+        p_ids = [p_id for t_id in truck_ids for p_id in self.truck_assigned_packages[t_id]]
+        packages = [self.all_packages[p_id] for p_id in p_ids]
+
+        truck_codes = np.repeat(np.arange(len(truck_ids)), 
+            np.array([len(self.truck_assigned_packages[t_id]) for t_id in truck_ids], dtype=np.int64))
+
+        order_codes, orders = pd.factorize(pd.Series([p.order_id for p in packages], dtype=object), sort=True)
+        material_codes, materials = pd.factorize(pd.Series([p.material_id for p in packages], dtype=object), sort=True)
+
+        # Capacity rates are the total size of each truck over its capacity
+        trucks = [self.all_trucks[t_id] for t_id in truck_ids]
+        area = np.array([p.area for p in packages], dtype=np.float64)
+        weight = np.array([p.weight for p in packages], dtype=np.float64)
+
+        area_rate = np.bincount(truck_codes, weights=area, minlength=len(trucks)) / np.array([t.type.area_capacity for t in trucks], dtype=np.float64)
+        weight_rate = np.bincount(truck_codes, weights=weight, minlength=len(trucks)) / np.array([t.type.weight_capacity for t in trucks], dtype=np.float64)
+
+        # A truck is shared if it carries more than one distinct order
+        truck_orders = np.unique(truck_codes.astype(np.int64) * max(1, len(orders)) + order_codes)
+        num_orders = np.bincount(truck_orders // max(1, len(orders)), minlength=len(trucks))
+
+        # Rank of each truck id in sorted order
+        truck_rank = pd.factorize(pd.Series(truck_ids, dtype=object), sort=True)[0]
+
+        return {
+            'p_ids': p_ids,
+            'truck_codes': truck_codes,
+            'start_time': np.array([self.package_start_time[p_id] for p_id in p_ids], dtype=np.int64),
+            'arrival_time': np.array([self.package_arrival_time[p_id] for p_id in p_ids], dtype=np.int64),
+            'deadline': np.array([p.deadline for p in packages], dtype=np.int64),
+            'truck_ids': np.array(truck_ids + [None], dtype=object)[:-1], # The trailing None keeps tuple ids from being unpacked
+            'truck_route': np.array(["->".join(self.truck_assigned_route[t_id]) for t_id in truck_ids], dtype=object),
+            'truck_type': np.array([t.type.id for t in trucks], dtype=np.float64),
+            'shared_truck': np.where(num_orders > 1, "Y", "N").astype(object),
+            'area_rate': area_rate,
+            'weight_rate': weight_rate,
+            'capacity_rate': np.maximum(area_rate, weight_rate),
+            'sorted_index': np.lexsort((material_codes, order_codes, truck_rank[truck_codes]))
+        }
+
+    def getScheduleChunk(self, schedule_rows, index):
+        """Function that builds the DataFrame of some rows of the route schedualing.
+
+        Args:
+            schedule_rows: the rows of the route schedualing from getScheduleRows
+            index: the array of row positions to build
+            
+        Returns:
+            A DataFrame that stores the route schedualing of the rows.
+
+        """
+
+        packages = [self.all_packages[schedule_rows['p_ids'][i]] for i in index.tolist()]
+        truck_codes = schedule_rows['truck_codes'][index]
+
+        schedule_df = pd.DataFrame({
+            "Schedule_ID": schedule_rows['truck_ids'][truck_codes],
+            "Truck_Route": schedule_rows['truck_route'][truck_codes],
+            "Order_ID": [p.order_id for p in packages],
+            "Material_ID": [p.material_id for p in packages],
+            "Item_ID": [p.item_id for p in packages],
+            "Danger_Type": [p.danger_type for p in packages],
+            "Source": [p.source for p in packages],
+            "Destination": [p.destination for p in packages],
+            "Start_Time": fromTimestamps(schedule_rows['start_time'][index]),
+            "Arrival_Time": fromTimestamps(schedule_rows['arrival_time'][index]),
+            "Deadline": fromTimestamps(schedule_rows['deadline'][index]),
+            "Shared_Truck": schedule_rows['shared_truck'][truck_codes],
+            "Truck_Type": schedule_rows['truck_type'][truck_codes],
+            "Area_Rate": schedule_rows['area_rate'][truck_codes],
+            "Weight_Rate": schedule_rows['weight_rate'][truck_codes],
+            "Capacity_Rate": schedule_rows['capacity_rate'][truck_codes]
+        }, columns=schedule_columns, index=index)
+
+        return schedule_df
@@ -14,21 +14,41 @@ parser.add_argument("--distance", type=str, help="the distance file")
 parser.add_argument("--model_result_partial", type=str, help="the partial result during the reduce step")
 parser.add_argument("--model_result_list", type=str, help="the list of itermediate model results")
 parser.add_argument("--model_result_final", type=str, help="final model result directory")
+parser.add_argument("--format", type=str, default="csv", help="the format of the intermediate files, csv or npz")
+parser.add_argument("--streaming", action="store_true", help="merge the results chunk by chunk into a sorted schedule with bounded memory")
+parser.add_argument("--chunk_size", type=int, default=100000, help="the number of rows in memory for the streaming merge")
 
 args = parser.parse_args()
 
 # Create result merger
 merger = ResultMerger()
 
-partial_result_df = pd.read_csv(args.model_result_partial + "/model_result_partial.csv")
-result_list = pd.read_csv(args.model_result_list + '/model_result_list.txt', header=None, delimiter=' ')
-result_list.columns = partial_result_df.columns
+partial_result_file = args.model_result_partial + f"/model_result_partial.{args.format}"
+result_list_file = args.model_result_list + '/model_result_list.txt'
 
-results = [partial_result_df, result_list]
+if args.streaming:
+    def readScheduleChunks():
+        # All values are kept as strings, so they are written back exactly as read
+        if args.format == 'npz':
+            yield readScheduleDF(partial_result_file).fillna('').astype(str)
+        else:
+            yield from pd.read_csv(partial_result_file, dtype=str, keep_default_na=False, chunksize=args.chunk_size)
 
-model_input_origin = ModelInput()
-model_input_origin.initInputFromFile(args.model_input, args.distance)
-model_final_result = merger.merge(model_input_origin, results)
+        yield from pd.read_csv(result_list_file, header=None, delimiter=' ', names=schedule_columns, dtype=str, keep_default_na=False, chunksize=args.chunk_size)
 
-## Save the results
-model_final_result.to_csv(args.model_result_final + "/schedule.csv", index=False)
+    ## Merge and save the results sorted by schedule, order and material
+    num_rows = merger.mergeSorted(readScheduleChunks(), args.model_result_final + "/schedule.csv", args.chunk_size)
+    print(f"Number of rows merged: {num_rows}")
+
+else:
+    partial_result_df = readScheduleDF(partial_result_file)
+    result_list = pd.read_csv(result_list_file, header=None, delimiter=' ')
+    result_list.columns = partial_result_df.columns
+
+    results = [partial_result_df, result_list]
+
+    # The model input is only needed to optimize the merged result
+    model_final_result = merger.merge(None, results)
+
+    ## Save the results
+    model_final_result.to_csv(args.model_result_final + "/schedule.csv", index=False)
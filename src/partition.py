@@ -6,12 +6,16 @@ import os
 
 from core.structure import *
 from core.partitioner import *
+from core.bundle import *
 
 parser = argparse.ArgumentParser("partition")
 
 parser.add_argument("--model_input_reduced", type=str, help="the reduced model input")
 parser.add_argument("--distance", type=str, help="the distance file")
 parser.add_argument("--model_input_list", type=str, help="the list of partitioned model input")
+parser.add_argument("--format", type=str, default="csv", help="the format of the intermediate files, csv, npz or bundle")
+parser.add_argument("--partition_method", type=str, default="time_interval", choices=["time_interval", "cluster"], help="how the big subproblems are partitioned")
+parser.add_argument("--partitions_per_range", type=int, default=100, help="the number of partitions per range file of a bundle")
 
 args = parser.parse_args()
 print("Argument 1: %s" % args.model_input_reduced)
@@ -21,18 +25,34 @@ print("Argument 3: %s" % args.model_input_list)
 ## Instanciation
 partitioner = ProblemPartitioner()
 model_input_reduced = ModelInput()
-model_input_reduced.initInputFromFile(args.model_input_reduced + "/order_reduced.csv", args.distance)
+reduced_format = "csv" if args.format == "bundle" else args.format
+model_input_reduced.initInputFromFile(args.model_input_reduced + f"/order_reduced.{reduced_format}", args.distance)
 
 ## Partition process
 max_package_num = 30
-model_input_list = partitioner.partition(model_input_reduced, max_package_num)
+model_input_list = partitioner.partition(model_input_reduced, max_package_num, args.partition_method)
 
 os.mkdir(args.model_input_list)
 ## Save the results
-i = 0
-for model_input_partition in model_input_list:
-    model_input_partition_file = os.path.join(args.model_input_list, f"order_partition_{i}.csv")
-    print(f"{args.model_input_list} created.")
-    print(model_input_partition_file)
-    model_input_partition.toOrderDF().to_csv(model_input_partition_file, index=False)
-    i += 1
\ No newline at end of file
+if args.format == "bundle":
+    # All partitions go into one bundle, and each range file points a solve mini-batch to a range of them
+    PartitionBundle().write(os.path.join(args.model_input_list, "partitions.bundle"), model_input_list)
+
+    for i, start in enumerate(range(0, len(model_input_list), args.partitions_per_range)):
+        end = min(start + args.partitions_per_range, len(model_input_list))
+
+        with open(os.path.join(args.model_input_list, f"partition_range_{i}.txt"), "w") as f:
+            f.write(f"partitions.bundle {start} {end}")
+
+else:
+    i = 0
+    for model_input_partition in model_input_list:
+        model_input_partition_file = os.path.join(args.model_input_list, f"order_partition_{i}.{args.format}")
+        print(f"{args.model_input_list} created.")
+        print(model_input_partition_file)
+
+        if args.format == "npz":
+            model_input_partition.toOrderNPZ(model_input_partition_file)
+        else:
+            model_input_partition.toOrderDF().to_csv(model_input_partition_file, index=False)
+        i += 1
@@ -16,6 +16,7 @@ parser.add_argument("--model_input", type=str, help="the complete list of model
 parser.add_argument("--distance", type=str, help="the distance file")
 parser.add_argument("--model_result_partial", type=str, help="partital result after reduction")
 parser.add_argument("--model_input_reduced", type=str, help="the reduced model input")
+parser.add_argument("--format", type=str, default="csv", help="the format of the intermediate files, csv or npz")
 
 
 args = parser.parse_args()
@@ -47,5 +48,10 @@ model_input_reduced, model_result_partial = reducer.reduce1(model_input_origin)
 os.makedirs(args.model_result_partial)
 os.makedirs(args.model_input_reduced)
 
-model_input_reduced.toOrderDF().to_csv(args.model_input_reduced + "/order_reduced.csv", index=False)
-model_result_partial.toScheduleDF().to_csv(args.model_result_partial + "/model_result_partial.csv", index=False)
\ No newline at end of file
+if args.format == "npz":
+    model_input_reduced.toOrderNPZ(args.model_input_reduced + "/order_reduced.npz")
+    model_result_partial.writeScheduleNPZ(args.model_result_partial + "/model_result_partial.npz")
+
+else:
+    model_input_reduced.toOrderDF().to_csv(args.model_input_reduced + "/order_reduced.csv", index=False)
+    model_result_partial.writeScheduleCSV(args.model_result_partial + "/model_result_partial.csv")
\ No newline at end of file
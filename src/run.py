@@ -0,0 +1,42 @@
+# Copyright (c) Microsoft. All rights reserved.
+# Licensed under the MIT license.
+
+import argparse
+import os
+
+from core.structure import *
+from core.pipeline import *
+from core.cache import *
+
+parser = argparse.ArgumentParser("run")
+
+parser.add_argument("--model_input", type=str, help="the complete model input")
+parser.add_argument("--distance", type=str, help="the distance file")
+parser.add_argument("--model_result_final", type=str, help="final model result directory")
+parser.add_argument("--reduce_method", type=str, default="reduce1", help="the reduce heuristic, reduce1 or reduce2")
+parser.add_argument("--max_package_num", type=int, default=30, help="the max number of packages per partition")
+parser.add_argument("--num_workers", type=int, default=None, help="the number of worker processes, one per core if not set")
+parser.add_argument("--cache_dir", type=str, default=None, help="the folder of the parsed input cache, the inputs are parsed every time if not set")
+parser.add_argument("--result_cache_dir", type=str, default=None, help="the folder of the result cache for recurring partitions, not used if not set")
+parser.add_argument("--aggregate", action="store_true", help="model identical items of an order as one package with a quantity")
+parser.add_argument("--symmetry_breaking", action="store_true", help="order the interchangeable trucks of the same type in the model")
+parser.add_argument("--fleet_sizing", action="store_true", help="solve each partition with the sized fleet, grown while the model is infeasible")
+parser.add_argument("--engine", type=str, default="cpsat", choices=["cpsat", "greedy"], help="the solver of the partitions")
+parser.add_argument("--optimize_merge", action="store_true", help="consolidate the underfilled trucks of different partitions after the merge")
+parser.add_argument("--lns_time_budget", type=float, default=None, help="the wall clock budget in seconds to improve the merged schedule by large neighborhood search")
+parser.add_argument("--partition_method", type=str, default="time_interval", choices=["time_interval", "cluster"], help="how the big subproblems are partitioned")
+parser.add_argument("--time_budget", type=float, default=None, help="the wall clock budget in seconds for solving all partitions")
+
+args = parser.parse_args()
+print("Argument 1: %s" % args.model_input)
+print("Argument 2: %s" % args.distance)
+print("Argument 3: %s" % args.model_result_final)
+
+## Run all the steps in a single process without intermediate files
+pipeline = Pipeline(args.reduce_method, args.max_package_num, args.num_workers, time_budget=args.time_budget, result_cache_dir=args.result_cache_dir, aggregate=args.aggregate, symmetry_breaking=args.symmetry_breaking, fleet_sizing=args.fleet_sizing, engine=args.engine, lns_time_budget=args.lns_time_budget, optimize_merge=args.optimize_merge, partition_method=args.partition_method)
+input_cache = InputCache(args.cache_dir) if args.cache_dir is not None else None
+model_final_result = pipeline.run(args.model_input, args.distance, input_cache)
+
+## Save the results
+os.makedirs(args.model_result_final, exist_ok=True)
+model_final_result.to_csv(args.model_result_final + "/schedule.csv", index=False)
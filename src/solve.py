@@ -7,36 +7,119 @@ import pandas as pd
 
 from core.structure import *
 from core.model import *
+from core.greedy import *
+from core.scheduler import *
+from core.bundle import *
+from core.cache import *
 
 parser = argparse.ArgumentParser("solve")
 parser.add_argument('--distance', type=str, help="the distance file")
+parser.add_argument('--num_search_workers', type=int, default=None, help="the number of search workers per partition, decided by the model size if not set")
+parser.add_argument('--max_time_in_seconds', type=float, default=120, help="the maximum search time of the solver per partition, used if no time budget is set")
+parser.add_argument('--time_budget', type=float, default=None, help="the wall clock budget in seconds for each mini-batch, shared by the partitions by difficulty")
+parser.add_argument('--cache_dir', type=str, default=None, help="the folder of the parsed input cache, the distance file is parsed every time if not set")
+parser.add_argument('--result_cache_dir', type=str, default=None, help="the folder of the result cache for recurring partitions, not used if not set")
+parser.add_argument('--aggregate', action='store_true', help="model identical items of an order as one package with a quantity")
+parser.add_argument('--symmetry_breaking', action='store_true', help="order the interchangeable trucks of the same type in the model")
+parser.add_argument('--fleet_sizing', action='store_true', help="solve each partition with the sized fleet, grown while the model is infeasible")
+parser.add_argument('--engine', type=str, default='cpsat', choices=['cpsat', 'greedy'], help="the solver of the partitions")
+parser.add_argument('--concurrent_partitions', type=int, default=1, help="the number of partitions solved at the same time on a node")
 
 args, _ = parser.parse_known_args()
 distance_file = args.distance
 
 print(f'Distance file: {distance_file}')
+print(f'Number of search workers: {args.num_search_workers}, concurrent partitions: {args.concurrent_partitions}')
+
+distances = None
 
 def init():
-    pass 
+    global distances
+
+    # Load the distance matrix once and share it across all partitions
+    if args.cache_dir is not None:
+        distances = InputCache(args.cache_dir).getDistances(distance_file)
+    else:
+        distances = ModelInput().getDistances(distance_file)
 
 def run(input_data):
     print(f'ParallelRun input data: {input_data}')
 
     results = []
-    # Solve each smaller problem
+
+    model_input_list = []
     for order_file in input_data:
+        # The bundle is in the same folder as its range files, its partitions are read through them
+        if order_file.endswith('.bundle'):
+            continue
+
+        # A range file points to a range of partitions in a bundle in the same folder
+        if order_file.endswith('.txt'):
+            with open(order_file) as f:
+                bundle_file, start, end = f.read().split()
+
+            bundle = PartitionBundle()
+            bundle.open(os.path.join(os.path.dirname(order_file), bundle_file))
+
+            for i in range(int(start), int(end)):
+                model_input_list.append(bundle.getModelInput(i, distances))
+
+            continue
+
         model_input_partion = ModelInput()
-        model_input_partion.initInputFromFile(order_file, distance_file)
+        model_input_partion.initInputFromFile(order_file, distances)
+        model_input_list.append(model_input_partion)
+
+    scheduler = None
+    if args.time_budget is not None:
+        scheduler = TimeBudgetScheduler(args.time_budget)
+
+        for i, model_input_partion in enumerate(model_input_list):
+            scheduler.addPartition(i, len(model_input_partion.package_table))
+
+    result_cache = ResultCache(args.result_cache_dir) if args.result_cache_dir is not None else None
+
+    # Solve each smaller problem
+    for i, model_input_partion in enumerate(model_input_list):
+        # Recurring partitions reuse the cached scheduling
+        if result_cache is not None:
+            model_result = result_cache.get(model_input_partion)
+
+            if model_result is not None:
+                if scheduler is not None:
+                    scheduler.skip(i)
+
+                results.append(model_result.toScheduleDF())
+                continue
+
+        max_time_in_seconds = scheduler.allocate(i) if scheduler is not None else args.max_time_in_seconds
+
+        # The greedy scheduling needs no time budget and is not cached for the CP-SAT runs, 
+        # it also schedules the partitions left once the time budget is used up
+        if args.engine == 'greedy' or max_time_in_seconds <= 0:
+            solver = GreedySolver()
+            solver.setModelInput(model_input_partion)
+            solver.solve()
+
+            if scheduler is not None:
+                scheduler.release(i, solver.wall_time)
+
+            results.append(solver.getModelResult().toScheduleDF())
+            continue
+
+        model, wall_time = solveModelInput(model_input_partion, max_time_in_seconds, args.num_search_workers, args.concurrent_partitions, 
+            args.aggregate, args.symmetry_breaking, args.fleet_sizing)
+
+        if scheduler is not None:
+            scheduler.release(i, wall_time)
+
+        model_result = model.getModelResult()
 
-        model = Model()
-        model.setModelInput(model_input_partion)
+        if result_cache is not None and model.solver.StatusName() in ['OPTIMAL', 'FEASIBLE']:
+            result_cache.put(model_input_partion, model_result)
 
-        model.createVariables()
-        model.setConstraints()
-        model.setObjective(objective="Cost")
-        model.solve()
-        print(model.getModelResult().toScheduleDF())
+        print(model_result.toScheduleDF())
 
-        results.append(model.getModelResult().toScheduleDF())
+        results.append(model_result.toScheduleDF())
     
     return pd.concat(results)
@@ -0,0 +1,43 @@
+import unittest
+import os
+import tempfile
+
+from src.core.partitioner import *
+from src.core.bundle import *
+
+work_dir = os.path.dirname(os.path.abspath(__file__))
+
+class PartitionBundleTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        """Method called to prepare the test fixture.
+        """
+
+        order_file = os.path.join(work_dir, "../../sample_data/order_large.csv")
+        distance_file = os.path.join(work_dir, "../../sample_data/distance.csv")
+
+        model_input = ModelInput()
+        model_input.initInputFromFile(order_file, distance_file)
+
+        cls.model_input = model_input
+        cls.model_input_list = ProblemPartitioner().partition(model_input, 30)
+
+    def test_getPackageTable(self):
+
+        bundle_file = os.path.join(tempfile.mkdtemp(), "partitions.bundle")
+        PartitionBundle().write(bundle_file, PartitionBundleTest.model_input_list)
+
+        bundle = PartitionBundle()
+        bundle.open(bundle_file)
+
+        assert(len(bundle) == len(PartitionBundleTest.model_input_list))
+
+        for i in [0, len(bundle) // 2, len(bundle) - 1]:
+            model_input = bundle.getModelInput(i, PartitionBundleTest.model_input.distances)
+            expected_model_input = PartitionBundleTest.model_input_list[i]
+
+            assert(model_input.package_table.getKeys() == expected_model_input.package_table.getKeys())
+            assert((model_input.package_table.deadline == expected_model_input.package_table.deadline).all())
+            assert(list(model_input.all_packages.values())[0].destination == list(expected_model_input.all_packages.values())[0].destination)
+
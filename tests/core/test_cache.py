@@ -0,0 +1,111 @@
+import unittest
+import os
+import tempfile
+from unittest import mock
+
+from src.core.cache import *
+from src.core.reducer import *
+
+work_dir = os.path.dirname(os.path.abspath(__file__))
+
+class InputCacheTest(unittest.TestCase):
+
+    def test_initInputFromFile(self):
+
+        order_file = os.path.join(work_dir, "../../sample_data/order_small.csv")
+        distance_file = os.path.join(work_dir, "../../sample_data/distance.csv")
+
+        input_cache = InputCache(tempfile.mkdtemp())
+
+        model_input_miss = ModelInput()
+        model_input_miss.initInputFromFile(order_file, distance_file, input_cache)
+
+        assert(input_cache.hits == 0 and input_cache.misses == 2)
+
+        model_input_hit = ModelInput()
+        model_input_hit.initInputFromFile(order_file, distance_file, input_cache)
+
+        assert(input_cache.hits == 2 and input_cache.misses == 2)
+
+        assert(model_input_hit.package_table.getKeys() == model_input_miss.package_table.getKeys())
+        assert(model_input_hit.distances.locations == model_input_miss.distances.locations)
+        assert((model_input_hit.distances.matrix == model_input_miss.distances.matrix).all())
+
+    def test_evict(self):
+
+        order_file = os.path.join(work_dir, "../../sample_data/order_small.csv")
+        distance_file = os.path.join(work_dir, "../../sample_data/distance.csv")
+
+        # Only the newest file fits into the cache
+        input_cache = InputCache(tempfile.mkdtemp(), max_size=1)
+
+        input_cache.getDistances(distance_file)
+        input_cache.getPackageTable(order_file)
+
+        assert(len(os.listdir(input_cache.cache_dir)) == 1)
+
+        input_cache.getPackageTable(order_file)
+
+        assert(input_cache.hits == 1)
+
+    def test_evictConcurrently(self):
+
+        order_file = os.path.join(work_dir, "../../sample_data/order_small.csv")
+        distance_file = os.path.join(work_dir, "../../sample_data/distance.csv")
+
+        input_cache = InputCache(tempfile.mkdtemp(), max_size=1)
+        input_cache.getDistances(distance_file)
+
+        cache_files = os.listdir(input_cache.cache_dir)
+
+        # Another process removes a listed file before it is read, and the next one before it is removed
+        with mock.patch('os.listdir', return_value=cache_files + ['order-evicted.npz']):
+            with mock.patch('os.remove', side_effect=FileNotFoundError):
+                input_cache.getPackageTable(order_file)
+
+        # A file evicted between the lookup and the load is a miss
+        input_cache = InputCache(input_cache.cache_dir)
+
+        with mock.patch('numpy.load', side_effect=FileNotFoundError):
+            package_table = input_cache.getPackageTable(order_file)
+
+        assert(input_cache.hits == 0 and input_cache.misses == 1)
+        assert(len(package_table) > 0)
+
+class ResultCacheTest(unittest.TestCase):
+
+    def test_get(self):
+
+        order_file = os.path.join(work_dir, "../../sample_data/order_small.csv")
+        distance_file = os.path.join(work_dir, "../../sample_data/distance.csv")
+
+        model_input = ModelInput()
+        model_input.initInputFromFile(order_file, distance_file)
+
+        result_cache = ResultCache(tempfile.mkdtemp())
+
+        assert(result_cache.get(model_input) is None)
+
+        model_result = SearchSpaceReducer().assignGreedy(model_input)
+        assert(model_result.isFeasible(model_input))
+
+        result_cache.put(model_input, model_result)
+
+        # The same partition one day later reuses the scheduling
+        shifted_table = model_input.package_table.take(np.arange(len(model_input.package_table)))
+        shifted_table.available_time = shifted_table.available_time + 24 * 60 * 60
+        shifted_table.deadline = shifted_table.deadline + 24 * 60 * 60
+
+        model_input_shifted = ModelInput()
+        model_input_shifted.package_table = shifted_table
+        model_input_shifted.truck_types = model_input.truck_types
+        model_input_shifted.distances = model_input.distances
+
+        model_result_cached = result_cache.get(model_input_shifted)
+
+        assert(result_cache.hits == 1)
+        assert(model_result_cached is not None)
+
+        for p_id in model_input.all_packages:
+            assert(model_result_cached.package_start_time[p_id] == model_result.package_start_time[p_id] + 24 * 60 * 60)
+
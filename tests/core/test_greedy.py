@@ -0,0 +1,50 @@
+import unittest
+import os
+
+from src.core.greedy import *
+
+work_dir = os.path.dirname(os.path.abspath(__file__))
+
+class GreedySolverTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        """Method called to prepare the test fixture.
+        """
+
+        order_file = os.path.join(work_dir, "../../sample_data/order_large.csv")
+        distance_file = os.path.join(work_dir, "../../sample_data/distance.csv")
+
+        model_input = ModelInput()
+        model_input.initInputFromFile(order_file, distance_file)
+
+        cls.model_input = model_input
+
+    def test_solve(self):
+
+        solver = GreedySolver()
+        solver.setModelInput(GreedySolverTest.model_input)
+        solver.solve()
+
+        model_result = solver.getModelResult()
+
+        assert(set(model_result.package_assigned_truck) == set(GreedySolverTest.model_input.all_packages))
+        assert(model_result.isFeasible(GreedySolverTest.model_input))
+        assert(solver.getObjectiveValue() > 0)
+
+        schedule_df = model_result.toScheduleDF()
+
+        assert(schedule_df.shape[0] == len(GreedySolverTest.model_input.all_packages))
+
+    def test_getNearestRoute(self):
+
+        reducer = SearchSpaceReducer()
+        package = next(iter(GreedySolverTest.model_input.all_packages.values()))
+        destinations = list(set(p.destination for p in GreedySolverTest.model_input.all_packages.values()))[:3]
+
+        route = reducer.getNearestRoute(package.source, destinations, GreedySolverTest.model_input)
+
+        assert(sorted(route) == sorted(destinations))
+
+        distances = GreedySolverTest.model_input.distances
+        assert(all(distances.getDistance(package.source, route[0]) <= distances.getDistance(package.source, destination) for destination in destinations))
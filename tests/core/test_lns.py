@@ -0,0 +1,48 @@
+import unittest
+import os
+
+from src.core.lns import *
+from src.core.greedy import *
+
+work_dir = os.path.dirname(os.path.abspath(__file__))
+
+class LargeNeighborhoodSearchTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        """Method called to prepare the test fixture.
+        """
+
+        order_file = os.path.join(work_dir, "../../sample_data/order_small.csv")
+        distance_file = os.path.join(work_dir, "../../sample_data/distance.csv")
+
+        model_input = ModelInput()
+        model_input.initInputFromFile(order_file, distance_file)
+
+        solver = GreedySolver()
+        solver.setModelInput(model_input)
+        solver.solve()
+
+        cls.model_input = model_input
+        cls.model_result = solver.getModelResult()
+
+    def test_initFromScheduleDF(self):
+
+        model_result = ModelResult()
+        model_result.initFromScheduleDF(LargeNeighborhoodSearchTest.model_result.toScheduleDF(), LargeNeighborhoodSearchTest.model_input)
+
+        assert(model_result.package_assigned_truck == LargeNeighborhoodSearchTest.model_result.package_assigned_truck)
+        assert(model_result.package_start_time == LargeNeighborhoodSearchTest.model_result.package_start_time)
+        assert(model_result.getCost(LargeNeighborhoodSearchTest.model_input) == LargeNeighborhoodSearchTest.model_result.getCost(LargeNeighborhoodSearchTest.model_input))
+
+    def test_improve(self):
+
+        model_input = LargeNeighborhoodSearchTest.model_input
+        model_result = LargeNeighborhoodSearchTest.model_result
+
+        lns = LargeNeighborhoodSearch(max_package_num=10, max_time_in_seconds=5)
+        model_result_improved = lns.improve(model_input, model_result, time_budget=10)
+
+        assert(model_result_improved is not model_result)
+        assert(model_result_improved.isFeasible(model_input))
+        assert(model_result_improved.getCost(model_input) <= model_result.getCost(model_input))
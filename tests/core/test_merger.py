@@ -1,7 +1,9 @@
 import unittest
 import os
+import tempfile
 
 from src.core.merger import *
+from src.core.partitioner import *
 
 work_dir = os.path.dirname(os.path.abspath(__file__))
 
@@ -90,4 +92,67 @@ class MergerTest(unittest.TestCase):
 
         assert(model_result_final.shape[0] == 2)
 
+    def test_optimize(self):
 
+        model_input = MergerTest.model_input
+
+        # Small partitions leave many underfilled trucks at their boundaries
+        model_result_list = []
+        total_cost = 0
+        for model_input_partition in ProblemPartitioner().partitionByHardNumber(model_input, 10):
+            solver = GreedySolver()
+            solver.setModelInput(model_input_partition)
+            solver.solve()
+
+            model_result_list.append(solver.getModelResult().toScheduleDF())
+            total_cost += solver.getModelResult().getCost(model_input)
+
+        schedule_df, cost_delta = MergerTest.merger.optimize(model_input, model_result_list)
+
+        assert(cost_delta <= 0)
+        assert(schedule_df.shape[0] == len(model_input.all_packages))
+
+        model_result = ModelResult()
+        model_result.initFromScheduleDF(schedule_df, model_input)
+
+        assert(model_result.isFeasible(model_input))
+        assert(model_result.getCost(model_input) == total_cost + cost_delta)
+
+    def test_mergeSorted(self):
+
+        model_input = MergerTest.model_input
+        tmp_folder = tempfile.mkdtemp()
+
+        # The partial results are written and read back in small chunks, so there are many runs
+        partial_files = []
+        for i, model_input_partition in enumerate(ProblemPartitioner().partitionByHardNumber(model_input, 500)):
+            solver = GreedySolver()
+            solver.setModelInput(model_input_partition)
+            solver.solve()
+
+            partial_file = os.path.join(tmp_folder, f"model_result_partition_{i}.csv")
+            solver.getModelResult().toScheduleDF().to_csv(partial_file, index=False)
+            partial_files.append(partial_file)
+
+        def read_chunks():
+            for partial_file in partial_files:
+                yield from pd.read_csv(partial_file, dtype=str, keep_default_na=False, chunksize=300)
+
+        expected_df = pd.concat([pd.read_csv(partial_file, dtype=str, keep_default_na=False) for partial_file in partial_files])
+
+        # With a small fan-in the runs are merged in several passes
+        for max_fan_in in [64, 3]:
+            schedule_file = os.path.join(tmp_folder, "schedule.csv")
+            num_rows = MergerTest.merger.mergeSorted(read_chunks(), schedule_file, chunk_size=1000, tmp_dir=tmp_folder, max_fan_in=max_fan_in)
+
+            schedule_df = pd.read_csv(schedule_file, dtype=str, keep_default_na=False)
+
+            assert(num_rows == schedule_df.shape[0] == len(model_input.all_packages))
+            assert(list(schedule_df.columns) == schedule_columns)
+
+            keys = MergerTest.merger.getSortKey(schedule_df)
+            assert((keys[1:] >= keys[:-1]).all())
+            assert(sorted(keys.tolist()) == sorted(MergerTest.merger.getSortKey(expected_df).tolist()))
+
+            # The run files are removed
+            assert(sorted(os.listdir(tmp_folder)) == sorted([os.path.basename(f) for f in partial_files] + ["schedule.csv"]))
@@ -47,3 +47,145 @@ class ModelTest(unittest.TestCase):
 
         assert(len(model_result.truck_assigned_packages) > 0)
 
+    def test_02_getPackagePairs(self):
+
+        all_packages = ModelTest.model.model_input.all_packages
+
+        package_pairs = ModelTest.model.getPackagePairs(sparse_pairs=True)
+
+        assert(set(ModelTest.model.getPackagePairs()) == set(ModelTest.model.same_truck_packages))
+        assert(len(package_pairs) <= len(ModelTest.model.getPackagePairs()) == len(all_packages) * (len(all_packages) - 1) // 2)
+
+        for p_id_1, p_id_2 in package_pairs:
+            assert(ModelTest.model.isCompatible(all_packages[p_id_1], all_packages[p_id_2]))
+
+        # The sparse pairs model finds a feasible scheduling as well
+        model = Model()
+        model.setModelInput(ModelTest.model.model_input)
+
+        model.createVariables(sparse_pairs=True)
+        model.setConstraints()
+        model.setObjective(objective="Cost")
+        model.solve()
+
+        assert(model.getModelResult().isFeasible(ModelTest.model.model_input))
+
+    def test_03_setHints(self):
+
+        model = Model()
+        model.setModelInput(ModelTest.model.model_input)
+
+        model.createVariables()
+        model.setConstraints()
+        model.setObjective(objective="Cost")
+        model.setHints()
+        model.solve()
+
+        assert(model.first_solution_time is not None)
+
+    def test_04_getNumSearchWorkers(self):
+
+        num_search_workers = ModelTest.model.getNumSearchWorkers(concurrent_partitions=4, num_cores=32)
+
+        assert(1 <= num_search_workers <= 8)
+        assert(ModelTest.model.getNumSearchWorkers(concurrent_partitions=64, num_cores=32) == 1)
+
+
+    def test_05_aggregate(self):
+
+        model_input = ModelTest.model.model_input
+
+        model = Model()
+        model.setModelInput(model_input)
+
+        model.createVariables(aggregate=True)
+        model.setConstraints()
+        model.setObjective(objective="Cost")
+        model.setHints()
+        model.solve()
+
+        # Identical items share one package, so the model is smaller
+        assert(len(model.package_groups) < len(model_input.all_packages))
+        assert(sum(len(items) for items in model.package_groups.values()) == len(model_input.all_packages))
+        assert(len(model.truck_to_packages) < len(ModelTest.model.truck_to_packages))
+
+        # The result is expanded back to every item
+        model_result = model.getModelResult()
+
+        assert(set(model_result.package_assigned_truck) == set(model_input.all_packages))
+        assert(model_result.isFeasible(model_input))
+
+    def test_06_symmetryBreaking(self):
+
+        model_input = ModelTest.model.model_input
+
+        model = Model()
+        model.setModelInput(model_input)
+
+        model.createVariables()
+        model.setConstraints(symmetry_breaking=True)
+        model.setObjective(objective="Cost")
+        model.setHints()
+        model.solve()
+
+        model_result = model.getModelResult()
+
+        assert(model.solver.StatusName() == ModelTest.model.solver.StatusName())
+        assert(model_result.isFeasible(model_input))
+
+        if model.solver.StatusName() == 'OPTIMAL':
+            assert(model.getObjectiveValue() == ModelTest.model.getObjectiveValue())
+
+        # The trucks of a type are loaded in decreasing order of area
+        for truck_type in model_input.truck_types:
+            truck_areas = [sum(model_input.all_packages[p_id].area for p_id in model_result.truck_assigned_packages.get(t_id, []))
+                for t_id, truck in model_input.all_trucks.items() if truck.type.id == truck_type.id]
+
+            assert(truck_areas == sorted(truck_areas, reverse=True))
+
+    def test_07_solveModelInput(self):
+
+        model_input = ModelTest.model.model_input
+
+        model, wall_time = solveModelInput(model_input, fleet_sizing=True)
+
+        # The sized fleet replaces the trucks of the model input
+        assert(model.model_input.all_trucks.keys().isdisjoint(model_input.all_trucks.keys()))
+        assert(wall_time >= model.solver.WallTime())
+
+        model_result = model.getModelResult()
+
+        assert(set(model_result.package_assigned_truck) == set(model_input.all_packages))
+        assert(model_result.isFeasible(model_input))
+
+    def test_08_aggregateSpanningTrucks(self):
+
+        # Two identical items that do not fit into one truck, and only one truck of each of two types
+        order_df = pd.DataFrame([
+            ('O1', 'M1', f'P{i}', 'City_24', 'City_31', '2022-04-05 08:00:00', '2022-04-07 08:00:00', 'non_danger', 250000, 1000000) for i in range(2)
+        ], columns=order_columns)
+
+        distance_df = pd.DataFrame([('City_24', 'City_31', 97187), ('City_31', 'City_24', 97187)], columns=['Source', 'Destination', 'Distance(M)'])
+
+        model_input = ModelInput()
+        model_input.initInputFromDF(order_df, distance_df)
+        model_input.all_trucks = model_input.getFleet(model_input.all_packages, model_input.truck_types, {16.5: 1, 12.5: 1})
+
+        # The items of a group share one truck type in the aggregated model
+        model = Model()
+        model.setModelInput(model_input)
+
+        model.createVariables(aggregate=True)
+        model.setConstraints()
+        model.setObjective(objective="Cost")
+        model.solve(10)
+
+        assert(model.solver.StatusName() == 'INFEASIBLE')
+
+        model, wall_time = solveModelInput(model_input, 10, aggregate=True)
+
+        model_result = model.getModelResult()
+
+        assert(model.solver.StatusName() in ['OPTIMAL', 'FEASIBLE'])
+        assert(len(model_result.truck_assigned_packages) == 2)
+        assert(model_result.isFeasible(model_input))
@@ -39,12 +39,77 @@ class PartitionerTest(unittest.TestCase):
 
     def test_partitionByHardNumber(self):
 
-        model_input_list = PartitionerTest.partitioner.partitionByHardNumber(PartitionerTest.model_input, 30)
+        max_package_num = 30
+
+        model_input_list = PartitionerTest.partitioner.partitionByHardNumber(PartitionerTest.model_input, max_package_num)
+
+        order_size = collections.Counter(package.order_id for package in PartitionerTest.model_input.all_packages.values())
 
         number_packages = 0
-        for model_input in model_input_list:
+        partitions_of_order = collections.defaultdict(set)
+        for i, model_input in enumerate(model_input_list):
+            assert(0 < len(model_input.all_packages) <= max_package_num)
             number_packages += len(model_input.all_packages)      
 
+            for package in model_input.all_packages.values():
+                partitions_of_order[package.order_id].add(i)
+
         assert(number_packages == len(PartitionerTest.model_input.all_packages))
 
+        # Only the orders bigger than a partition are split
+        for order_id, partitions in partitions_of_order.items():
+            if order_size[order_id] <= max_package_num:
+                assert(len(partitions) == 1)
+
+
+    def test_partitionByComponent(self):
+
+        model_input = PartitionerTest.model_input
+        model_input_list = PartitionerTest.partitioner.partitionByComponent(model_input)
+
+        number_packages = 0
+        component_of_package = {}
+        for i, model_input_small in enumerate(model_input_list):
+            assert(len(set(p.source for p in model_input_small.all_packages.values())) == 1)
+            number_packages += len(model_input_small.all_packages)
+
+            for p_id in model_input_small.all_packages:
+                component_of_package[p_id] = i
+
+        assert(number_packages == len(model_input.all_packages))
+
+        # Packages that could share a truck are never in different components
+        packages = list(model_input.all_packages.items())[:500]
+        for p_id_1, package_1 in packages:
+            for p_id_2, package_2 in packages:
+                if (package_1.source == package_2.source and 
+                    abs(package_1.available_time - package_2.available_time) <= model_input.max_time_difference_between_package and
+                    (package_1.danger_type == package_2.danger_type or 'non_danger' in (package_1.danger_type, package_2.danger_type))):
+                    assert(component_of_package[p_id_1] == component_of_package[p_id_2])
+
+
+    def test_partitionByCluster(self):
+
+        max_package_num = 20
+
+        model_input = PartitionerTest.model_input
+        model_input_list = PartitionerTest.partitioner.partition(model_input, max_package_num, method='cluster')
+
+        order_size = collections.Counter(package.order_id for package in model_input.all_packages.values())
+
+        number_packages = 0
+        partitions_of_order = collections.defaultdict(set)
+        for i, model_input_small in enumerate(model_input_list):
+            assert(0 < len(model_input_small.all_packages) <= max_package_num)
+            assert(len(set(p.source for p in model_input_small.all_packages.values())) == 1)
+            number_packages += len(model_input_small.all_packages)
+
+            for package in model_input_small.all_packages.values():
+                partitions_of_order[package.order_id].add(i)
+
+        assert(number_packages == len(model_input.all_packages))
 
+        # Only the orders bigger than a partition are split
+        for order_id, partitions in partitions_of_order.items():
+            if order_size[order_id] <= max_package_num:
+                assert(len(partitions) == 1)
@@ -2,11 +2,15 @@ import unittest
 import os
 import shutil
 import glob
+import subprocess
+import sys
+import tempfile
 
 from src.core.reducer import *
 from src.core.partitioner import *
 from src.core.model import *
 from src.core.merger import *
+from src.core.pipeline import *
 
 work_dir = os.path.dirname(os.path.abspath(__file__))
 
@@ -113,3 +117,46 @@ class PipelineTest(unittest.TestCase):
 
 
 
+    def test_pipelineInMemory(self):
+
+        order_file = os.path.join(work_dir, "../../sample_data/order_small.csv")
+        distance_file = os.path.join(work_dir, "../../sample_data/distance.csv")
+
+        pipeline = Pipeline(reduce_method='reduce2', num_workers=2, max_time_in_seconds=30)
+        model_final_result = pipeline.run(order_file, distance_file)
+
+        logger.info(f"Final model result: {model_final_result}")
+
+        model_input_origin = ModelInput()
+        model_input_origin.initInputFromFile(order_file, distance_file)
+
+        assert(len(model_input_origin.all_packages) == model_final_result.shape[0])
+
+    def test_solveBundle(self):
+
+        order_file = os.path.join(work_dir, "../../sample_data/order_small.csv")
+        distance_file = os.path.join(work_dir, "../../sample_data/distance.csv")
+        src_dir = os.path.join(work_dir, "../../src")
+
+        tmp_folder = tempfile.mkdtemp()
+        model_input_list_folder = os.path.join(tmp_folder, "model_input_list")
+
+        model_input_origin = ModelInput()
+        model_input_origin.initInputFromFile(order_file, distance_file)
+        model_input_origin.toOrderDF().to_csv(os.path.join(tmp_folder, "order_reduced.csv"), index=False)
+
+        subprocess.run([sys.executable, os.path.join(src_dir, "partition.py"), "--model_input_reduced", tmp_folder, "--distance", distance_file, 
+            "--model_input_list", model_input_list_folder, "--format", "bundle"], check=True)
+
+        # The solve step gets every file of the folder, the bundle as well as its range files
+        input_data = sorted(glob.glob(os.path.join(model_input_list_folder, "*")))
+        assert(any(f.endswith(".bundle") for f in input_data))
+
+        # ParallelRunStep imports the entry script, then calls init once and run on each mini-batch
+        schedule_file = os.path.join(tmp_folder, "schedule.csv")
+        script = f"import solve; solve.init(); solve.run({input_data!r}).to_csv({schedule_file!r}, index=False)"
+
+        subprocess.run([sys.executable, "-c", script, "--distance", distance_file, "--engine", "greedy"], cwd=src_dir, check=True)
+
+        schedule_df = pd.read_csv(schedule_file)
+        assert(schedule_df.shape[0] == len(model_input_origin.all_packages))
@@ -1,5 +1,6 @@
 import unittest
 import os
+import copy
 
 from src.core.reducer import *
 
@@ -38,3 +39,37 @@ class ReducerTest(unittest.TestCase):
         model_result_partial.toScheduleDF()
 
 
+    def test_assignGreedy(self):
+        logger.info("Testing greedy assignment")
+        model_input = ReducerTest.model_input
+
+        model_result = ReducerTest.reducer.assignGreedy(model_input)
+
+        for t_id, p_ids in model_result.truck_assigned_packages.items():
+            truck_type = model_input.all_trucks[t_id].type
+            packages = [model_input.all_packages[p_id] for p_id in p_ids]
+
+            assert(sum(p.area for p in packages) <= truck_type.area_capacity)
+            assert(sum(p.weight for p in packages) <= truck_type.weight_capacity)
+            assert(len(model_result.truck_assigned_route[t_id]) - 1 <= model_input.max_stops)
+
+            for p_id, package in zip(p_ids, packages):
+                assert(package.available_time <= model_result.package_start_time[p_id])
+                assert(model_result.package_arrival_time[p_id] <= package.deadline)
+
+        model_result.toScheduleDF()
+
+    def test_getFleetSize(self):
+        model_input = copy.copy(ReducerTest.model_input)
+
+        fleet_size = ReducerTest.reducer.getFleetSize(model_input)
+
+        assert(set(fleet_size) == set(truck_type.id for truck_type in model_input.truck_types))
+        assert(fleet_size[model_input.truck_types[0].id] > 0)
+
+        # The largest trucks of the fleet can carry all packages
+        model_input.all_trucks = model_input.getFleet(model_input.all_packages, model_input.truck_types, fleet_size)
+        model_result = ReducerTest.reducer.assignGreedy(model_input)
+
+        assert(len(model_result.package_assigned_truck) == len(model_input.all_packages))
+        assert(model_result.isFeasible(model_input))
@@ -0,0 +1,52 @@
+import unittest
+import os
+import tempfile
+
+from src.core.partitioner import *
+from src.core.runner import *
+
+work_dir = os.path.dirname(os.path.abspath(__file__))
+
+class LocalRunnerTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        """Method called to prepare the test fixture.
+        """
+
+        order_file = os.path.join(work_dir, "../../sample_data/order_small.csv")
+        distance_file = os.path.join(work_dir, "../../sample_data/distance.csv")
+
+        model_input = ModelInput()
+        model_input.initInputFromFile(order_file, distance_file)
+
+        cls.model_input = model_input
+        cls.runner = LocalRunner(model_input.distances, num_workers=2)
+
+    def test_run(self):
+
+        model_input_list = ProblemPartitioner().partition(LocalRunnerTest.model_input, 5)
+
+        schedule_df_list = list(LocalRunnerTest.runner.run(model_input_list, max_time_in_seconds=30))
+
+        assert(len(schedule_df_list) == len(model_input_list))
+        assert(sum(schedule_df.shape[0] for schedule_df in schedule_df_list) == len(LocalRunnerTest.model_input.all_packages))
+
+    def test_runTimeBudget(self):
+
+        model_input_list = ProblemPartitioner().partition(LocalRunnerTest.model_input, 5)
+
+        # The partitions are counted from the files without parsing them
+        tmp_folder = tempfile.mkdtemp()
+        partition_files = []
+        for i, model_input in enumerate(model_input_list):
+            partition_file = os.path.join(tmp_folder, f"order_partition_{i}.csv")
+            model_input.toOrderDF().to_csv(partition_file, index=False)
+            partition_files.append(partition_file)
+
+            assert(LocalRunnerTest.runner.getPackageNum(partition_file) == LocalRunnerTest.runner.getPackageNum(model_input) == len(model_input.all_packages))
+
+        schedule_df_list = list(LocalRunnerTest.runner.run(partition_files, time_budget=10))
+
+        assert(len(schedule_df_list) == len(partition_files))
+        assert(sum(schedule_df.shape[0] for schedule_df in schedule_df_list) == len(LocalRunnerTest.model_input.all_packages))
@@ -0,0 +1,71 @@
+import unittest
+import os
+
+from src.core.partitioner import *
+from src.core.scheduler import *
+
+work_dir = os.path.dirname(os.path.abspath(__file__))
+
+class TimeBudgetSchedulerTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        """Method called to prepare the test fixture.
+        """
+
+        order_file = os.path.join(work_dir, "../../sample_data/order_large.csv")
+        distance_file = os.path.join(work_dir, "../../sample_data/distance.csv")
+
+        model_input = ModelInput()
+        model_input.initInputFromFile(order_file, distance_file)
+
+        cls.model_input_list = ProblemPartitioner().partition(model_input, 30)[:20]
+
+    def test_allocate(self):
+
+        scheduler = TimeBudgetScheduler(600, min_time_in_seconds=0)
+
+        for i, model_input in enumerate(TimeBudgetSchedulerTest.model_input_list):
+            scheduler.addPartition(i, len(model_input.package_table))
+
+        total_time = 0
+        for i in range(len(TimeBudgetSchedulerTest.model_input_list)):
+            allocated_time = scheduler.allocate(i)
+            total_time += allocated_time
+
+            # Partitions with the same difficulty get the same time limit
+            if i > 0 and scheduler.difficulty[i] == scheduler.difficulty[i-1]:
+                assert(abs(allocated_time - scheduler.allocated_time[i-1]) < 1e-6)
+
+            scheduler.release(i, allocated_time)
+
+        assert(total_time <= 600 + 1e-6)
+
+    def test_release(self):
+
+        scheduler = TimeBudgetScheduler(100, min_time_in_seconds=0)
+
+        num_packages = len(TimeBudgetSchedulerTest.model_input_list[0].package_table)
+
+        scheduler.addPartition(0, num_packages)
+        scheduler.addPartition(1, num_packages)
+
+        assert(abs(scheduler.allocate(0) - 50) < 1)
+
+        # The unused time of the first partition goes to the second one
+        scheduler.release(0, 10)
+        assert(abs(scheduler.allocate(1) - 90) < 1)
+
+    def test_allocateMinTime(self):
+
+        scheduler = TimeBudgetScheduler(10, min_time_in_seconds=5)
+
+        for i in range(4):
+            scheduler.addPartition(i, 30)
+
+        # The minimum time is only given while the budget lasts, then the partitions get no time
+        allocated_times = [scheduler.allocate(i) for i in range(4)]
+
+        assert(allocated_times[0] == 5)
+        assert(allocated_times[2:] == [0, 0])
+        assert(sum(allocated_times) <= 10)
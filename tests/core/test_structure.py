@@ -1,5 +1,6 @@
 import unittest
 import os
+import tempfile
 
 from src.core.structure import *
 
@@ -31,6 +32,60 @@ class ModelInputTest(unittest.TestCase):
 
         assert(len(all_packages) > 0)
 
+    def test_GetAllPackagesTimes(self):
+
+        order_file = os.path.join(work_dir, "../../sample_data/order_small.csv")
+        order_df = pd.read_csv(order_file)
+
+        all_packages = ModelInputTest.model_input.getAllPackages(order_df)
+
+        for index, row in order_df.iterrows():
+            package = all_packages[row['Order_ID'], row['Material_ID'], row['Item_ID']]
+            assert(package.available_time == int(datetime.timestamp(datetime.strptime(row['Available_Time'], time_format))))
+            assert(package.deadline == int(datetime.timestamp(datetime.strptime(row['Deadline'], time_format))))
+
+        # Orders converted back to DataFrame keep the same times
+        model_input = ModelInput()
+        model_input.all_packages = all_packages
+        all_packages_again = ModelInputTest.model_input.getAllPackages(model_input.toOrderDF())
+
+        for p_id, package in all_packages.items():
+            assert(all_packages_again[p_id].available_time == package.available_time)
+            assert(all_packages_again[p_id].deadline == package.deadline)
+
+    def test_getPackageTable(self):
+
+        order_file = os.path.join(work_dir, "../../sample_data/order_large.csv")
+
+        package_table = ModelInputTest.model_input.getPackageTable(order_file)
+        all_packages = ModelInputTest.model_input.getAllPackages(order_file)
+
+        assert(len(package_table) == len(all_packages))
+        assert(package_table.getKeys() == list(all_packages.keys()))
+
+        # The table built back from package objects keeps the same rows
+        package_table_again = PackageTable()
+        package_table_again.initFromPackages(all_packages)
+
+        assert((package_table_again.area == package_table.area).all())
+        assert((package_table_again.deadline == package_table.deadline).all())
+        assert((package_table_again.destination_codes == package_table.destination_codes).all())
+
+        package_table_small = package_table.take([2, 0])
+        assert(package_table_small.getKeys() == [package_table.getKeys()[2], package_table.getKeys()[0]])
+
+    def test_GetAllPackagesInvalid(self):
+
+        order_file = os.path.join(work_dir, "../../sample_data/order_small.csv")
+        order_df = pd.read_csv(order_file)
+
+        with self.assertRaises(ValueError):
+            ModelInputTest.model_input.getAllPackages(order_df.drop(columns=['Deadline']))
+
+        order_df.loc[0, 'Available_Time'] = None
+        with self.assertRaises(ValueError):
+            ModelInputTest.model_input.getAllPackages(order_df)
+
 
     def test_getTruckTypes(self):
 
@@ -49,6 +104,11 @@ class ModelInputTest(unittest.TestCase):
 
         assert(len(all_trucks) > 0)
 
+        # The truck ids are the same every time
+        all_trucks_again = ModelInputTest.model_input.getAllTrucks(all_packages, truck_types)
+
+        assert(list(all_trucks_again.keys()) == list(all_trucks.keys()))
+
     def test_getDistanceMatrix(self):
 
         distance_file = os.path.join(work_dir, "../../sample_data/distance.csv")
@@ -66,6 +126,46 @@ class ModelInputTest(unittest.TestCase):
 
         assert(distance_matrix.shape[0] > 0)
 
+    def test_toOrderNPZ(self):
+
+        order_file = os.path.join(work_dir, "../../sample_data/order_small.csv")
+
+        model_input = ModelInput()
+        model_input.package_table = model_input.getPackageTable(order_file)
+
+        order_npz_file = os.path.join(tempfile.mkdtemp(), "order.npz")
+        model_input.toOrderNPZ(order_npz_file)
+
+        package_table = ModelInputTest.model_input.getPackageTable(order_npz_file)
+
+        assert(package_table.getKeys() == model_input.package_table.getKeys())
+        assert((package_table.available_time == model_input.package_table.available_time).all())
+        assert(package_table.locations == model_input.package_table.locations)
+
+    def test_getDistances(self):
+
+        distance_file = os.path.join(work_dir, "../../sample_data/distance.csv")
+        distance_df = pd.read_csv(distance_file)
+
+        distances = ModelInputTest.model_input.getDistances(distance_df)
+
+        assert(distances.matrix.dtype == np.int32)
+        assert(distances.locations[-1] == "Placeholder")
+
+        for index, row in distance_df.head(100).iterrows():
+            assert(distances.getDistance(row['Source'], row['Destination']) == row['Distance(M)'])
+
+        source_ids = distances.getIds(distance_df['Source'])
+        destination_ids = distances.getIds(distance_df['Destination'])
+        assert((distances.gather(source_ids, destination_ids) == distance_df['Distance(M)'].to_numpy()).all())
+
+        # The pivoted DataFrame converts back to the same matrix
+        distances_again = DistanceMatrix()
+        distances_again.initFromMatrixDF(distances.toDF())
+
+        assert(distances_again.locations == distances.locations)
+        assert((distances_again.matrix == distances.matrix).all())
+
     def test_initInputFromFile(self):
         order_file = os.path.join(work_dir, "../../sample_data/order_large.csv")
         distance_file = os.path.join(work_dir, "../../sample_data/distance.csv")
@@ -154,6 +254,18 @@ class ModelResultTest(unittest.TestCase):
 
         assert(('O1', 'M1', 'P1') in model_result.all_packages)
 
+    def test_addResults(self):
+
+        model_result = ModelResult()
+
+        model_result.addResults([ModelResultTest.model_result, ModelResult()])
+
+        assert(len(model_result.package_assigned_truck) == 1)
+        assert(model_result.all_packages is not ModelResultTest.model_result.all_packages)
+
+        schedule_df = model_result.toScheduleDF()
+
+        assert(schedule_df.shape[0] == 1)
 
     def test_toScheduleDF(self):
 
@@ -162,3 +274,36 @@ class ModelResultTest(unittest.TestCase):
         logger.info(f"Schedule DF: {schedule_df}")
 
         assert(schedule_df.shape[0] == 1)
+
+    def test_writeScheduleCSV(self):
+
+        schedule_file = os.path.join(tempfile.mkdtemp(), "schedule.csv")
+
+        ModelResultTest.model_result.writeScheduleCSV(schedule_file, chunk_size=1)
+
+        schedule_df = pd.read_csv(schedule_file)
+
+        assert(list(schedule_df.columns) == schedule_columns)
+        assert(schedule_df.shape[0] == 1)
+        assert(schedule_df['Shared_Truck'][0] == 'N')
+        assert(pd.to_datetime(schedule_df['Start_Time'][0]) == datetime.fromtimestamp(1234567))
+
+    def test_toScheduleDFEmpty(self):
+
+        schedule_df = ModelResult().toScheduleDF()
+
+        assert(list(schedule_df.columns) == schedule_columns)
+        assert(schedule_df.shape[0] == 0)
+
+    def test_writeScheduleNPZ(self):
+
+        schedule_file = os.path.join(tempfile.mkdtemp(), "schedule.npz")
+
+        ModelResultTest.model_result.writeScheduleNPZ(schedule_file)
+
+        schedule_df = readScheduleDF(schedule_file)
+        expected_df = ModelResultTest.model_result.toScheduleDF()
+
+        assert(list(schedule_df.columns) == schedule_columns)
+        assert(schedule_df['Start_Time'].dtype == expected_df['Start_Time'].dtype)
+        assert(schedule_df['Order_ID'].tolist() == expected_df['Order_ID'].tolist())